@@ -0,0 +1,333 @@
+"""
+Concurrent-user load generator for the Momentum agent.
+
+Simulates N users running scripted multi-turn coaching conversations (plan
+creation and save, week lookup, exercise questions, plan review) and reports,
+for each concurrency level:
+
+- throughput (turns/s) and p50/p95/p99 turn latency
+- event-loop lag (p99 and max overshoot of a 10 ms ticker)
+- SQLite write time (DML execute time, which includes lock waits)
+- process RSS
+
+By default the agents run in-process behind a RunnerPool with the local
+StubLlm, a fresh SQLite session DB and a temporary working directory (so saved
+plans never touch ./data). With --url, turns are sent to a running serving
+layer instead (`python -m momentum_agent.serving --stub-model`); loop lag, RSS
+and SQLite numbers then describe the client process and are reported as n/a
+where they do not apply.
+
+Usage:
+    python -m benchmarks.loadgen --concurrency 1,8,32,64 --latency 0.05
+    python -m benchmarks.loadgen --url http://127.0.0.1:8080 --concurrency 1,8,32
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import resource
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import httpx
+from sqlalchemy import event
+
+from momentum_agent.serving import RunnerPool, ServerOverloaded, build_pool
+from momentum_agent.storage import TunedSqliteSessionService
+from momentum_agent.testing import COACHING_ROUTES, StubLlm
+
+# Multi-turn scripts; each simulated user runs one, round-robin by user index.
+SCRIPTS = {
+    "plan": [
+        "I want to train for a 5k. I can run 3 days a week for 8 weeks.",
+        "I'm a beginner and can jog about a mile. No injuries.",
+        "That looks great, please save it.",
+        "What should I do this week?",
+    ],
+    "exercise": [
+        "How do I do a squat?",
+        "What are common mistakes?",
+        "How do I do a deadlift?",
+    ],
+    "review": [
+        "What plans do I have saved?",
+        "Show me my plan.",
+        "What are my exercises for week 1?",
+    ],
+}
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of `values` (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct * len(ordered) / 100) - 1))
+    return ordered[rank]
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError):
+        # ru_maxrss is peak (not current) RSS, in KB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+class LoopLagMonitor:
+    """Measures event-loop lag as the overshoot of a fixed-interval sleep."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _tick(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - start - self.interval))
+
+    def start(self) -> None:
+        self.samples = []
+        self._task = asyncio.create_task(self._tick())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+class SqliteWriteTimer:
+    """Records execute time of write statements on a SQLAlchemy engine."""
+
+    def __init__(self, sync_engine):
+        self.samples: list[float] = []
+        event.listen(sync_engine, "before_cursor_execute", self._before)
+        event.listen(sync_engine, "after_cursor_execute", self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("loadgen_started", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["loadgen_started"].pop()
+        if not statement.lstrip().upper().startswith("SELECT"):
+            self.samples.append(time.perf_counter() - started)
+
+
+@dataclass
+class LevelStats:
+    """Raw measurements for one concurrency level."""
+
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    rejected: int = 0
+
+
+class InProcessTarget:
+    """Runs turns directly against a RunnerPool in this process."""
+
+    def __init__(self, pool: RunnerPool, sqlite_timer: Optional[SqliteWriteTimer] = None):
+        self.pool = pool
+        self.sqlite_timer = sqlite_timer
+
+    async def new_session(self, user_id: str) -> str:
+        return (await self.pool.ensure_session(user_id)).id
+
+    async def turn(self, user_id: str, session_id: str, message: str) -> None:
+        ticket = await self.pool.admit()
+        try:
+            async for _ in self.pool.run_turn(user_id, session_id, message):
+                pass
+        finally:
+            ticket.release()
+
+    async def close(self) -> None:
+        await self.pool.shutdown()
+
+
+class HttpTarget:
+    """Runs turns against the serving layer's HTTP endpoint."""
+
+    sqlite_timer = None
+
+    def __init__(self, url: str):
+        self.client = httpx.AsyncClient(base_url=url, timeout=120.0)
+
+    async def new_session(self, user_id: str) -> str:
+        response = await self.client.post("/sessions", json={"user_id": user_id})
+        response.raise_for_status()
+        return response.json()["session_id"]
+
+    async def turn(self, user_id: str, session_id: str, message: str) -> None:
+        response = await self.client.post(
+            "/run", json={"user_id": user_id, "session_id": session_id, "message": message}
+        )
+        if response.status_code == 429:
+            raise ServerOverloaded()
+        response.raise_for_status()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+async def simulate_user(target, user_id: str, script: list[str], iterations: int,
+                        think_time: float, stats: LevelStats) -> None:
+    """Run `script` `iterations` times, each in a fresh session."""
+    for _ in range(iterations):
+        session_id = await target.new_session(user_id)
+        for message in script:
+            started = time.perf_counter()
+            try:
+                await target.turn(user_id, session_id, message)
+            except ServerOverloaded:
+                stats.rejected += 1
+                continue
+            except Exception:
+                stats.errors += 1
+                continue
+            stats.latencies.append(time.perf_counter() - started)
+            if think_time:
+                await asyncio.sleep(think_time)
+
+
+async def run_level(target, concurrency: int, iterations: int = 1,
+                    think_time: float = 0.0, measure_process: bool = True) -> dict:
+    """Run `concurrency` simulated users at once and summarize the results."""
+    scripts = list(SCRIPTS.values())
+    stats = LevelStats()
+    monitor = LoopLagMonitor()
+    sqlite_before = len(target.sqlite_timer.samples) if target.sqlite_timer else 0
+
+    monitor.start()
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        simulate_user(target, f"load-user-{concurrency}-{i}", scripts[i % len(scripts)],
+                      iterations, think_time, stats)
+        for i in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - started
+    await monitor.stop()
+
+    sqlite_writes = target.sqlite_timer.samples[sqlite_before:] if target.sqlite_timer else None
+    return {
+        "concurrency": concurrency,
+        "turns": len(stats.latencies),
+        "errors": stats.errors,
+        "rejected": stats.rejected,
+        "elapsed_s": elapsed,
+        "throughput_tps": len(stats.latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(stats.latencies, 50) * 1e3,
+        "p95_ms": percentile(stats.latencies, 95) * 1e3,
+        "p99_ms": percentile(stats.latencies, 99) * 1e3,
+        "loop_lag_p99_ms": percentile(monitor.samples, 99) * 1e3,
+        "loop_lag_max_ms": max(monitor.samples, default=0.0) * 1e3,
+        "sqlite_write_p99_ms": percentile(sqlite_writes, 99) * 1e3 if sqlite_writes is not None else None,
+        "sqlite_write_total_s": sum(sqlite_writes) if sqlite_writes is not None else None,
+        "rss_mb": current_rss_mb() if measure_process else None,
+    }
+
+
+def build_in_process_target(workdir: Path, latency: float, jitter: float,
+                            error_rate: float, max_in_flight: int, seed: Optional[int] = None) -> InProcessTarget:
+    """Build a RunnerPool with the stub model and a fresh SQLite session DB in `workdir`."""
+    session_service = TunedSqliteSessionService(db_url=f"sqlite+aiosqlite:///{workdir / 'sessions.db'}")
+    model = StubLlm(latency=latency, jitter=jitter, error_rate=error_rate,
+                    routes=COACHING_ROUTES, seed=seed)
+    pool = build_pool(
+        model=model,
+        session_service=session_service,
+        max_in_flight=max_in_flight,
+        max_queue=max_in_flight,
+    )
+    return InProcessTarget(pool, SqliteWriteTimer(session_service.db_engine.sync_engine))
+
+
+COLUMNS = [
+    ("users", "concurrency", "{:>5}"),
+    ("turns", "turns", "{:>6}"),
+    ("err", "errors", "{:>4}"),
+    ("429", "rejected", "{:>4}"),
+    ("turns/s", "throughput_tps", "{:>8.1f}"),
+    ("p50 ms", "p50_ms", "{:>8.1f}"),
+    ("p95 ms", "p95_ms", "{:>8.1f}"),
+    ("p99 ms", "p99_ms", "{:>8.1f}"),
+    ("lag p99", "loop_lag_p99_ms", "{:>8.1f}"),
+    ("lag max", "loop_lag_max_ms", "{:>8.1f}"),
+    ("sql p99", "sqlite_write_p99_ms", "{:>8.1f}"),
+    ("sql tot s", "sqlite_write_total_s", "{:>9.2f}"),
+    ("RSS MB", "rss_mb", "{:>7.0f}"),
+]
+
+
+def format_header() -> str:
+    return " ".join(f"{name:>{len(fmt.format(0))}}" for name, _, fmt in COLUMNS)
+
+
+def format_row(result: dict) -> str:
+    """Render one level result as a fixed-width row (n/a for missing values)."""
+    cells = []
+    for _, key, fmt in COLUMNS:
+        value = result[key]
+        cells.append(fmt.format(value) if value is not None else f"{'n/a':>{len(fmt.format(0))}}")
+    return " ".join(cells)
+
+
+async def main_async(args: argparse.Namespace) -> list[dict]:
+    levels = [int(level) for level in args.concurrency.split(",")]
+    if args.url:
+        target = HttpTarget(args.url)
+    else:
+        workdir = Path(tempfile.mkdtemp(prefix="momentum-load-"))
+        # Plan tools write relative to the working directory
+        os.chdir(workdir)
+        target = build_in_process_target(
+            workdir, args.latency, args.jitter, args.error_rate, max(levels), args.seed
+        )
+
+    results = []
+    print(format_header(), flush=True)
+    try:
+        for level in levels:
+            results.append(await run_level(
+                target, level, args.iterations, args.think_time, measure_process=not args.url
+            ))
+            print(format_row(results[-1]), flush=True)
+    finally:
+        await target.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Concurrent-user load generator for Momentum.")
+    parser.add_argument("--concurrency", default="1,4,16,64",
+                        help="Comma-separated concurrent user counts to run in turn")
+    parser.add_argument("--iterations", type=int, default=1, help="Script repetitions per user")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Pause between turns (s)")
+    parser.add_argument("--url", help="Target a running serving layer instead of an in-process pool")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub model latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random stub latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Stub model error rate")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for jitter/error injection")
+    parser.add_argument("--json", dest="json_path", help="Also write results to this JSON file")
+    args = parser.parse_args()
+    # main_async changes into a temporary working directory
+    if args.json_path:
+        args.json_path = os.path.abspath(args.json_path)
+
+    results = asyncio.run(main_async(args))
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Bulk import/export throughput of the plan storage backends.
+
+Streams a generated dump of N plans (one version each by default, bodies
+drawn from shared week templates) into each backend with `import_versions`,
+then exports it back to a JSONL file with `iter_versions`, and reports
+versions/s both ways, backend commits, on-disk size and process RSS. The
+generator, import and export all stream, so RSS stays flat for the file and
+SQLite backends; the in-process fake Firestore holds the data itself, so it
+runs last.
+
+Usage:
+    python -m benchmarks.plan_backends --plans 100000
+    python -m benchmarks.plan_backends --plans 10000 --edits 2 --backends sqlite
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterator
+
+from momentum_agent.storage import DocumentBackend, FileBackend, PlanStore, SqliteBackend
+from momentum_agent.storage.bulk import import_versions, iter_versions, write_jsonl
+from momentum_agent.testing import FakeFirestore
+
+from .loadgen import current_rss_mb
+from .plan_storage import make_template
+
+
+def generate_versions(plans: int, users: int, edits: int, templates: int = 20) -> Iterator[dict]:
+    """Export-format versions for `plans` plans spread over `users` users."""
+    bodies = [make_template(index) for index in range(templates)]
+    for i in range(plans):
+        user_id, plan_number = f"user-{i % users:05d}", i // users
+        text = bodies[i % templates]
+        for version in range(1, edits + 2):
+            if version > 1:
+                text += f"Coach note {version}: adjust pace based on last week's feedback\n"
+            yield {
+                "plan_id": f"goal_{plan_number // 8}_week{plan_number % 8 + 1}",
+                "user_id": user_id,
+                "version": version,
+                "parent": version - 1 or None,
+                "created_at": "2026-01-05T08:00:00",
+                "updated_at": f"2026-01-05T08:{version:02d}:00",
+                "message": "",
+                "goal_id": f"goal_{plan_number // 8}",
+                "date": "2026-01-05",
+                "status": "proposed",
+                "metadata": {"week_number": plan_number % 8 + 1, "program_length_weeks": 8},
+                "exercises_text": text,
+            }
+
+
+def allocated_bytes(root: Path) -> int:
+    """Disk space allocated under root (os.walk keeps this out of the RSS figures)."""
+    return sum(
+        os.stat(os.path.join(directory, name)).st_blocks * 512
+        for directory, _, names in os.walk(root)
+        for name in names
+    )
+
+
+def make_backend(name: str, workdir: Path):
+    if name == "file":
+        return FileBackend(workdir / "plans")
+    if name == "sqlite":
+        return SqliteBackend(workdir / "plans.db")
+    return DocumentBackend(FakeFirestore())
+
+
+def run(name: str, batch_size: int, args: argparse.Namespace) -> dict:
+    with tempfile.TemporaryDirectory(prefix="momentum-backends-") as workdir:
+        workdir = Path(workdir)
+        store = PlanStore(make_backend(name, workdir))
+
+        started = time.perf_counter()
+        imported, _ = import_versions(store, generate_versions(args.plans, args.users, args.edits), batch_size)
+        import_s = time.perf_counter() - started
+
+        dump = workdir / "plans.jsonl"
+        started = time.perf_counter()
+        with open(dump, "w") as out:
+            exported = write_jsonl(iter_versions(store), out)
+        export_s = time.perf_counter() - started
+
+        if name == "file":
+            size = allocated_bytes(workdir / "plans")
+        elif name == "sqlite":
+            size = sum(path.stat().st_size for path in workdir.glob("plans.db*"))
+        else:
+            size = None
+        commits = store.backend.client.commits if name == "memory" else None
+        store.backend.close()
+
+        return {
+            "backend": name,
+            "batch": batch_size,
+            "versions": imported,
+            "import_per_s": imported / import_s,
+            "export_per_s": exported / export_s,
+            "commits": commits,
+            "store_mb": size / 1e6 if size is not None else None,
+            "dump_mb": dump.stat().st_size / 1e6,
+            "rss_mb": current_rss_mb(),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk import/export throughput of the plan storage backends.")
+    parser.add_argument("--plans", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--edits", type=int, default=0, help="Extra versions per plan")
+    parser.add_argument("--backends", default="file,sqlite,memory", help="Comma-separated: file, sqlite, memory")
+    parser.add_argument("--batch-sizes", default="1,500", help="Comma-separated import batch sizes")
+    parser.add_argument("--json", dest="json_path", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    print(f"{'backend':>8} {'batch':>6} {'versions':>9} {'import/s':>9} {'export/s':>9} "
+          f"{'commits':>8} {'store MB':>9} {'dump MB':>8} {'RSS MB':>7}")
+    results = []
+    for name in args.backends.split(","):
+        for batch_size in [int(size) for size in args.batch_sizes.split(",")]:
+            result = run(name, batch_size, args)
+            results.append(result)
+            commits = f"{result['commits']:>8}" if result["commits"] is not None else f"{'n/a':>8}"
+            store_mb = f"{result['store_mb']:>9.1f}" if result["store_mb"] is not None else f"{'n/a':>9}"
+            print(f"{name:>8} {batch_size:>6} {result['versions']:>9} {result['import_per_s']:>9,.0f} "
+                  f"{result['export_per_s']:>9,.0f} {commits} {store_mb} {result['dump_mb']:>8.1f} "
+                  f"{result['rss_mb']:>7.0f}", flush=True)
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
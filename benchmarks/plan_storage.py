@@ -0,0 +1,157 @@
+"""
+Storage-size and write-latency benchmark for plan storage.
+
+Compares the content-addressed PlanStore against the previous scheme, where
+`save_plan` overwrote `{goal_id}_week{n}.json` in full on every save. The
+workload saves every week of several goals, with week bodies drawn from a
+small set of shared templates, then applies a number of one-line edits per
+plan. The old scheme keeps only the latest version; `all_versions_kb` is
+what it would take to keep every version as a full file.
+
+Usage:
+    python -m benchmarks.plan_storage --goals 20 --weeks 8 --edits 5
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from momentum_agent.storage import PlanStore
+
+from .loadgen import percentile
+
+USER_ID = "user"
+
+
+def make_template(index: int) -> str:
+    """A realistic week body (~0.6 KB), distinct per template index."""
+    days = [
+        f"Day {day}: {'Rest' if day in (2, 4, 7) else f'{20 + 5 * index + day} min run at easy pace, 5 min warm-up and cool-down walk, focus on cadence'}"
+        for day in range(1, 8)
+    ]
+    return f"**Week template {index}**\n" + "\n".join(days) + "\n"
+
+
+def make_plan(goal: int, week: int, text: str) -> dict:
+    return {
+        "user_id": USER_ID,
+        "goal_id": f"goal_{goal}",
+        "created_at": "2026-01-05T08:00:00",
+        "date": "2026-01-05",
+        "status": "proposed",
+        "exercises_text": text,
+        "metadata": {
+            "week_number": week,
+            "program_length_weeks": 8,
+            "notes": "",
+            "goal_description": f"Goal {goal}",
+        },
+    }
+
+
+def legacy_save(root: Path, plan_id: str, plan: dict) -> None:
+    """The previous save_plan storage: overwrite one JSON file per plan id."""
+    path = root / USER_ID / f"{plan_id}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(plan, f, indent=2)
+
+
+def disk_usage(root: Path) -> tuple[int, int, int]:
+    """(files, logical bytes, allocated bytes) under root."""
+    files = [p for p in root.rglob("*") if p.is_file()]
+    return (
+        len(files),
+        sum(p.stat().st_size for p in files),
+        sum(p.stat().st_blocks * 512 for p in files),
+    )
+
+
+def workload(goals: int, weeks: int, edits: int, templates: int):
+    """Yield (plan_id, plan) saves: every week of every goal, then edits."""
+    bodies = {}
+    for goal in range(goals):
+        for week in range(1, weeks + 1):
+            plan_id = f"goal_{goal}_week{week}"
+            bodies[plan_id] = make_template((goal + week) % templates)
+            yield plan_id, make_plan(goal, week, bodies[plan_id])
+    for edit in range(edits):
+        for goal in range(goals):
+            for week in range(1, weeks + 1):
+                plan_id = f"goal_{goal}_week{week}"
+                bodies[plan_id] += f"Coach note {edit}: adjust pace based on last week's feedback\n"
+                yield plan_id, make_plan(goal, week, bodies[plan_id])
+
+
+def run(goals: int, weeks: int, edits: int, templates: int) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as legacy_dir, tempfile.TemporaryDirectory() as store_dir:
+        legacy_root, store_root = Path(legacy_dir), Path(store_dir)
+        store = PlanStore(store_root)
+
+        for name, save in (
+            ("overwrite", lambda plan_id, plan: legacy_save(legacy_root, plan_id, plan)),
+            ("versioned", lambda plan_id, plan: store.save(USER_ID, plan_id, plan)),
+        ):
+            latencies = []
+            full_copies = 0
+            for plan_id, plan in workload(goals, weeks, edits, templates):
+                started = time.perf_counter()
+                save(plan_id, plan)
+                latencies.append(time.perf_counter() - started)
+                full_copies += len(json.dumps(plan, indent=2))
+            files, logical, allocated = disk_usage(legacy_root if name == "overwrite" else store_root)
+            results[name] = {
+                "saves": len(latencies),
+                "files": files,
+                "logical_kb": logical / 1e3,
+                "allocated_kb": allocated / 1e3,
+                "write_p50_ms": percentile(latencies, 50) * 1e3,
+                "write_p95_ms": percentile(latencies, 95) * 1e3,
+            }
+            if name == "overwrite":
+                # What keeping every version would cost if each were a full file
+                results[name]["all_versions_kb"] = full_copies / 1e3
+
+        plan_id = "goal_0_week1"
+        timings = {}
+        for label, op in (
+            ("load_head_ms", lambda: store.load(USER_ID, plan_id)),
+            ("load_v1_ms", lambda: store.load(USER_ID, plan_id, version=1)),
+            ("history_ms", lambda: store.history(USER_ID, plan_id)),
+            ("list_plans_ms", lambda: store.list_plans(USER_ID)),
+        ):
+            started = time.perf_counter()
+            for _ in range(100):
+                op()
+            timings[label] = (time.perf_counter() - started) * 10
+        started = time.perf_counter()
+        store.rollback(USER_ID, plan_id, 1)
+        timings["rollback_ms"] = (time.perf_counter() - started) * 1e3
+        results["versioned"].update(timings)
+        results["versioned"]["versions_kept"] = sum(
+            len(store.history(USER_ID, record["plan_id"])) for record in store.list_plans(USER_ID)
+        )
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark plan storage size and write latency.")
+    parser.add_argument("--goals", type=int, default=20)
+    parser.add_argument("--weeks", type=int, default=8)
+    parser.add_argument("--edits", type=int, default=5, help="Edit rounds applied to every plan")
+    parser.add_argument("--templates", type=int, default=4, help="Distinct week templates")
+    args = parser.parse_args()
+
+    results = run(args.goals, args.weeks, args.edits, args.templates)
+    for name, stats in results.items():
+        print(f"{name}:")
+        for key, value in stats.items():
+            print(f"  {key:>15}: {value:.2f}" if isinstance(value, float) else f"  {key:>15}: {value}")
+
+
+if __name__ == "__main__":
+    main()
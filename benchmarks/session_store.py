@@ -0,0 +1,179 @@
+"""
+Concurrent event appends and session loads on the SQLite session store.
+
+Runs N concurrent sessions for T turns each against a fresh database. A turn
+loads the session (as the Runner does at the start of run_async), then appends
+a user message, a function call, its response and a final reply carrying a
+state delta, the same four events a hub tool turn produces. Afterwards every
+user's sessions are listed, then all sessions of the app (as rebalancing
+does). The database is seeded with `--seed-sessions` idle sessions so listing
+runs over a realistically sized table.
+
+Configurations:
+    default     DatabaseSessionService on the bare sqlite+aiosqlite URL
+    tuned       TunedSqliteSessionService (WAL, synchronous=NORMAL, pool,
+                BEGIN IMMEDIATE, listing index, one transaction per turn)
+    unbatched   TunedSqliteSessionService(batch_events=False), to separate the
+                effect of batching from the connection tuning
+
+Usage:
+    python -m benchmarks.session_store --sessions 64 --turns 10
+    python -m benchmarks.session_store --configs default,tuned --dir /var/tmp
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions import DatabaseSessionService
+from google.genai import types
+from sqlalchemy import event
+
+from momentum_agent.storage import TunedSqliteSessionService
+
+from .loadgen import percentile
+
+APP_NAME = "momentum"
+
+
+def make_service(name: str, db_path: Path, pool_size: int):
+    url = f"sqlite+aiosqlite:///{db_path}"
+    if name == "default":
+        return DatabaseSessionService(db_url=url)
+    return TunedSqliteSessionService(db_url=url, pool_size=pool_size, batch_events=name != "unbatched")
+
+
+def turn_events(invocation_id: str, turn: int) -> list[Event]:
+    """The events of one hub turn that calls a tool."""
+    call = types.FunctionCall(id=f"call-{turn}", name="get_week_schedule", args={"week_offset": 0})
+    response = types.FunctionResponse(
+        id=f"call-{turn}", name="get_week_schedule",
+        response={"result": "\n".join(f"Day {d}: {20 + d} min easy run" for d in range(1, 8))},
+    )
+    return [
+        Event(invocation_id=invocation_id, author="user",
+              content=types.Content(role="user", parts=[types.Part(text=f"What's on this week? ({turn})")])),
+        Event(invocation_id=invocation_id, author="WellnessChiefAgent",
+              content=types.Content(role="model", parts=[types.Part(function_call=call)])),
+        Event(invocation_id=invocation_id, author="WellnessChiefAgent",
+              content=types.Content(role="user", parts=[types.Part(function_response=response)])),
+        Event(invocation_id=invocation_id, author="WellnessChiefAgent",
+              content=types.Content(role="model", parts=[types.Part(text="Here is your week. " * 20)]),
+              actions=EventActions(state_delta={"last_turn": turn, "user:turns": turn})),
+    ]
+
+
+async def run(name: str, args: argparse.Namespace) -> dict:
+    with tempfile.TemporaryDirectory(prefix="momentum-sessions-", dir=args.dir) as workdir:
+        service = make_service(name, Path(workdir) / "sessions.db", args.pool_size)
+        commits = 0
+
+        def count_commit(connection) -> None:
+            nonlocal commits
+            commits += 1
+
+        users = [f"user-{i:04d}" for i in range(max(1, args.sessions // args.sessions_per_user))]
+        for i in range(args.seed_sessions):
+            await service.create_session(app_name=APP_NAME, user_id=f"idle-{i % 500:04d}")
+        sessions = [
+            await service.create_session(app_name=APP_NAME, user_id=users[i % len(users)])
+            for i in range(args.sessions)
+        ]
+        event.listen(service.db_engine.sync_engine, "commit", count_commit)
+
+        turn_latencies, load_latencies, errors = [], [], 0
+
+        async def converse(session) -> None:
+            nonlocal errors
+            for turn in range(args.turns):
+                started = time.perf_counter()
+                try:
+                    session = await service.get_session(
+                        app_name=APP_NAME, user_id=session.user_id, session_id=session.id
+                    )
+                    load_latencies.append(time.perf_counter() - started)
+                    for e in turn_events(f"{session.id}-{turn}", turn):
+                        await service.append_event(session, e)
+                except Exception:
+                    errors += 1
+                    continue
+                turn_latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[converse(session) for session in sessions])
+        elapsed = time.perf_counter() - started
+        turn_commits = commits
+
+        list_latencies = []
+        for user_id in users:
+            list_started = time.perf_counter()
+            await service.list_sessions(app_name=APP_NAME, user_id=user_id)
+            list_latencies.append(time.perf_counter() - list_started)
+        list_started = time.perf_counter()
+        listed = len((await service.list_sessions(app_name=APP_NAME)).sessions)
+        list_all_s = time.perf_counter() - list_started
+        await service.close()
+
+        turns = len(turn_latencies)
+        return {
+            "config": name,
+            "turns": turns,
+            "errors": errors,
+            "turns_per_s": turns / elapsed,
+            "appends_per_s": turns * 4 / elapsed,
+            "commits": turn_commits,
+            "turn_p50_ms": percentile(turn_latencies, 50) * 1e3,
+            "turn_p95_ms": percentile(turn_latencies, 95) * 1e3,
+            "load_p50_ms": percentile(load_latencies, 50) * 1e3,
+            "load_p95_ms": percentile(load_latencies, 95) * 1e3,
+            "list_user_p50_ms": percentile(list_latencies, 50) * 1e3,
+            "list_all_ms": list_all_s * 1e3,
+            "sessions_listed": listed,
+        }
+
+
+COLUMNS = [
+    ("config", "config", "{:>10}"),
+    ("turns", "turns", "{:>6}"),
+    ("err", "errors", "{:>4}"),
+    ("turns/s", "turns_per_s", "{:>8.1f}"),
+    ("appends/s", "appends_per_s", "{:>10.1f}"),
+    ("commits", "commits", "{:>8}"),
+    ("turn p50", "turn_p50_ms", "{:>9.1f}"),
+    ("turn p95", "turn_p95_ms", "{:>9.1f}"),
+    ("load p50", "load_p50_ms", "{:>9.1f}"),
+    ("load p95", "load_p95_ms", "{:>9.1f}"),
+    ("list/user", "list_user_p50_ms", "{:>10.2f}"),
+    ("list all", "list_all_ms", "{:>9.1f}"),
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the SQLite session store configurations.")
+    parser.add_argument("--sessions", type=int, default=64, help="Concurrent sessions")
+    parser.add_argument("--sessions-per-user", type=int, default=4)
+    parser.add_argument("--turns", type=int, default=10, help="Turns per session")
+    parser.add_argument("--seed-sessions", type=int, default=2000, help="Idle sessions created up front")
+    parser.add_argument("--pool-size", type=int, default=8, help="Connections for the tuned store")
+    parser.add_argument("--configs", default="default,unbatched,tuned", help="Comma-separated configurations")
+    parser.add_argument("--dir", help="Directory for the database (default: system temp dir)")
+    parser.add_argument("--json", dest="json_path", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    print(" ".join(f"{title:>{len(fmt.format(0))}}" for title, _, fmt in COLUMNS))
+    results = []
+    for name in args.configs.split(","):
+        result = asyncio.run(run(name, args))
+        results.append(result)
+        print(" ".join(fmt.format(result[key]) for _, key, fmt in COLUMNS), flush=True)
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Throughput scaling of the sharded deployment with worker count.
+
+For each worker count, starts `python -m momentum_agent.serving.sharding`
+with the stub model and a fresh data directory, drives it with the load
+generator's simulated users through the router, and reports throughput and
+latency next to the speedup over the first worker count. Scaling is bounded
+by the cores available: with one worker per core the per-process SQLite
+writer and event loop stop being shared.
+
+Usage:
+    python -m benchmarks.sharding --workers 1,2,4,8 --concurrency 64 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from .loadgen import HttpTarget, run_level
+
+
+def start_cluster(workers: int, data_dir: Path, port: int, latency: float, max_in_flight: int) -> subprocess.Popen:
+    return subprocess.Popen([
+        sys.executable, "-m", "momentum_agent.serving.sharding",
+        "--workers", str(workers), "--port", str(port), "--worker-port", str(port + 1),
+        "--data-dir", str(data_dir), "--shutdown-timeout", "10",
+        "--stub-model", "--stub-latency", str(latency),
+        "--max-in-flight", str(max_in_flight), "--max-queue", str(max_in_flight),
+    ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_for_router(url: str, process: subprocess.Popen, timeout: float = 120.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Router exited with code {process.returncode}")
+        try:
+            if httpx.get(url + "/readyz", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Router not ready after {timeout}s")
+
+
+async def measure(url: str, concurrency: int, iterations: int) -> dict:
+    target = HttpTarget(url)
+    try:
+        # Warm-up so process start-up and first imports are not measured
+        await run_level(target, min(concurrency, 4), measure_process=False)
+        return await run_level(target, concurrency, iterations, measure_process=False)
+    finally:
+        await target.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Throughput scaling of the sharded deployment.")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--concurrency", type=int, default=64, help="Simulated users")
+    parser.add_argument("--iterations", type=int, default=2, help="Script repetitions per user")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub model latency (s)")
+    parser.add_argument("--port", type=int, default=8300, help="Router port (workers use the next ports)")
+    parser.add_argument("--json", dest="json_path", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    print(f"cores: {os.cpu_count()}, users: {args.concurrency}, stub latency: {args.latency * 1e3:.0f} ms")
+    print(f"{'workers':>7} {'turns':>6} {'err':>4} {'429':>4} {'turns/s':>8} {'speedup':>7} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    results = []
+    url = f"http://127.0.0.1:{args.port}"
+    for workers in [int(count) for count in args.workers.split(",")]:
+        with tempfile.TemporaryDirectory(prefix="momentum-shards-") as data_dir:
+            # Every worker may admit all users at once, so admission limits never cap throughput
+            process = start_cluster(workers, Path(data_dir), args.port, args.latency, args.concurrency)
+            try:
+                wait_for_router(url, process)
+                result = asyncio.run(measure(url, args.concurrency, args.iterations))
+            finally:
+                process.terminate()
+                process.wait()
+
+        result["workers"] = workers
+        result["speedup"] = result["throughput_tps"] / results[0]["throughput_tps"] if results else 1.0
+        results.append(result)
+        print(f"{workers:>7} {result['turns']:>6} {result['errors']:>4} {result['rejected']:>4} "
+              f"{result['throughput_tps']:>8.1f} {result['speedup']:>6.2f}x "
+              f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f}", flush=True)
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Latency of multi-tool turns in the hub.
+
+Each turn asks several independent questions in one message ("What plans have
+I saved? What's on this week? How do I squat? How do I do a lunge?"). The stub
+model answers with one function call per question: two storage tools
+(list_user_plans, get_week_schedule) and two InstructorAgent spoke calls, then
+a final reply. N sessions run such turns concurrently on one event loop.
+
+Storage calls are given a fixed delay (`--storage-latency`, applied to every
+plan backend call) to stand in for a remote backend such as Firestore; with
+the local file backend they take well under a millisecond.
+
+Configurations:
+    inline      the hub without run_concurrently: synchronous tools run on
+                the event loop, spokes as concurrent tasks, no cap or timeouts
+    serial      run_concurrently with max_concurrent_calls=1
+    concurrent  run_concurrently with the default cap
+
+Usage:
+    python -m benchmarks.tool_fanout --sessions 1,16 --latency 0.2 --storage-latency 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from google.adk.memory import InMemoryMemoryService
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from momentum_agent.hub import create_wellness_chief_agent
+from momentum_agent.testing import COACHING_ROUTES, StubLlm
+from momentum_agent.tools import plan_tools
+
+from .loadgen import LoopLagMonitor, percentile
+
+MESSAGE = "What plans have I saved? What's on this week? How do I squat? How do I do a lunge?"
+
+CONFIGS = {
+    "inline": {"concurrent_tools": False},
+    "serial": {"max_concurrent_calls": 1},
+    "concurrent": {},
+}
+
+
+class DelayedBackend:
+    """Plan backend proxy that sleeps before every call, like a remote store's round trip."""
+
+    def __init__(self, backend, delay: float):
+        self.backend = backend
+        self.delay = delay
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.backend, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            time.sleep(self.delay)
+            return attr(*args, **kwargs)
+
+        return call
+
+
+async def run(name: str, sessions: int, args: argparse.Namespace) -> dict:
+    model = StubLlm(latency=args.latency, routes=COACHING_ROUTES, parallel_calls=True)
+    agent = create_wellness_chief_agent(model=model, **CONFIGS[name])
+    runner = Runner(
+        app_name="momentum",
+        agent=agent,
+        session_service=InMemorySessionService(),
+        memory_service=InMemoryMemoryService(),
+        auto_create_session=True,
+    )
+    latencies, calls = [], []
+
+    async def converse(user: int) -> None:
+        for turn in range(args.turns):
+            message = types.Content(role="user", parts=[types.Part(text=MESSAGE)])
+            started = time.perf_counter()
+            events = [e async for e in runner.run_async(
+                user_id=f"user-{user:03d}", session_id=f"session-{user:03d}", new_message=message
+            )]
+            latencies.append(time.perf_counter() - started)
+            calls.append(sum(len(e.get_function_calls()) for e in events))
+
+    monitor = LoopLagMonitor()
+    monitor.start()
+    started = time.perf_counter()
+    await asyncio.gather(*[converse(user) for user in range(sessions)])
+    elapsed = time.perf_counter() - started
+    await monitor.stop()
+    await runner.close()
+
+    return {
+        "config": name,
+        "sessions": sessions,
+        "turns": len(latencies),
+        "calls_per_turn": sum(calls) / len(calls),
+        "turns_per_s": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1e3,
+        "p95_ms": percentile(latencies, 95) * 1e3,
+        "loop_lag_p99_ms": percentile(monitor.samples, 99) * 1e3,
+    }
+
+
+COLUMNS = [
+    ("config", "config", "{:>10}"),
+    ("sessions", "sessions", "{:>8}"),
+    ("turns", "turns", "{:>6}"),
+    ("calls", "calls_per_turn", "{:>6.1f}"),
+    ("turns/s", "turns_per_s", "{:>8.1f}"),
+    ("p50 ms", "p50_ms", "{:>8.1f}"),
+    ("p95 ms", "p95_ms", "{:>8.1f}"),
+    ("lag p99", "loop_lag_p99_ms", "{:>8.1f}"),
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark multi-tool turns in the hub.")
+    parser.add_argument("--sessions", default="1,16", help="Comma-separated concurrent session counts")
+    parser.add_argument("--turns", type=int, default=5, help="Turns per session")
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub model latency (s)")
+    parser.add_argument("--storage-latency", type=float, default=0.02, help="Delay per plan backend call (s)")
+    parser.add_argument("--configs", default=",".join(CONFIGS), help="Comma-separated configurations")
+    parser.add_argument("--json", dest="json_path", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    if args.json_path:
+        args.json_path = os.path.abspath(args.json_path)
+    # Plan tools write relative to the working directory
+    os.chdir(tempfile.mkdtemp(prefix="momentum-fanout-"))
+    plan_tools.plan_store.backend = DelayedBackend(plan_tools.plan_store.backend, args.storage_latency)
+
+    print(" ".join(f"{title:>{len(fmt.format(0))}}" for title, _, fmt in COLUMNS))
+    results = []
+    for sessions in [int(n) for n in args.sessions.split(",")]:
+        for name in args.configs.split(","):
+            result = asyncio.run(run(name, sessions, args))
+            results.append(result)
+            print(" ".join(fmt.format(result[key]) for _, key, fmt in COLUMNS), flush=True)
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
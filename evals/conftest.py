@@ -10,6 +10,9 @@ import asyncio
 import gc
 import pytest
 
+# A week of easy runs, one line per day, shared by the plan storage tests
+PLAN_TEXT = "\n".join(f"Day {d}: {20 + d} min easy run" for d in range(1, 8)) + "\n"
+
 
 @pytest.fixture(scope="session")
 def event_loop():
@@ -54,3 +57,25 @@ def cleanup_aiohttp_sessions():
         # No event loop available, sessions will be cleaned up by garbage collector
         pass
 
+
+@pytest.fixture
+def plan_text():
+    """Exercise text of the sample plan."""
+    return PLAN_TEXT
+
+
+@pytest.fixture
+def make_plan(plan_text):
+    """Factory for sample plan records, as the plan tools save them."""
+
+    def make(text=plan_text, week=1, status="proposed"):
+        return {
+            "goal_id": "run_a_5k",
+            "created_at": "2026-01-05T08:00:00",
+            "date": "2026-01-05",
+            "status": status,
+            "exercises_text": text,
+            "metadata": {"week_number": week, "program_length_weeks": 8, "goal_description": "Run a 5k"},
+        }
+
+    return make
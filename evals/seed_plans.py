@@ -1,13 +1,8 @@
-import json
-from pathlib import Path
-from momentum_agent.tools.plan_tools import save_plan
+from momentum_agent.tools.plan_tools import plan_store, save_plan
 from datetime import datetime
 
 def seed_plans():
     user_id = "user"
-    # Ensure directory exists
-    plans_dir = Path(f"data/plans/{user_id}")
-    plans_dir.mkdir(parents=True, exist_ok=True)
 
     # Plan 1: 5k Run
     plan1_id = "run_a_5k_week1"
@@ -26,8 +21,7 @@ def seed_plans():
         }
     }
 
-    with open(plans_dir / f"{plan1_id}.json", "w") as f:
-        json.dump(plan1_data, f, indent=2)
+    plan_store.save(user_id, plan1_id, plan1_data)
     
     save_plan(
         goal_description="Run a 5k",
@@ -63,8 +57,7 @@ Day 7: Rest""",
         }
     }
 
-    with open(plans_dir / f"{plan2_id}.json", "w") as f:
-        json.dump(plan2_data, f, indent=2)
+    plan_store.save(user_id, plan2_id, plan2_data)
 
     print(f"Created {plan2_id}")
 
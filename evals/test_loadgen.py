@@ -0,0 +1,45 @@
+"""Tests for the concurrent-user load generator (offline, StubLlm)."""
+
+import pytest
+
+from benchmarks.loadgen import SCRIPTS, build_in_process_target, percentile, run_level
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 95) == 0.0
+    assert percentile([1, 2, 3, 4, 5], 50) == 3
+    assert percentile(list(range(1, 31)), 95) == 29
+
+
+@pytest.mark.asyncio
+async def test_run_level_reports_all_metrics(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    target = build_in_process_target(tmp_path, latency=0.0, jitter=0.0, error_rate=0.0, max_in_flight=3)
+    try:
+        result = await run_level(target, concurrency=3)
+    finally:
+        await target.close()
+
+    assert result["turns"] == sum(len(script) for script in SCRIPTS.values())
+    assert result["errors"] == 0
+    assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+    assert result["sqlite_write_total_s"] > 0
+    assert result["rss_mb"] > 0
+    # The plan script saves a plan through the real save_plan tool
+    assert list((tmp_path / "data" / "plans").rglob("*.json"))
+
+
+@pytest.mark.asyncio
+async def test_run_level_counts_injected_errors(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    target = build_in_process_target(tmp_path, latency=0.0, jitter=0.0, error_rate=1.0, max_in_flight=2)
+    try:
+        result = await run_level(target, concurrency=2)
+    finally:
+        await target.close()
+
+    assert result["turns"] == 0
+    assert result["errors"] == len(SCRIPTS["plan"]) + len(SCRIPTS["exercise"])
@@ -0,0 +1,131 @@
+"""Tests for the plan storage backends, batched writes and bulk import/export."""
+
+import io
+from types import SimpleNamespace
+
+import pytest
+
+from momentum_agent.scheduling import ScheduleIndex
+from momentum_agent.serving.app import RunRequest
+from momentum_agent.storage import DocumentBackend, PlanStore, SqliteBackend, open_backend
+from momentum_agent.storage.bulk import import_versions, iter_versions, read_jsonl, write_jsonl
+from momentum_agent.testing import FakeFirestore
+from momentum_agent.tools import plan_tools
+
+
+@pytest.fixture(params=["file", "sqlite", "memory"])
+def store(request, tmp_path):
+    urls = {"file": f"file:{tmp_path / 'plans'}", "sqlite": f"sqlite:{tmp_path / 'plans.db'}", "memory": "memory:"}
+    store = PlanStore(open_backend(urls[request.param]))
+    yield store
+    store.backend.close()
+
+
+def test_backends_version_and_roll_back(store, plan_text, make_plan):
+    store.save("alice", "run_a_5k_week1", make_plan())
+    store.save("alice", "run_a_5k_week1", make_plan(plan_text.replace("Day 5: 25", "Day 5: 28")))
+    store.save("bob", "strength_week1", make_plan(status="active"))
+
+    assert store.load("alice", "run_a_5k_week1", version=1)["exercises_text"] == plan_text
+    assert "Day 5: 28" in store.load("alice", "run_a_5k_week1")["exercises_text"]
+    assert store.rollback("alice", "run_a_5k_week1", 1)["version"] == 3
+    assert [v["version"] for v in store.history("alice", "run_a_5k_week1")] == [1, 2, 3]
+    assert [p["plan_id"] for p in store.list_plans("bob")] == ["strength_week1"]
+    assert list(store.backend.list_users()) == ["alice", "bob"]
+
+
+def test_batch_commits_once_and_discards_on_error(tmp_path, plan_text, make_plan):
+    client = FakeFirestore()
+    store = PlanStore(DocumentBackend(client))
+    with store.batch():
+        for week in range(1, 6):
+            store.save("alice", f"run_a_5k_week{week}", make_plan(plan_text + f"Week {week}\n"))
+        # Reads inside the batch see its pending writes
+        assert len(store.list_plans("alice")) == 5
+        assert store.save("alice", "run_a_5k_week1", make_plan(plan_text + "Week 1\n"))["version"] == 1
+    assert client.commits == 1
+
+    with pytest.raises(RuntimeError):
+        with store.batch():
+            store.save("alice", "strength_week1", make_plan())
+            raise RuntimeError("boom")
+    assert store.head("alice", "strength_week1") is None
+    assert len(store.list_plans("alice")) == 5
+
+
+def test_bulk_copy_round_trips_between_backends(tmp_path, plan_text, make_plan):
+    source = PlanStore(tmp_path / "plans")
+    for user in ("alice", "bob"):
+        text = plan_text
+        for i in range(3):
+            text += f"Extra {i}\n"
+            source.save(user, "run_a_5k_week1", make_plan(text), message=f"edit {i}")
+        source.save(user, "run_a_5k_week2", make_plan())
+
+    dump = io.StringIO()
+    assert write_jsonl(iter_versions(source), dump) == 8
+
+    target = PlanStore(SqliteBackend(tmp_path / "plans.db"))
+    assert import_versions(target, read_jsonl(io.StringIO(dump.getvalue())), batch_size=3) == (8, 0)
+    assert import_versions(target, read_jsonl(io.StringIO(dump.getvalue()))) == (0, 8)
+
+    assert list(iter_versions(target)) == list(iter_versions(source))
+    assert target.load("bob", "run_a_5k_week1", version=2)["exercises_text"] == plan_text + "Extra 0\nExtra 1\n"
+    assert target.history("alice", "run_a_5k_week1")[2]["message"] == "edit 2"
+    target.backend.close()
+
+
+def test_fake_firestore_enforces_write_rules():
+    client = FakeFirestore()
+    batch = client.batch()
+    with pytest.raises(ValueError):
+        batch.set(client.document("users/alice"), {"ops": [["=", 0, 2]]})
+    for i in range(501):
+        batch.set(client.document(f"users/u{i}"), {"n": i})
+    with pytest.raises(ValueError):
+        batch.commit()
+
+
+def test_plan_tools_store_plans_per_user(tmp_path, monkeypatch, plan_text):
+    monkeypatch.setattr(plan_tools, "plan_store", PlanStore(tmp_path / "plans"))
+    monkeypatch.setattr(plan_tools, "schedule_index", ScheduleIndex(tmp_path / "schedules"))
+    alice = SimpleNamespace(user_id="alice")
+
+    plan_tools.save_plan("Run a 5k", plan_text, start_date="2026-01-05", tool_context=alice)
+    assert "run_a_5k_week1" in plan_tools.list_user_plans(tool_context=alice)
+    assert "No saved plans" in plan_tools.list_user_plans()
+    assert (tmp_path / "plans" / "alice" / "refs" / "run_a_5k_week1.json").exists()
+    assert ScheduleIndex(tmp_path / "schedules").exists("alice")
+
+
+@pytest.mark.parametrize("user_id", ["../../escaped", "a/b", "..", "", "a\\b", "x" * 200])
+def test_user_ids_that_are_not_safe_path_components_are_rejected(tmp_path, user_id, make_plan):
+    with pytest.raises(ValueError):
+        PlanStore(tmp_path / "plans").save(user_id, "run_a_5k_week1", make_plan())
+    with pytest.raises(ValueError):
+        ScheduleIndex(tmp_path / "schedules").update(user_id, {"plan_id": "p", **make_plan()})
+    with pytest.raises(ValueError):
+        plan_tools.list_user_plans(tool_context=SimpleNamespace(user_id=user_id))
+    with pytest.raises(ValueError):
+        RunRequest(user_id=user_id, message="hi")
+    assert list(tmp_path.parent.glob("escaped*")) == [] and list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("plan_id", ["../../bob/refs/secret_week1", "a/b", "..", "", "a\\b", "x" * 200])
+def test_plan_ids_that_are_not_safe_path_components_are_rejected(tmp_path, monkeypatch, make_plan, plan_id):
+    monkeypatch.setattr(plan_tools, "plan_store", PlanStore(tmp_path / "plans"))
+    monkeypatch.setattr(plan_tools, "schedule_index", ScheduleIndex(tmp_path / "schedules"))
+    alice, bob = SimpleNamespace(user_id="alice"), SimpleNamespace(user_id="bob")
+    plan_tools.save_plan("Secret", "Day 1: Rest\n", notes="private", tool_context=bob)
+    plan_tools.save_plan("Run a 5k", "Day 1: Run\n", tool_context=alice)
+
+    for read in (plan_tools.plan_store.head, plan_tools.plan_store.history, plan_tools.plan_store.load):
+        with pytest.raises(ValueError):
+            read("alice", plan_id)
+    with pytest.raises(ValueError):
+        plan_tools.plan_store.save("alice", plan_id, make_plan())
+    # The model picks plan ids, so the tools treat a bad one as not found
+    assert "not found" in plan_tools.load_plan(plan_id or "?", tool_context=alice)
+    assert "not found" in plan_tools.get_plan_history(plan_id, tool_context=alice)
+    assert "not found" in plan_tools.rollback_plan(plan_id, 1, tool_context=alice)
+    assert len(plan_tools.plan_store.history("bob", "secret_week1")) == 1
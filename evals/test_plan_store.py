@@ -0,0 +1,109 @@
+"""Tests for the content-addressed, versioned plan store."""
+
+import json
+
+from momentum_agent.scheduling import ScheduleIndex
+from momentum_agent.storage import PlanStore, content_address
+from momentum_agent.storage.plan_store import MAX_DELTA_CHAIN, apply_delta, make_delta
+from momentum_agent.tools import plan_tools
+
+
+def object_files(tmp_path):
+    return list((tmp_path / "user" / "objects").rglob("*.json"))
+
+
+def test_delta_round_trip(plan_text):
+    edited = plan_text.replace("Day 3: 23 min", "Day 3: 30 min") + "Note: hydrate\n"
+    assert apply_delta(plan_text, make_delta(plan_text, edited)) == edited
+
+
+def test_identical_bodies_are_stored_once(tmp_path, make_plan):
+    store = PlanStore(tmp_path)
+    for week in range(1, 5):
+        store.save("user", f"run_a_5k_week{week}", make_plan(week=week))
+    store.save("user", "strength_week1", {**make_plan(), "goal_id": "strength"})
+
+    assert len(object_files(tmp_path)) == 1
+    assert len(store.list_plans("user")) == 5
+
+
+def test_edits_create_versions_stored_as_deltas(tmp_path, plan_text, make_plan):
+    store = PlanStore(tmp_path)
+    store.save("user", "run_a_5k_week1", make_plan())
+    edited = plan_text.replace("Day 5: 25 min", "Day 5: 28 min")
+    record = store.save("user", "run_a_5k_week1", make_plan(edited), message="Longer day 5")
+
+    assert record["version"] == 2 and record["parent"] == 1
+    delta = json.loads(next(p for p in object_files(tmp_path) if "delta" in p.read_text()).read_text())
+    assert delta["base"] == content_address(plan_text)
+
+    assert store.load("user", "run_a_5k_week1")["exercises_text"] == edited
+    assert store.load("user", "run_a_5k_week1", version=1)["exercises_text"] == plan_text
+    assert [v["message"] for v in store.history("user", "run_a_5k_week1")] == ["", "Longer day 5"]
+
+
+def test_resaving_unchanged_plan_is_a_no_op(tmp_path, make_plan):
+    store = PlanStore(tmp_path)
+    store.save("user", "run_a_5k_week1", make_plan())
+    assert store.save("user", "run_a_5k_week1", make_plan())["version"] == 1
+    assert store.save("user", "run_a_5k_week1", make_plan(status="active"))["version"] == 2
+
+
+def test_delta_chain_is_bounded(tmp_path, plan_text, make_plan):
+    store = PlanStore(tmp_path)
+    text = plan_text
+    for i in range(MAX_DELTA_CHAIN + 3):
+        text += f"Extra {i}\n"
+        store.save("user", "run_a_5k_week1", make_plan(text))
+
+    depths = [json.loads(p.read_text()).get("depth", 0) for p in object_files(tmp_path)]
+    assert max(depths) == MAX_DELTA_CHAIN
+    assert store.load("user", "run_a_5k_week1")["exercises_text"] == text
+
+
+def test_rollback_appends_a_version(tmp_path, plan_text, make_plan):
+    store = PlanStore(tmp_path)
+    store.save("user", "run_a_5k_week1", make_plan())
+    store.save("user", "run_a_5k_week1", make_plan(plan_text + "Day 8: Rest\n"))
+
+    record = store.rollback("user", "run_a_5k_week1", 1)
+    assert record["version"] == 3
+    assert store.load("user", "run_a_5k_week1")["exercises_text"] == plan_text
+    assert len(store.history("user", "run_a_5k_week1")) == 3
+    assert store.rollback("user", "run_a_5k_week1", 9) is None
+
+
+def test_legacy_files_are_imported(tmp_path, plan_text, make_plan):
+    user_dir = tmp_path / "user"
+    user_dir.mkdir()
+    (user_dir / "run_a_5k_week1.json").write_text(json.dumps(make_plan()))
+
+    store = PlanStore(tmp_path)
+    plan = store.load("user", "run_a_5k_week1")
+    assert plan["exercises_text"] == plan_text and plan["version"] == 1
+    assert (user_dir / "legacy" / "run_a_5k_week1.json").exists()
+    assert not (user_dir / "run_a_5k_week1.json").exists()
+
+
+def test_plan_tools_use_versioned_store(tmp_path, monkeypatch, plan_text):
+    monkeypatch.setattr(plan_tools, "plan_store", PlanStore(tmp_path / "plans"))
+    monkeypatch.setattr(plan_tools, "schedule_index", ScheduleIndex(tmp_path / "schedules"))
+
+    assert "version 1" in plan_tools.save_plan("Run a 5k", plan_text, week_number=2)
+    assert "version 2" in plan_tools.save_plan("Run a 5k", plan_text + "Day 8: Rest\n", week_number=2)
+    assert "Version: 2" in plan_tools.list_user_plans()
+    assert "Day 8: Rest" in plan_tools.get_current_week_plan(2)
+    assert "Version 2" in plan_tools.get_plan_history("run_a_5k_week2")
+
+    assert "saved as version 3" in plan_tools.rollback_plan("run_a_5k_week2", 1)
+    assert "Day 8: Rest" not in plan_tools.load_plan("run_a_5k_week2")
+
+
+def test_goals_with_punctuation_get_a_safe_plan_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(plan_tools, "plan_store", PlanStore(tmp_path / "plans"))
+    monkeypatch.setattr(plan_tools, "schedule_index", ScheduleIndex(tmp_path / "schedules"))
+
+    assert "run_5k___strength_week1" in plan_tools.save_plan("Run 5k / Strength", "Day 1: Run\n")
+    assert "run_a_5k_week2" in plan_tools.save_plan("Run a 5k", "Day 1: Run\n", week_number=2)
+    assert "plan_week1" in plan_tools.save_plan("¿?", "Day 1: Rest\n")
+    assert "Day 1: Run" in plan_tools.load_plan("run_5k___strength_week1")
@@ -0,0 +1,111 @@
+"""
+Tests for the cached prompt prefixes of the hub and instructor.
+
+Runs the real agents on CachedGemini against the local stand-in Gemini API, so
+no API key or network is needed.
+"""
+
+import pytest
+from google.adk.memory import InMemoryMemoryService
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from momentum_agent.hub import create_wellness_chief_agent
+from momentum_agent.prompt_cache import CachedGemini, PromptCache
+from momentum_agent.testing import COACHING_ROUTES
+from momentum_agent.testing.stub_gemini_api import create_stub_gemini_app, serve_in_thread
+
+
+@pytest.fixture
+def gemini_api(monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "offline")
+    api = create_stub_gemini_app(min_cache_tokens=1024, routes=COACHING_ROUTES)
+    with serve_in_thread(api) as base_url:
+        yield api, base_url
+
+
+def make_runner(base_url, cache, model="gemini-2.5-flash"):
+    agent = create_wellness_chief_agent(model=CachedGemini(model=model, base_url=base_url, prompt_cache=cache))
+    runner = Runner(
+        app_name="momentum",
+        agent=agent,
+        session_service=InMemorySessionService(),
+        memory_service=InMemoryMemoryService(),
+        auto_create_session=True,
+    )
+    return agent, runner
+
+
+async def turn(runner, text):
+    message = types.Content(role="user", parts=[types.Part(text=text)])
+    events = [e async for e in runner.run_async(user_id="u1", session_id="s1", new_message=message)]
+    return [e.custom_metadata["prompt_cache"] for e in events if e.custom_metadata]
+
+
+@pytest.mark.asyncio
+async def test_hub_and_instructor_share_cached_prefixes(gemini_api):
+    api, base_url = gemini_api
+    cache = PromptCache()
+    _, runner = make_runner(base_url, cache)
+
+    # hub -> InstructorAgent -> hub; the instructor's call is in the AgentTool's own session
+    calls = await turn(runner, "How do I squat?")
+    calls += await turn(runner, "Thanks")
+    assert [call["cache"] is not None for call in calls] == [True, True, True]
+    assert all(call["cached_tokens"] > 1024 and call["uncached_tokens"] < 200 for call in calls)
+
+    # One cache per agent, reused across turns; requests carry no prefix
+    assert len(api.state.caches) == 2
+    assert all(body["cachedContent"] and "systemInstruction" not in body for body in api.state.requests)
+    assert cache.stats.calls == 4 and cache.stats.cached_calls == 4
+    assert cache.stats.caches_created == 2
+
+
+@pytest.mark.asyncio
+async def test_prompt_change_replaces_cache(gemini_api):
+    api, base_url = gemini_api
+    cache = PromptCache()
+    agent, runner = make_runner(base_url, cache)
+    first = (await turn(runner, "hello"))[0]["cache"]
+
+    agent.instruction += "\nKeep answers under 100 words."
+    second = (await turn(runner, "hello"))[0]["cache"]
+    assert second != first
+    # The old cache is not deleted: calls on other runners may still be using it
+    assert set(api.state.caches) == {first, second}
+    assert (await turn(runner, "hello"))[0]["cache"] == second
+
+
+@pytest.mark.asyncio
+async def test_falls_back_when_cache_is_missing(gemini_api):
+    api, base_url = gemini_api
+    cache = PromptCache()
+    _, runner = make_runner(base_url, cache)
+    await turn(runner, "hello")
+
+    api.state.caches.clear()  # expired or deleted server-side
+    [call] = await turn(runner, "hello")
+    assert call["fallback"] and call["cache"] is None and call["cached_tokens"] == 0
+    [call] = await turn(runner, "hello")
+    assert call["cache"] in api.state.caches and not call["fallback"]
+
+
+@pytest.mark.asyncio
+async def test_prefix_the_api_rejects_as_too_small_is_sent_uncached(monkeypatch):
+    # A model whose minimum sits between the instructor's prefix and the hub's
+    monkeypatch.setenv("GOOGLE_API_KEY", "offline")
+    api = create_stub_gemini_app(min_cache_tokens=2048, routes=COACHING_ROUTES)
+    with serve_in_thread(api) as base_url:
+        cache = PromptCache()
+        _, runner = make_runner(base_url, cache)
+        await turn(runner, "How do I squat?")
+        assert cache.stats.calls == 3 and cache.stats.cached_calls == 2
+        assert len(api.state.caches) == 1
+        assert cache.stats.uncached_tokens > 1500  # the instructor sent its whole prefix
+
+        # The API's answer holds for that prefix: no second create attempt
+        creates = len(api.state.cache_requests)
+        await turn(runner, "How do I squat?")
+        assert len(api.state.cache_requests) == creates
+        assert cache.stats.calls == 6 and cache.stats.cached_calls == 4
@@ -0,0 +1,125 @@
+"""Tests for schedule expansion, the date index and .ics export."""
+
+from datetime import date, timedelta
+
+from momentum_agent.scheduling import ScheduleIndex, expand_plan, parse_days, schedule_to_ics
+from momentum_agent.storage import PlanStore
+from momentum_agent.tools import plan_tools, schedule_tools
+
+PROGRAM = """**Week 1: Base**
+Day 1: 20 min run
+Day 2: Rest
+Day 3: 20 min run
+
+**Week 2: Building Endurance**
+- Day 1: 25 min run
+- Day 3: 25 min run, easy pace; focus on breathing
+Saturday: Long walk
+
+Week 3:
+Day 1: 30 min run
+"""
+
+
+def make_plan(text=PROGRAM, week=1, length=2, start="2026-01-05"):
+    return {
+        "plan_id": f"run_a_5k_week{week}",
+        "goal_id": "run_a_5k",
+        "date": "2026-01-01",
+        "exercises_text": text,
+        "metadata": {"week_number": week, "program_length_weeks": length, "start_date": start},
+    }
+
+
+def test_parse_days_handles_week_headers_and_weekdays():
+    days = parse_days(PROGRAM, default_week=1)
+    assert days[0] == (1, 1, "20 min run")
+    assert (2, 3, "25 min run, easy pace; focus on breathing") in days
+    assert (2, -6, "Long walk") in days
+    assert parse_days("Day 2: Intervals", default_week=4) == [(4, 2, "Intervals")]
+
+
+def test_expand_plan_assigns_dates_within_program_length():
+    # 2026-01-05 is a Monday
+    workouts = {(w.week, w.day): w.date for w in expand_plan(make_plan())}
+    assert workouts[(1, 1)] == "2026-01-05"
+    assert workouts[(2, 3)] == "2026-01-14"
+    assert workouts[(2, 6)] == "2026-01-17"  # Saturday of week 2
+    assert all(week <= 2 for week, _ in workouts)
+
+
+def test_index_update_replaces_previous_dates(tmp_path):
+    index = ScheduleIndex(tmp_path)
+    index.update("user", make_plan())
+    assert index.on("user", date(2026, 1, 7))[0]["workout"] == "20 min run"
+
+    index.update("user", make_plan(text="Day 1: Bike 40 min\n"))
+    assert index.on("user", date(2026, 1, 7)) == []
+    assert index.on("user", date(2026, 1, 5))[0]["workout"] == "Bike 40 min"
+
+    # A fresh instance reads the persisted file
+    week = ScheduleIndex(tmp_path).week("user", date(2026, 1, 8))
+    assert list(week)[0] == "2026-01-05" and len(week) == 7
+
+
+def test_ics_export_skips_rest_days_and_folds_lines():
+    index = {"2026-01-05": [{"plan_id": "p", "week": 1, "day": 1, "workout": "Run " + "x" * 120}],
+             "2026-01-06": [{"plan_id": "p", "week": 1, "day": 2, "workout": "Rest"}]}
+    text, events = schedule_to_ics(index)
+
+    assert events == 1
+    assert text.count("BEGIN:VEVENT") == 1
+    assert "DTSTART;VALUE=DATE:20260105" in text
+    assert all(len(line.encode()) <= 75 for line in text.split("\r\n"))
+
+
+def test_schedule_tools_answer_from_index(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(plan_tools, "plan_store", PlanStore(tmp_path / "plans"))
+    monkeypatch.setattr(plan_tools, "schedule_index", ScheduleIndex(tmp_path / "schedules"))
+
+    assert "days scheduled from 2026-01-05" in plan_tools.save_plan(
+        "Run a 5k", PROGRAM, program_length_weeks=3, start_date="2026-01-05"
+    )
+    assert "20 min run" in schedule_tools.get_todays_workout("2026-01-07")
+    assert "Rest" in schedule_tools.get_todays_workout("2026-01-06")
+    assert "Nothing scheduled" in schedule_tools.get_todays_workout("2026-03-01")
+    assert "Long walk" in schedule_tools.get_week_schedule("2026-01-12")
+    assert "Invalid date" in schedule_tools.get_todays_workout("tomorrow")
+
+    # Week 2 of the same goal inherits the program start date
+    assert "from 2026-01-05" in plan_tools.save_plan("Run a 5k", "Day 1: Tempo run", week_number=2)
+    assert "Tempo run" in schedule_tools.get_todays_workout("2026-01-12")
+
+    assert "Exported" in schedule_tools.export_schedule_ics()
+    assert (tmp_path / "data" / "calendars" / "user.ics").read_text().count("BEGIN:VEVENT") >= 5
+
+
+def test_saving_a_plan_indexes_plans_saved_before_the_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(plan_tools, "plan_store", PlanStore(tmp_path / "plans"))
+    monkeypatch.setattr(plan_tools, "schedule_index", ScheduleIndex(tmp_path / "schedules"))
+    # Saved before schedule indexing existed, so no index file
+    plan_tools.plan_store.save("user", "run_a_5k_week1", {
+        "goal_id": "run_a_5k", "exercises_text": "Day 1: 20 min easy run",
+        "metadata": {"week_number": 1, "start_date": "2026-01-05"},
+    })
+
+    plan_tools.save_plan("Strength", "Day 2: Squats", start_date="2026-01-05")
+    assert "20 min easy run" in schedule_tools.get_todays_workout("2026-01-05")
+    assert "Squats" in schedule_tools.get_todays_workout("2026-01-06")
+
+
+def test_a_later_week_saved_on_its_own_starts_today(tmp_path, monkeypatch):
+    monkeypatch.setattr(plan_tools, "plan_store", PlanStore(tmp_path / "plans"))
+    monkeypatch.setattr(plan_tools, "schedule_index", ScheduleIndex(tmp_path / "schedules"))
+    today = date.today()
+
+    # No earlier week of the goal anchors the program, so week 3 is this week
+    message = plan_tools.save_plan("Run a 5k", "Day 1: Tempo run", week_number=3)
+    assert f"from {today - timedelta(weeks=2)}" in message
+    assert "Tempo run" in schedule_tools.get_todays_workout()
+
+    # Legacy plans without a start date are anchored on their save date the same way
+    plan = {"plan_id": "p", "date": "2026-01-19", "exercises_text": "Day 1: Swim",
+            "metadata": {"week_number": 3, "program_length_weeks": 4}}
+    assert [w.date for w in expand_plan(plan)] == ["2026-01-19"]
@@ -0,0 +1,126 @@
+"""
+Tests for the headless HTTP serving layer.
+
+Runs the real hub against the local StubLlm, so no API key or network is needed.
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+import httpx
+import pytest
+from google.adk.sessions import InMemorySessionService
+
+from momentum_agent.config import APP_NAME
+from momentum_agent.serving import build_pool, create_app
+from momentum_agent.testing import StubLlm
+
+
+def make_client(pool):
+    transport = httpx.ASGITransport(app=create_app(pool))
+    return httpx.AsyncClient(transport=transport, base_url="http://momentum")
+
+
+@pytest.mark.asyncio
+async def test_health_and_readiness():
+    pool = build_pool(model=StubLlm(), session_service=InMemorySessionService(), runners=2)
+    async with make_client(pool) as client:
+        assert (await client.get("/healthz")).json() == {"status": "ok"}
+        ready = await client.get("/readyz")
+        assert ready.status_code == 200
+        assert ready.json()["runners"] == 2
+
+        await pool.shutdown()
+        assert (await client.get("/readyz")).status_code == 503
+        rejected = await client.post("/run", json={"user_id": "u1", "message": "hi"})
+        assert rejected.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_run_keeps_session_across_turns():
+    pool = build_pool(model=StubLlm(), session_service=InMemorySessionService())
+    async with make_client(pool) as client:
+        first = (await client.post("/run", json={"user_id": "u1", "message": "hello"})).json()
+        assert first["text"] == "Stub reply: hello"
+
+        second = await client.post(
+            "/run", json={"user_id": "u1", "session_id": first["session_id"], "message": "again"}
+        )
+        assert second.json()["session_id"] == first["session_id"]
+
+    session = await pool.session_service.get_session(
+        app_name=APP_NAME, user_id="u1", session_id=first["session_id"]
+    )
+    assert len(session.events) == 4
+    await pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_run_sse_streams_partial_and_final_events():
+    pool = build_pool(model=StubLlm(), session_service=InMemorySessionService())
+    async with make_client(pool) as client:
+        response = await client.post("/run_sse", json={"user_id": "u1", "message": "hello there"})
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [
+        json.loads(line[len("data: "):])
+        for line in response.text.splitlines()
+        if line.startswith("data: ")
+    ]
+    assert any(event.get("partial") for event in events)
+    assert events[-1]["content"]["parts"][0]["text"] == "Stub reply: hello there"
+    await pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_overload_returns_429():
+    pool = build_pool(
+        model=StubLlm(latency=0.2),
+        session_service=InMemorySessionService(),
+        max_in_flight=1,
+        max_queue=1,
+    )
+    async with make_client(pool) as client:
+        responses = await asyncio.gather(
+            *[client.post("/run", json={"user_id": f"u{i}", "message": "hi"}) for i in range(3)]
+        )
+
+    codes = sorted(r.status_code for r in responses)
+    assert codes == [200, 200, 429]
+    rejected = next(r for r in responses if r.status_code == 429)
+    assert rejected.headers["Retry-After"] == "1"
+    await pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_shutdown_drains_memory_writes():
+    pool = build_pool(model=StubLlm(), session_service=InMemorySessionService())
+    async with make_client(pool) as client:
+        await client.post("/run", json={"user_id": "u1", "message": "my knee hurts"})
+
+    await pool.shutdown()
+    assert pool.stats()["pending_memory_writes"] == 0
+    found = await pool.runner_for("u1").memory_service.search_memory(
+        app_name=APP_NAME, user_id="u1", query="knee"
+    )
+    assert found.memories
+
+
+def test_building_a_pool_leaves_production_data_alone(tmp_path):
+    # A fresh interpreter, so momentum_agent.agent is not already imported
+    script = (
+        "import sys, pathlib\n"
+        "from google.adk.sessions import InMemorySessionService\n"
+        "import momentum_agent\n"
+        "from momentum_agent.serving import build_pool\n"
+        "from momentum_agent.testing import StubLlm\n"
+        "build_pool(model=StubLlm(), session_service=InMemorySessionService())\n"
+        "assert 'momentum_agent.agent' not in sys.modules\n"
+        "assert not pathlib.Path('data').exists()\n"
+        "assert momentum_agent.agent.root_agent is momentum_agent.root_agent\n"
+    )
+    env = {**os.environ, "MOMENTUM_DATA_DIR": str(tmp_path / "data"), "PYTHONPATH": os.getcwd()}
+    subprocess.run([sys.executable, "-c", script], cwd=tmp_path, env=env, check=True)
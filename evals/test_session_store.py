@@ -0,0 +1,106 @@
+"""Tests for the tuned SQLite session store."""
+
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+from google.adk.events import Event, EventActions
+from google.adk.sessions import DatabaseSessionService
+from google.genai import types
+from sqlalchemy import event, text
+
+from momentum_agent.storage import TunedSqliteSessionService
+
+
+def make_turn(turn: int) -> list[Event]:
+    call = types.FunctionCall(id=f"call-{turn}", name="list_user_plans", args={})
+    response = types.FunctionResponse(id=f"call-{turn}", name="list_user_plans", response={"result": "none"})
+    return [
+        Event(invocation_id=f"i{turn}", author="user",
+              content=types.Content(role="user", parts=[types.Part(text=f"turn {turn}")])),
+        Event(invocation_id=f"i{turn}", author="WellnessChiefAgent",
+              content=types.Content(role="model", parts=[types.Part(function_call=call)])),
+        Event(invocation_id=f"i{turn}", author="WellnessChiefAgent",
+              content=types.Content(role="user", parts=[types.Part(function_response=response)])),
+        Event(invocation_id=f"i{turn}", author="WellnessChiefAgent",
+              content=types.Content(role="model", parts=[types.Part(text=f"reply {turn}")]),
+              actions=EventActions(state_delta={"last_turn": turn, "user:turns": turn})),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_turn_is_written_in_one_transaction(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'sessions.db'}"
+    service = TunedSqliteSessionService(db_url=url)
+    session = await service.create_session(app_name="momentum", user_id="u1")
+    commits = []
+    event.listen(service.db_engine.sync_engine, "commit", lambda connection: commits.append(1))
+
+    events = make_turn(1)
+    for e in events[:3]:
+        await service.append_event(session, e)
+    assert len(session.events) == 3 and commits == []  # buffered until the final reply
+    await service.append_event(session, events[3])
+    assert len(commits) == 1
+
+    # A session that is read mid-turn sees the buffered events
+    for e in make_turn(2)[:2]:
+        await service.append_event(session, e)
+    loaded = await service.get_session(app_name="momentum", user_id="u1", session_id=session.id)
+    assert len(loaded.events) == 6
+    assert loaded.state == {"last_turn": 1, "user:turns": 1}
+    await service.close()
+
+    # The plain service reads what the tuned one wrote
+    plain = DatabaseSessionService(db_url=url)
+    loaded = await plain.get_session(app_name="momentum", user_id="u1", session_id=session.id)
+    assert [e.content.parts[0].text for e in loaded.events if e.content.parts[0].text] == ["turn 1", "reply 1", "turn 2"]
+    await plain.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_sessions_and_indexed_listing(tmp_path):
+    service = TunedSqliteSessionService(db_url=f"sqlite+aiosqlite:///{tmp_path / 'sessions.db'}", pool_size=4)
+    sessions = [await service.create_session(app_name="momentum", user_id=f"u{i % 4}") for i in range(16)]
+
+    async def converse(session):
+        for turn in range(3):
+            session = await service.get_session(app_name="momentum", user_id=session.user_id, session_id=session.id)
+            for e in make_turn(turn):
+                await service.append_event(session, e)
+
+    await asyncio.gather(*[converse(session) for session in sessions])
+    listed = (await service.list_sessions(app_name="momentum", user_id="u1")).sessions
+    assert len(listed) == 4
+    assert await service.get_user_state(app_name="momentum", user_id="u1") == {"turns": 2}
+    loaded = await service.get_session(app_name="momentum", user_id="u1", session_id=listed[0].id)
+    assert len(loaded.events) == 12
+
+    async with service.db_engine.connect() as connection:
+        assert (await connection.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+        plan = (await connection.execute(text(
+            "EXPLAIN QUERY PLAN SELECT * FROM sessions WHERE app_name = 'momentum' AND user_id = 'u1' "
+            "ORDER BY update_time, user_id, id"
+        ))).all()
+    assert "idx_sessions_app_user_update" in plan[0][-1] and "TEMP B-TREE" not in str(plan)
+    await service.close()
+
+
+def test_other_adk_releases_fall_back_to_the_plain_session_service(tmp_path):
+    # Stand in for a google-adk release without the internals session_store needs
+    script = (
+        "import logging\n"
+        "from google.adk.sessions import DatabaseSessionService\n"
+        "del DatabaseSessionService._get_schema_classes\n"
+        "logging.basicConfig()\n"
+        "from momentum_agent.config import create_session_service\n"
+        "from momentum_agent.tools import plan_tools\n"
+        f"service = create_session_service('sqlite+aiosqlite:///{tmp_path / 'sessions.db'}')\n"
+        "print(type(service).__name__)\n"
+    )
+    out = subprocess.run([sys.executable, "-c", script], env={**os.environ, "PYTHONPATH": os.getcwd()},
+                         cwd=tmp_path, check=True, capture_output=True, text=True)
+    assert out.stdout.strip() == "DatabaseSessionService"
+    assert "Using the untuned DatabaseSessionService" in out.stderr
@@ -0,0 +1,145 @@
+"""Tests for the sharded deployment: hash ring, router and rebalancing."""
+
+import os
+import subprocess
+import sys
+
+import httpx
+import pytest
+from google.adk.events import Event
+from google.adk.sessions import DatabaseSessionService, InMemorySessionService
+from google.genai import types
+
+from momentum_agent.config import APP_NAME, DB_PATH, plan_store_url
+from momentum_agent.serving import build_pool, create_app
+from momentum_agent.serving.rebalance import rebalance
+from momentum_agent.serving.sharding import HashRing, create_router, shard_names, start_workers
+from momentum_agent.storage import PlanStore, open_backend
+from momentum_agent.testing import StubLlm
+
+USERS = [f"user-{i}" for i in range(40)]
+
+
+def test_ring_moves_only_users_of_the_new_shard():
+    before, after = HashRing(shard_names(4)), HashRing(shard_names(5))
+    users = [f"user-{i}" for i in range(2000)]
+    moved = [user for user in users if before.node_for(user) != after.node_for(user)]
+
+    assert all(after.node_for(user) == "shard-4" for user in moved)
+    assert 0.1 < len(moved) / len(users) < 0.3
+    assert len({before.node_for(user) for user in users}) == 4
+
+
+@pytest.mark.asyncio
+async def test_router_pins_users_to_their_shard():
+    pools = {shard: build_pool(model=StubLlm(), session_service=InMemorySessionService(), runners=1)
+             for shard in shard_names(2)}
+    workers = {shard: f"http://{shard}" for shard in pools}
+    upstream = httpx.AsyncClient(mounts={
+        url: httpx.ASGITransport(app=create_app(pools[shard])) for shard, url in workers.items()
+    })
+    router = create_router(workers, client=upstream)
+    ring = router.state.ring
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=router), base_url="http://router") as client:
+        for user in USERS[:6]:
+            first = await client.post("/run", json={"user_id": user, "message": "hello"})
+            assert first.headers["x-shard"] == ring.node_for(user)
+            second = await client.post(
+                "/run", json={"user_id": user, "session_id": first.json()["session_id"], "message": "again"}
+            )
+            assert second.json()["text"] == "Stub reply: again"
+
+            owner = pools[ring.node_for(user)].session_service
+            listed = await owner.list_sessions(app_name=APP_NAME, user_id=user)
+            assert len(listed.sessions) == 1
+
+        assert (await client.post("/run", json={"message": "hi"})).status_code == 422
+        ready = (await client.get("/readyz")).json()
+        assert ready["ready"] and set(ready["shards"]) == set(workers)
+
+    await upstream.aclose()
+    for pool in pools.values():
+        await pool.shutdown()
+
+
+def open_plans(data_dir, shard, plan_store):
+    return PlanStore(open_backend(plan_store_url(data_dir / shard, plan_store)))
+
+
+async def seed_shards(data_dir, ring, plan_store, make_plan):
+    """Give every user a plan with two versions and one session with a message on its owner shard."""
+    for shard in ring.nodes:
+        (data_dir / shard).mkdir(parents=True)
+    services = {shard: DatabaseSessionService(db_url=f"sqlite+aiosqlite:///{data_dir / shard / DB_PATH.name}")
+                for shard in ring.nodes}
+    stores = {shard: open_plans(data_dir, shard, plan_store) for shard in ring.nodes}
+    for user in USERS:
+        shard = ring.node_for(user)
+        stores[shard].save(user, "run_a_5k_week1", make_plan())
+        stores[shard].save(user, "run_a_5k_week1", make_plan(f"Day 1: {user}\n"))
+        session = await services[shard].create_session(app_name=APP_NAME, user_id=user, state={"goal": user})
+        content = types.Content(role="user", parts=[types.Part(text=f"hi from {user}")])
+        await services[shard].append_event(session, Event(author="user", content=content))
+    for service in services.values():
+        await service.close()
+    for store in stores.values():
+        store.backend.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("plan_store", ["file", "sqlite"])
+async def test_rebalance_moves_plans_and_sessions(tmp_path, plan_store, make_plan):
+    await seed_shards(tmp_path, HashRing(shard_names(2)), plan_store, make_plan)
+    new_ring = HashRing(shard_names(3))
+    expected = {user for user in USERS if new_ring.node_for(user) == "shard-2"}
+
+    planned, total = await rebalance(tmp_path, 3, dry_run=True, plan_store=plan_store)
+    assert total == len(USERS) and {move.user_id for move in planned} == expected
+    assert not (tmp_path / "shard-2").exists()
+
+    moves, _ = await rebalance(tmp_path, 3, plan_store=plan_store)
+    assert {move.user_id for move in moves} == expected
+    assert all(move.sessions == 1 for move in moves)
+
+    plans = {shard: open_plans(tmp_path, shard, plan_store) for shard in shard_names(3)}
+    assert set(plans["shard-2"].backend.list_users()) == expected
+    assert not expected & {user for shard in ("shard-0", "shard-1") for user in plans[shard].backend.list_users()}
+    service = DatabaseSessionService(db_url=f"sqlite+aiosqlite:///{tmp_path / 'shard-2' / DB_PATH.name}")
+    for user in expected:
+        assert plans["shard-2"].load(user, "run_a_5k_week1")["exercises_text"] == f"Day 1: {user}\n"
+        assert len(plans["shard-2"].history(user, "run_a_5k_week1")) == 2
+        listed = await service.list_sessions(app_name=APP_NAME, user_id=user)
+        session = await service.get_session(app_name=APP_NAME, user_id=user, session_id=listed.sessions[0].id)
+        assert session.state["goal"] == user
+        assert session.events[0].content.parts[0].text == f"hi from {user}"
+    await service.close()
+    for store in plans.values():
+        store.backend.close()
+
+    # Everyone is now on their owner, so a second run is a no-op
+    assert (await rebalance(tmp_path, 3, plan_store=plan_store))[0] == []
+
+
+def test_shard_data_dir_holds_sessions_and_plans(tmp_path):
+    # Module constants are read at import, so check them in a fresh interpreter
+    script = (
+        "from momentum_agent.config import DB_PATH, PLAN_STORE_URL\n"
+        "from momentum_agent.scheduling import CALENDARS_DIR, SCHEDULES_DIR\n"
+        "print(DB_PATH.parent, PLAN_STORE_URL, SCHEDULES_DIR.parent, CALENDARS_DIR.parent)\n"
+    )
+    shard = tmp_path / "shard-0"
+    env = {**os.environ, "MOMENTUM_DATA_DIR": str(shard), "PYTHONPATH": os.getcwd()}
+    out = subprocess.run([sys.executable, "-c", script], env=env, check=True, capture_output=True, text=True)
+    assert out.stdout.split() == [str(shard), f"file:{shard / 'plans'}", str(shard), str(shard)]
+
+
+def test_workers_keep_plans_in_their_shard_directory(tmp_path, monkeypatch):
+    spawned = []
+    monkeypatch.setattr(subprocess, "Popen", lambda args, env: spawned.append(env))
+    start_workers(2, data_dir=tmp_path, worker_args=(), plan_store="sqlite")
+    assert [env["MOMENTUM_PLAN_STORE"] for env in spawned] == [
+        f"sqlite:{tmp_path.resolve() / shard / 'plans.db'}" for shard in shard_names(2)
+    ]
+    with pytest.raises(ValueError):
+        start_workers(2, data_dir=tmp_path, plan_store="firestore")
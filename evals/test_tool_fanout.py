@@ -0,0 +1,141 @@
+"""Tests for concurrent tool and spoke calls in the hub."""
+
+import asyncio
+import gc
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from google.adk.memory import InMemoryMemoryService
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from momentum_agent.hub import create_wellness_chief_agent
+from momentum_agent.storage import PlanStore
+from momentum_agent.testing import COACHING_ROUTES, StubLlm
+from momentum_agent.tools import plan_tools
+from momentum_agent.tools.concurrency import TOOL_THREADS, ReadWriteLock, _user_locks, in_worker_thread
+
+MESSAGE = "What plans have I saved? How do I squat? How do I do a lunge?"
+
+
+@pytest.fixture(autouse=True)
+def plans_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(plan_tools, "plan_store", PlanStore(tmp_path / "plans"))
+
+
+async def run_turn(agent, text=MESSAGE):
+    runner = Runner(
+        app_name="momentum",
+        agent=agent,
+        session_service=InMemorySessionService(),
+        memory_service=InMemoryMemoryService(),
+        auto_create_session=True,
+    )
+    message = types.Content(role="user", parts=[types.Part(text=text)])
+    events = [e async for e in runner.run_async(user_id="u1", session_id="s1", new_message=message)]
+    await runner.close()
+    [responses] = [e.get_function_responses() for e in events if e.get_function_responses()]
+    return responses, events[-1]
+
+
+@pytest.mark.asyncio
+async def test_independent_calls_run_concurrently_in_call_order():
+    model = StubLlm(latency=0.05, routes=COACHING_ROUTES, parallel_calls=True)
+    agent = create_wellness_chief_agent(model=model)
+    responses, final = await run_turn(agent)
+
+    # One response per call, merged in the order the model made the calls
+    assert [r.name for r in responses] == ["list_user_plans", "InstructorAgent", "InstructorAgent"]
+    assert "No saved plans" in responses[0].response["result"]
+    assert "squat" in responses[1].response["result"] and "lunge" in responses[2].response["result"]
+    assert final.content.parts[0].text == "Done: list_user_plans, InstructorAgent, InstructorAgent."
+    assert agent.tools[0].limiter.stats.peak_in_flight == 3
+
+    agent = create_wellness_chief_agent(model=model, max_concurrent_calls=2)
+    await run_turn(agent)
+    assert agent.tools[0].limiter.stats.peak_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_slow_spoke_times_out_without_failing_the_turn():
+    model = StubLlm(latency=0.3, routes=COACHING_ROUTES, parallel_calls=True)
+    agent = create_wellness_chief_agent(model=model, spoke_timeout_seconds=0.1)
+    responses, final = await run_turn(agent)
+
+    assert "No saved plans" in responses[0].response["result"]
+    assert all("did not finish within 0.1 seconds" in r.response["error"] for r in responses[1:])
+    assert final.content.parts[0].text.startswith("Done:")
+    assert agent.tools[0].limiter.stats.timeouts == 2
+
+
+@pytest.mark.asyncio
+async def test_calls_queued_behind_a_hung_call_do_not_hold_worker_threads():
+    hung = threading.Event()
+    slow = in_worker_thread(lambda tool_context=None: hung.wait(5) and "slow")
+    fast = in_worker_thread(lambda tool_context=None: "fast")
+    alice, bob = SimpleNamespace(user_id="alice"), SimpleNamespace(user_id="bob")
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(slow(tool_context=alice), 0.05)
+    # alice's next calls wait for the hung one on the loop; other users are unaffected
+    waiting = [asyncio.ensure_future(fast(tool_context=alice)) for _ in range(TOOL_THREADS * 2)]
+    assert await asyncio.wait_for(fast(tool_context=bob), 1) == "fast"
+    await asyncio.sleep(0.05)
+    assert not any(w.done() for w in waiting)
+
+    hung.set()
+    assert await asyncio.gather(*waiting) == ["fast"] * len(waiting)
+    del waiting
+    gc.collect()
+    assert "alice" not in _user_locks and "bob" not in _user_locks
+
+
+@pytest.mark.asyncio
+async def test_storage_reads_of_one_turn_overlap(monkeypatch):
+    in_flight, peak = [0], [0]
+    guard = threading.Lock()
+
+    def slow(read):
+        def call(*args, **kwargs):
+            with guard:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.1)
+            try:
+                return read(*args, **kwargs)
+            finally:
+                with guard:
+                    in_flight[0] -= 1
+        return call
+
+    monkeypatch.setattr(plan_tools.plan_store, "list_plans", slow(plan_tools.plan_store.list_plans))
+    monkeypatch.setattr(plan_tools.schedule_index, "week", slow(plan_tools.schedule_index.week))
+    model = StubLlm(routes=COACHING_ROUTES, parallel_calls=True)
+    agent = create_wellness_chief_agent(model=model)
+    responses, _ = await run_turn(agent, "What plans have I saved? What's on this week?")
+
+    assert [r.name for r in responses] == ["list_user_plans", "get_week_schedule"]
+    assert peak[0] == 2
+
+
+@pytest.mark.asyncio
+async def test_writes_wait_for_reads_and_hold_off_later_reads():
+    lock = ReadWriteLock()
+    await lock.acquire(False)
+    await lock.acquire(False)
+    writer = asyncio.ensure_future(lock.acquire(True))
+    reader = asyncio.ensure_future(lock.acquire(False))
+    await asyncio.sleep(0)
+    assert not writer.done() and not reader.done()
+
+    lock.release(False)
+    lock.release(False)
+    await asyncio.sleep(0)
+    assert writer.done() and not reader.done()
+    lock.release(True)
+    await asyncio.sleep(0)
+    assert reader.done()
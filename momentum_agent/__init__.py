@@ -1,5 +1,15 @@
+import importlib
+
 from .hub import create_wellness_chief_agent
-from .agent import root_agent
 
 __all__ = ["create_wellness_chief_agent", "root_agent"]
 
+
+def __getattr__(name):
+    # The root agent is built on first access (adk web, AgentEvaluator), not on
+    # import: momentum_agent.agent loads .env, creates data/ and opens the
+    # session database, which the serving layer and tests must not touch.
+    if name in ("agent", "root_agent"):
+        agent = importlib.import_module(f"{__name__}.agent")
+        return agent if name == "agent" else agent.root_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
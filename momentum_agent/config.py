@@ -1,10 +1,89 @@
-"""Shared configuration for agents."""
+"""
+Shared configuration for agents.
 
+Importing this module has no side effects (no .env loading, directories or
+database connections), so the serving layer, tests and benchmarks can use
+it without touching the production data.
+"""
+
+import logging
+import os
+from pathlib import Path
+
+from google.adk import Runner
+from google.adk.agents import BaseAgent
+from google.adk.memory import BaseMemoryService
+from google.adk.sessions import BaseSessionService, DatabaseSessionService
 from google.genai import types
 
+logger = logging.getLogger(__name__)
+
+APP_NAME = "momentum"
+
 RETRY_CONFIG = types.HttpRetryOptions(
     attempts=5,
     exp_base=7,
     initial_delay=1,
     http_status_codes=[429, 500, 503, 504],
 )
+
+# Root for persisted data (session DB, plans, schedules, calendars), relative
+# to the working directory (the project root for `adk web`). This is the only
+# place it is defined; sharded deployments point each worker process at its
+# own shard directory.
+DATA_DIR_ENV = "MOMENTUM_DATA_DIR"
+DATA_DIR = Path(os.environ.get(DATA_DIR_ENV, "data"))
+
+# Where a file or sqlite plan store lives inside a data directory
+PLAN_STORE_LOCATIONS = {"file": "plans", "sqlite": "plans.db"}
+
+
+def plan_store_url(data_dir: Path, scheme: str = "file") -> str:
+    """URL of the `scheme` plan store kept inside `data_dir` (file or sqlite)."""
+    if scheme not in PLAN_STORE_LOCATIONS:
+        raise ValueError(f"Only file and sqlite plan stores live in a data directory, not '{scheme}'")
+    return f"{scheme}:{Path(data_dir) / PLAN_STORE_LOCATIONS[scheme]}"
+
+
+# Plan storage backend URL: file:DIR, sqlite:FILE or firestore:PROJECT
+# (see momentum_agent.storage.backend)
+PLAN_STORE_ENV = "MOMENTUM_PLAN_STORE"
+PLAN_STORE_URL = os.environ.get(PLAN_STORE_ENV, plan_store_url(DATA_DIR))
+
+# Gemini API endpoint override, e.g. a local stand-in
+# (python -m momentum_agent.testing.stub_gemini_api) for offline runs
+MODEL_BASE_URL = os.environ.get("MOMENTUM_MODEL_BASE_URL")
+
+# Session database used by `adk web` and the serving layer
+DB_PATH = DATA_DIR / "wellness_sessions.db"
+DB_URL = f"sqlite+aiosqlite:///{DB_PATH}"
+
+
+def create_session_service(db_url: str = DB_URL) -> BaseSessionService:
+    """
+    Session service for the SQLite database at `db_url`.
+
+    Uses TunedSqliteSessionService, which relies on DatabaseSessionService
+    internals of the tested google-adk release (see requirements.txt); on any
+    other release it falls back to a plain DatabaseSessionService.
+    """
+    try:
+        from .storage.session_store import TunedSqliteSessionService
+        return TunedSqliteSessionService(db_url=db_url)
+    except (ImportError, RuntimeError) as e:
+        logger.warning("Using the untuned DatabaseSessionService: %s", e)
+        return DatabaseSessionService(db_url=db_url)
+
+
+def create_runner(
+    agent: BaseAgent,
+    session_service: BaseSessionService,
+    memory_service: BaseMemoryService,
+) -> Runner:
+    """Create a Runner for the Momentum app around the given services."""
+    return Runner(
+        agent=agent,
+        app_name=APP_NAME,
+        session_service=session_service,
+        memory_service=memory_service
+    )
@@ -11,21 +11,37 @@ Key Responsibilities:
 - Delegate exercise instruction questions to InstructorAgent
 - Provide encouraging, professional coaching guidance
 
-Architecture: Hub-and-Spoke with Agent Tools
-Session Management: InMemorySessionService (will migrate to Database in Phase 4)
+Architecture: Hub-and-Spoke with Agent Tools; independent tool and spoke calls
+in one model response run concurrently (see tools/concurrency.py)
+Session Management: TunedSqliteSessionService (SQLite, see storage/session_store.py)
 """
 
+from typing import Optional
 from google.adk.agents import LlmAgent
-from google.adk.models import Gemini
+from google.adk.models import BaseLlm
 from google.adk.tools import AgentTool, preload_memory
 from .prompts import WELLNESS_CHIEF_PROMPT
-from .config import RETRY_CONFIG
+from .config import MODEL_BASE_URL, RETRY_CONFIG
+from .prompt_cache import CachedGemini
 from .spokes.instructor import create_instructor_agent
+from .tools.concurrency import (
+    MAX_CONCURRENT_CALLS,
+    SPOKE_TIMEOUT_SECONDS,
+    TOOL_TIMEOUT_SECONDS,
+    run_concurrently,
+)
 from .tools.plan_tools import (
     save_plan_tool,
     load_plan_tool,
     get_current_week_plan_tool,
-    list_user_plans_tool
+    list_user_plans_tool,
+    get_plan_history_tool,
+    rollback_plan_tool,
+)
+from .tools.schedule_tools import (
+    get_todays_workout_tool,
+    get_week_schedule_tool,
+    export_schedule_ics_tool,
 )
 
 
@@ -36,21 +52,53 @@ async def auto_save_to_memory(callback_context):
     )
 
 
-def create_wellness_chief_agent() -> LlmAgent:
-    instructor_agent = create_instructor_agent()
+def create_wellness_chief_agent(
+    model: Optional[BaseLlm] = None,
+    max_concurrent_calls: int = MAX_CONCURRENT_CALLS,
+    tool_timeout_seconds: float = TOOL_TIMEOUT_SECONDS,
+    spoke_timeout_seconds: float = SPOKE_TIMEOUT_SECONDS,
+    concurrent_tools: bool = True,
+) -> LlmAgent:
+    """
+    Create the WellnessChiefAgent hub with its spokes and tools.
+
+    Args:
+        model: Model used by the hub and its spokes. Defaults to Gemini 2.5 Flash
+            with its static prompt prefix cached (see prompt_cache);
+            tests and load runs pass a local stub model instead.
+        max_concurrent_calls: Tool and spoke calls of one turn that run at once.
+        tool_timeout_seconds: Timeout for a plan or schedule tool call.
+        spoke_timeout_seconds: Timeout for a spoke call.
+        concurrent_tools: Run tools through run_concurrently; False runs the
+            synchronous tools on the event loop with no cap or timeouts.
+    """
+    instructor_agent = create_instructor_agent(model=model)
+    tools = [
+        AgentTool(agent=instructor_agent),
+        preload_memory,
+        save_plan_tool,
+        load_plan_tool,
+        get_current_week_plan_tool,
+        list_user_plans_tool,
+        get_plan_history_tool,
+        rollback_plan_tool,
+        get_todays_workout_tool,
+        get_week_schedule_tool,
+        export_schedule_ics_tool,
+    ]
+    if concurrent_tools:
+        tools = run_concurrently(
+            tools,
+            max_concurrent_calls=max_concurrent_calls,
+            tool_timeout_seconds=tool_timeout_seconds,
+            spoke_timeout_seconds=spoke_timeout_seconds,
+        )
 
     return LlmAgent(
         name="WellnessChiefAgent",
         description="Main wellness coaching agent that creates personalized workout plans and provides exercise instruction",
-        model=Gemini(model="gemini-2.5-flash", retry_options=RETRY_CONFIG),
+        model=model or CachedGemini(model="gemini-2.5-flash", base_url=MODEL_BASE_URL, retry_options=RETRY_CONFIG),
         instruction=WELLNESS_CHIEF_PROMPT,
-        tools=[
-            AgentTool(agent=instructor_agent),
-            preload_memory,
-            save_plan_tool,
-            load_plan_tool,
-            get_current_week_plan_tool,
-            list_user_plans_tool,
-        ],
+        tools=tools,
         after_agent_callback=auto_save_to_memory,
     )
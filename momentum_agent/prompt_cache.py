@@ -0,0 +1,276 @@
+"""
+Cached-content prefixes for the agents' static prompts.
+
+Every hub and instructor call resends the same system instruction and tool
+schemas ahead of a comparatively short conversation. CachedGemini moves that
+static prefix into a Gemini cached-content resource, created on first use and
+shared by every session in the process, so each call only sends the
+conversation and the prefix is billed at the cached-token rate.
+
+- The prefix is fingerprinted (model, system instruction, tools, tool config).
+  When an agent's prompt or tools change, a new cache is created and the
+  agent's previous cache is dropped but not deleted: calls on other pooled
+  runners may still be using it, so it is left to expire with its TTL.
+  Caches are also recreated shortly before their TTL runs out.
+- The API decides whether a prefix is large enough to cache: one it rejects as
+  too small is sent uncached from then on, other failed creates back off
+  before retrying, and a call whose cache has disappeared server-side is
+  retried once without it.
+- Each call's prompt tokens are split into cached and uncached, attached to the
+  response as custom_metadata["prompt_cache"] (so they are stored with the
+  session event) and totalled in PromptCache.stats.
+
+ADK's own context caching (App.context_cache_config) is per session and only
+starts on a session's second call; it never reaches agents run through
+AgentTool, which get a fresh session per call.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import AsyncGenerator, Optional
+
+from google.adk.models import Gemini, LlmRequest, LlmResponse
+from google.genai import Client, errors, types
+from pydantic import Field
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 3600
+# Recreate a cache this long before it expires, so calls never race its expiry
+REFRESH_MARGIN_SECONDS = 60
+# After a failed create, send the prefix uncached this long before trying again
+CREATE_BACKOFF_SECONDS = 60
+# ADK labels each request with the calling agent (stripped before sending)
+AGENT_LABEL = "adk_agent_name"
+
+
+def _prefix(config: types.GenerateContentConfig) -> dict:
+    return config.model_dump(mode="json", include={"system_instruction", "tools", "tool_config"}, exclude_none=True)
+
+
+def prefix_fingerprint(model: str, config: types.GenerateContentConfig) -> str:
+    """Stable hash of the static request prefix."""
+    data = json.dumps({"model": model, **_prefix(config)}, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode()).hexdigest()[:16]
+
+
+def _is_too_small(error: Exception) -> bool:
+    """Whether a failed cache create was rejected for being below the model's minimum size."""
+    message = str(error).lower()
+    return isinstance(error, errors.APIError) and error.code == 400 and (
+        "too small" in message or "min_total_token_count" in message
+    )
+
+
+def _is_cache_error(error: errors.APIError) -> bool:
+    """Whether an API error means the cached content itself is unusable."""
+    return error.code in (400, 403, 404) and "cachedcontent" in str(error).lower().replace(" ", "")
+
+
+@dataclass
+class CacheEntry:
+    """A live cached-content resource for one prefix fingerprint."""
+
+    name: str
+    fingerprint: str
+    expire_time: float
+
+
+@dataclass
+class PromptCacheStats:
+    """Running totals across all calls through a PromptCache."""
+
+    calls: int = 0
+    cached_calls: int = 0
+    fallbacks: int = 0
+    caches_created: int = 0
+    cached_tokens: int = 0
+    uncached_tokens: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class PromptCache:
+    """
+    Process-wide registry of prefix caches, keyed by fingerprint.
+
+    Shared by every CachedGemini instance (the default), so the pooled runners'
+    copies of an agent all use one cache per prompt version.
+
+    Args:
+        ttl_seconds: Lifetime requested for each cache.
+        enabled: When False every call is sent uncached (accounting still runs).
+    """
+
+    def __init__(self, ttl_seconds: int = DEFAULT_TTL_SECONDS, enabled: bool = True):
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.stats = PromptCacheStats()
+        self._entries: dict[str, CacheEntry] = {}
+        self._agent_fingerprints: dict[str, str] = {}
+        self._retry_after: dict[str, float] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    async def acquire(self, client: Client, llm_request: LlmRequest) -> Optional[CacheEntry]:
+        """
+        Return a live cache for the request's static prefix, creating or
+        refreshing it if needed; None means send the request uncached.
+        """
+        config = llm_request.config
+        model = llm_request.model
+        if not self.enabled or not model or config.cached_content:
+            return None
+        if not (config.system_instruction or config.tools):
+            return None
+
+        fingerprint = prefix_fingerprint(model, config)
+        agent = (config.labels or {}).get(AGENT_LABEL)
+        if agent and self._agent_fingerprints.get(agent, fingerprint) != fingerprint:
+            self.retire(self._agent_fingerprints[agent])
+        if agent:
+            self._agent_fingerprints[agent] = fingerprint
+
+        entry = self._entries.get(fingerprint)
+        if entry and time.time() < entry.expire_time - REFRESH_MARGIN_SECONDS:
+            return entry
+        if time.time() < self._retry_after.get(fingerprint, 0.0):
+            return None
+
+        async with self._locks.setdefault(fingerprint, asyncio.Lock()):
+            current = self._entries.get(fingerprint)
+            if current is not entry or time.time() < self._retry_after.get(fingerprint, 0.0):
+                return current  # a concurrent call already refreshed it (or failed to)
+            # A replaced cache is left to expire: calls in flight may still use it
+            return await self._create(client, model, config, fingerprint)
+
+    async def _create(
+        self, client: Client, model: str, config: types.GenerateContentConfig, fingerprint: str
+    ) -> Optional[CacheEntry]:
+        try:
+            cached = await client.aio.caches.create(
+                model=model,
+                config=types.CreateCachedContentConfig(
+                    system_instruction=config.system_instruction,
+                    tools=config.tools,
+                    tool_config=config.tool_config,
+                    ttl=f"{self.ttl_seconds}s",
+                    display_name=f"momentum-{fingerprint}",
+                ),
+            )
+        except Exception as e:
+            self._entries.pop(fingerprint, None)
+            if _is_too_small(e):
+                # The fingerprint covers the whole prefix, so the answer never changes
+                logger.info("Prompt prefix %s is below %s's minimum cache size: %s", fingerprint, model, e)
+                self._retry_after[fingerprint] = float("inf")
+                return None
+            logger.warning("Prompt cache creation failed, sending uncached: %s", e)
+            self._retry_after[fingerprint] = time.time() + CREATE_BACKOFF_SECONDS
+            return None
+
+        expire_time = cached.expire_time
+        entry = CacheEntry(
+            name=cached.name,
+            fingerprint=fingerprint,
+            expire_time=(
+                expire_time.timestamp() if isinstance(expire_time, datetime)
+                else time.time() + self.ttl_seconds
+            ),
+        )
+        self._entries[fingerprint] = entry
+        self.stats.caches_created += 1
+        logger.info("Created prompt cache %s for prefix %s", entry.name, fingerprint)
+        return entry
+
+    def retire(self, fingerprint: str) -> None:
+        """
+        Stop handing out the cache for a prefix that has been replaced.
+
+        The cache itself is not deleted: calls already sent with it may still
+        be running on other runners, so it is left to expire with its TTL.
+        """
+        self._entries.pop(fingerprint, None)
+
+    def invalidate(self, entry: CacheEntry) -> None:
+        """Forget a cache the server no longer has; the next call recreates it."""
+        if self._entries.get(entry.fingerprint) is entry:
+            del self._entries[entry.fingerprint]
+
+    def record(self, usage: Optional[types.GenerateContentResponseUsageMetadata],
+               entry: Optional[CacheEntry], fallback: bool = False) -> dict:
+        """Account one model call; returns its per-call breakdown."""
+        prompt_tokens = (usage.prompt_token_count or 0) if usage else 0
+        cached_tokens = (usage.cached_content_token_count or 0) if usage else 0
+        call = {
+            "cache": entry.name if entry else None,
+            "cached_tokens": cached_tokens,
+            "uncached_tokens": prompt_tokens - cached_tokens,
+            "fallback": fallback,
+        }
+        self.stats.calls += 1
+        self.stats.cached_calls += bool(cached_tokens)
+        self.stats.fallbacks += fallback
+        self.stats.cached_tokens += cached_tokens
+        self.stats.uncached_tokens += prompt_tokens - cached_tokens
+        return call
+
+
+prompt_cache = PromptCache()
+
+
+class CachedGemini(Gemini):
+    """
+    Gemini model that serves its static prompt prefix from a shared cache.
+
+    A drop-in replacement for `Gemini`; requests whose prefix cannot be cached
+    go out exactly as `Gemini` would send them.
+
+    Attributes:
+        prompt_cache: Cache registry to use (defaults to the process-wide one).
+    """
+
+    prompt_cache: PromptCache = Field(default_factory=lambda: prompt_cache, exclude=True)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        cache = self.prompt_cache
+        entry = await cache.acquire(self.api_client, llm_request)
+        if entry is None:
+            async for response in super().generate_content_async(llm_request, stream):
+                yield self._account(response, None)
+            return
+
+        config = llm_request.config
+        prefix = config.system_instruction, config.tools, config.tool_config
+        config.system_instruction = config.tools = config.tool_config = None
+        config.cached_content = entry.name
+
+        yielded = False
+        try:
+            async for response in super().generate_content_async(llm_request, stream):
+                yielded = True
+                yield self._account(response, entry)
+        except errors.APIError as e:
+            if yielded or not _is_cache_error(e):
+                raise
+            logger.warning("Prompt cache %s unavailable, retrying uncached: %s", entry.name, e)
+            cache.invalidate(entry)
+            config.system_instruction, config.tools, config.tool_config = prefix
+            config.cached_content = None
+            async for response in super().generate_content_async(llm_request, stream):
+                yield self._account(response, None, fallback=True)
+
+    def _account(self, response: LlmResponse, entry: Optional[CacheEntry], fallback: bool = False) -> LlmResponse:
+        # Partial stream chunks carry no usage of their own
+        if response.partial or response.usage_metadata is None:
+            return response
+        call = self.prompt_cache.record(response.usage_metadata, entry, fallback)
+        response.custom_metadata = {**(response.custom_metadata or {}), "prompt_cache": call}
+        return response
@@ -0,0 +1,17 @@
+"""Date-based workout scheduling: plan expansion, schedule index and .ics export."""
+
+from .expansion import ScheduledWorkout, expand_plan, parse_days, program_start
+from .ics import CALENDARS_DIR, export_ics, schedule_to_ics
+from .index import SCHEDULES_DIR, ScheduleIndex
+
+__all__ = [
+    "CALENDARS_DIR",
+    "SCHEDULES_DIR",
+    "ScheduleIndex",
+    "ScheduledWorkout",
+    "expand_plan",
+    "export_ics",
+    "parse_days",
+    "program_start",
+    "schedule_to_ics",
+]
@@ -0,0 +1,123 @@
+"""
+Schedule expansion: turn a saved plan into dated workouts.
+
+A plan's `exercises_text` is free text written by the hub, typically:
+
+    **Week 2: Building Endurance**
+    Day 1: 25 min run
+    Day 2: Rest
+    ...
+
+Day lines are either "Day N: ..." or a weekday name ("Monday: ..."). Week
+headers ("Week N:") switch the current week; without any, every day line
+belongs to the plan's own `week_number`. Week k, day d of a program starting
+on `start_date` falls on start_date + 7*(k-1) + (d-1); weekday names map to
+that weekday within week k's seven days. A plan without a start date is
+anchored so that its own week begins on the day it was saved.
+"""
+
+import re
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from typing import Optional
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+_MARKUP = re.compile(r"[*_#`>]+")
+_WEEK_HEADER = re.compile(r"^\s*(?:[-•]\s*)?week\s+(\d+)\b", re.IGNORECASE)
+_DAY_LINE = re.compile(
+    r"^\s*(?:[-•]\s*)?(?:day\s+(\d+)|(" + "|".join(WEEKDAYS) + r"))\s*[:\-–]\s*(.+)$",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class ScheduledWorkout:
+    """One workout (or rest day) on a specific date."""
+
+    date: str
+    plan_id: str
+    goal_id: str
+    week: int
+    day: int
+    workout: str
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def parse_days(exercises_text: str, default_week: int) -> list[tuple[int, int, str]]:
+    """
+    Extract (week, day, workout) tuples from plan text.
+
+    `day` is 1-7 for "Day N" lines; weekday names are returned as -1..-7
+    (Monday..Sunday) and resolved against the calendar in `expand_plan`.
+    """
+    week = default_week
+    days = []
+    for raw in exercises_text.splitlines():
+        line = _MARKUP.sub("", raw).strip()
+        header = _WEEK_HEADER.match(line)
+        if header:
+            week = int(header.group(1))
+            continue
+        match = _DAY_LINE.match(line)
+        if not match:
+            continue
+        if match.group(1):
+            day = int(match.group(1))
+            if not 1 <= day <= 7:
+                continue
+        else:
+            day = -(WEEKDAYS.index(match.group(2).lower()) + 1)
+        days.append((week, day, match.group(3).strip()))
+    return days
+
+
+def program_start(anchor: date, week_number: int) -> date:
+    """Start (week 1, day 1) of a program whose week `week_number` begins on `anchor`."""
+    return anchor - timedelta(weeks=max(week_number, 1) - 1)
+
+
+def expand_plan(plan: dict, start_date: Optional[date] = None) -> list[ScheduledWorkout]:
+    """
+    Expand a saved plan into dated workouts.
+
+    Args:
+        plan: Plan dict as returned by PlanStore.load.
+        start_date: Program start (week 1, day 1). Defaults to
+            metadata["start_date"], else the start that puts the plan's
+            week_number on the week of its save date.
+
+    Returns:
+        Workouts ordered by date; weeks beyond program_length_weeks are dropped.
+    """
+    metadata = plan.get("metadata", {})
+    length = int(metadata.get("program_length_weeks") or 0)
+    default_week = int(metadata.get("week_number") or 1)
+    if start_date is None and metadata.get("start_date"):
+        start_date = date.fromisoformat(metadata["start_date"])
+    elif start_date is None:
+        saved = date.fromisoformat(plan["date"]) if plan.get("date") else date.today()
+        start_date = program_start(saved, default_week)
+
+    workouts = []
+    for week, day, workout in parse_days(plan.get("exercises_text", ""), default_week):
+        if week < 1 or (length and week > length):
+            continue
+        week_start = start_date + timedelta(weeks=week - 1)
+        if day > 0:
+            when = week_start + timedelta(days=day - 1)
+        else:
+            weekday = -day - 1
+            when = week_start + timedelta(days=(weekday - week_start.weekday()) % 7)
+            day = (when - week_start).days + 1
+        workouts.append(ScheduledWorkout(
+            date=when.isoformat(),
+            plan_id=plan["plan_id"],
+            goal_id=plan.get("goal_id", ""),
+            week=week,
+            day=day,
+            workout=workout,
+        ))
+    return sorted(workouts, key=lambda w: (w.date, w.plan_id))
@@ -0,0 +1,99 @@
+"""
+iCalendar (.ics) export of a user's schedule.
+
+Generated locally from the schedule index as the offline stand-in for the
+planned Google Calendar integration. Each workout becomes an all-day VEVENT;
+rest days are skipped. UIDs are stable per plan and date, so re-importing an
+updated export replaces events instead of duplicating them.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from ..config import DATA_DIR
+from .index import ScheduleIndex
+
+CALENDARS_DIR = DATA_DIR / "calendars"
+
+
+def _escape(text: str) -> str:
+    """Escape TEXT values per RFC 5545 section 3.3.11."""
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """Fold content lines longer than 75 octets (RFC 5545 section 3.1)."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line
+    chunks = []
+    while encoded:
+        limit = 75 if not chunks else 74
+        cut = min(limit, len(encoded))
+        # Do not split a multi-byte UTF-8 sequence
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        chunks.append(encoded[:cut].decode("utf-8"))
+        encoded = encoded[cut:]
+    return "\r\n ".join(chunks)
+
+
+def is_rest_day(workout: str) -> bool:
+    return workout.strip().lower().startswith("rest")
+
+
+def schedule_to_ics(schedule: dict[str, list[dict]], calendar_name: str = "Momentum Workouts") -> tuple[str, int]:
+    """
+    Render a date -> workouts mapping as an iCalendar document.
+
+    Returns:
+        (ics text, number of events)
+    """
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Momentum//Wellness Coach//EN",
+        "CALSCALE:GREGORIAN",
+        f"X-WR-CALNAME:{_escape(calendar_name)}",
+    ]
+    events = 0
+    for day, workouts in schedule.items():
+        start = date.fromisoformat(day)
+        for workout in workouts:
+            if is_rest_day(workout["workout"]):
+                continue
+            events += 1
+            description = f"Week {workout['week']}, Day {workout['day']} ({workout['plan_id']})"
+            lines += [
+                "BEGIN:VEVENT",
+                f"UID:{workout['plan_id']}-{start:%Y%m%d}-{workout['day']}@momentum",
+                f"DTSTAMP:{stamp}",
+                f"DTSTART;VALUE=DATE:{start:%Y%m%d}",
+                f"DTEND;VALUE=DATE:{start + timedelta(days=1):%Y%m%d}",
+                f"SUMMARY:{_escape(workout['workout'])}",
+                f"DESCRIPTION:{_escape(description)}",
+                "END:VEVENT",
+            ]
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(_fold(line) for line in lines) + "\r\n", events
+
+
+def export_ics(index: ScheduleIndex, user_id: str, path: Path) -> int:
+    """
+    Write a user's full schedule to an .ics file.
+
+    Returns:
+        Number of events written.
+    """
+    text, events = schedule_to_ics(index.all(user_id))
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="") as f:
+        f.write(text)
+    return events
@@ -0,0 +1,114 @@
+"""
+Per-user date -> workout schedule index.
+
+Stores each user's expanded schedule as one JSON file keyed by ISO date, so
+"what do I do today?" and "what's on this week?" are dictionary lookups
+instead of re-reading and re-parsing plan files. The index is updated
+incrementally whenever a plan is saved or rolled back: the dates the plan
+contributed before are removed and its fresh expansion is added.
+
+Layout: `root/{user_id}.json`
+    {"dates": {"2026-01-05": [workout, ...]}, "plans": {plan_id: [dates]}}
+"""
+
+import json
+import os
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterable
+
+from ..config import DATA_DIR
+from ..storage.backend import check_user_id
+from .expansion import expand_plan
+
+SCHEDULES_DIR = DATA_DIR / "schedules"
+
+
+class ScheduleIndex:
+    """Date -> workouts index per user, cached in memory and persisted as JSON."""
+
+    def __init__(self, root: Path = SCHEDULES_DIR):
+        self.root = Path(root)
+        self._cache: dict[str, tuple[float, dict]] = {}
+
+    def _path(self, user_id: str) -> Path:
+        return self.root / f"{check_user_id(user_id)}.json"
+
+    def exists(self, user_id: str) -> bool:
+        return self._path(user_id).exists()
+
+    def _load(self, user_id: str) -> dict:
+        """Return the user's index, re-reading the file only when it changed."""
+        path = self._path(user_id)
+        if not path.exists():
+            return {"dates": {}, "plans": {}}
+        mtime = path.stat().st_mtime
+        cached = self._cache.get(user_id)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with open(path) as f:
+            index = json.load(f)
+        self._cache[user_id] = (mtime, index)
+        return index
+
+    def _store(self, user_id: str, index: dict) -> None:
+        path = self._path(user_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp, path)
+        self._cache[user_id] = (path.stat().st_mtime, index)
+
+    def _apply(self, index: dict, plan: dict) -> None:
+        """Replace one plan's contribution to the index in place."""
+        plan_id = plan["plan_id"]
+        for day in index["plans"].pop(plan_id, []):
+            remaining = [w for w in index["dates"].get(day, []) if w["plan_id"] != plan_id]
+            if remaining:
+                index["dates"][day] = remaining
+            else:
+                index["dates"].pop(day, None)
+
+        dates = []
+        for workout in expand_plan(plan):
+            index["dates"].setdefault(workout.date, []).append(workout.to_dict())
+            dates.append(workout.date)
+        index["plans"][plan_id] = sorted(set(dates))
+
+    def update(self, user_id: str, plan: dict) -> int:
+        """
+        Re-index one plan after it was saved.
+
+        Returns:
+            Number of dates the plan now has workouts on.
+        """
+        index = self._load(user_id)
+        self._apply(index, plan)
+        self._store(user_id, index)
+        return len(index["plans"][plan["plan_id"]])
+
+    def rebuild(self, user_id: str, plans: Iterable[dict]) -> None:
+        """Build the index from scratch, e.g. for plans saved before indexing."""
+        index = {"dates": {}, "plans": {}}
+        for plan in plans:
+            self._apply(index, plan)
+        self._store(user_id, index)
+
+    def on(self, user_id: str, day: date) -> list[dict]:
+        """Workouts scheduled on a single date."""
+        return self._load(user_id)["dates"].get(day.isoformat(), [])
+
+    def week(self, user_id: str, day: date) -> dict[str, list[dict]]:
+        """Workouts for the Monday-Sunday calendar week containing `day`."""
+        monday = day - timedelta(days=day.weekday())
+        dates = self._load(user_id)["dates"]
+        return {
+            (monday + timedelta(days=i)).isoformat(): dates.get((monday + timedelta(days=i)).isoformat(), [])
+            for i in range(7)
+        }
+
+    def all(self, user_id: str) -> dict[str, list[dict]]:
+        """The full date -> workouts mapping, ordered by date."""
+        dates = self._load(user_id)["dates"]
+        return {day: dates[day] for day in sorted(dates)}
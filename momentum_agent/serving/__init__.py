@@ -0,0 +1,18 @@
+"""Headless async HTTP serving layer for the Momentum agent."""
+
+from .app import build_pool, create_app
+from .runner_pool import (
+    DeferredMemoryService,
+    RunnerPool,
+    ServerDraining,
+    ServerOverloaded,
+)
+
+__all__ = [
+    "build_pool",
+    "create_app",
+    "DeferredMemoryService",
+    "RunnerPool",
+    "ServerDraining",
+    "ServerOverloaded",
+]
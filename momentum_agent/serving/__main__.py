@@ -0,0 +1,50 @@
+"""
+Run the headless Momentum HTTP service.
+
+Usage:
+    python -m momentum_agent.serving --port 8080
+    python -m momentum_agent.serving --stub-model   # offline, no API key needed
+"""
+
+import argparse
+
+import uvicorn
+
+from ..testing import COACHING_ROUTES, StubLlm
+from .app import build_pool, create_app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the Momentum agent over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--runners", type=int, default=4, help="Runners in the pool")
+    parser.add_argument("--max-in-flight", type=int, default=8, help="Concurrent turns")
+    parser.add_argument("--max-queue", type=int, default=32, help="Queued turns before 429")
+    parser.add_argument("--shutdown-timeout", type=float, default=30.0)
+    parser.add_argument("--stub-model", action="store_true", help="Use the local stub model")
+    parser.add_argument("--stub-latency", type=float, default=0.0, help="Stub model latency (s)")
+    parser.add_argument("--stub-error-rate", type=float, default=0.0, help="Stub model error rate")
+    args = parser.parse_args()
+
+    pool = build_pool(
+        model=StubLlm(
+            latency=args.stub_latency,
+            error_rate=args.stub_error_rate,
+            routes=COACHING_ROUTES,
+        ) if args.stub_model else None,
+        runners=args.runners,
+        max_in_flight=args.max_in_flight,
+        max_queue=args.max_queue,
+    )
+    app = create_app(pool, shutdown_timeout=args.shutdown_timeout)
+    uvicorn.run(
+        app,
+        host=args.host,
+        port=args.port,
+        timeout_graceful_shutdown=int(args.shutdown_timeout),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Headless HTTP service for the Momentum agent.
+
+FastAPI app around a RunnerPool, intended as the base for A2A exposure:
+
+- POST /sessions   create (or fetch) a session for a user
+- POST /run        run one turn and return all events as JSON
+- POST /run_sse    run one turn and stream events as Server-Sent Events
+- GET  /healthz    liveness
+- GET  /readyz     readiness (503 while draining) with pool load stats and
+                   prompt cache token totals
+
+Overload is surfaced as 429 with a Retry-After header; requests arriving
+after shutdown has started get 503.
+"""
+
+import json
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Optional
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from google.adk.memory import InMemoryMemoryService
+from google.adk.models import BaseLlm
+from google.adk.sessions import BaseSessionService
+from pydantic import BaseModel, field_validator
+from starlette.background import BackgroundTask
+
+from ..config import DB_PATH, create_runner, create_session_service
+from ..hub import create_wellness_chief_agent
+from ..prompt_cache import prompt_cache
+from ..storage import check_user_id
+from .runner_pool import (
+    DeferredMemoryService,
+    RunnerPool,
+    ServerDraining,
+    ServerOverloaded,
+    Ticket,
+)
+
+RETRY_AFTER_SECONDS = 1
+
+
+class SessionRequest(BaseModel):
+    user_id: str
+    session_id: Optional[str] = None
+
+    # user_id names the user's plan, schedule and calendar files
+    _check_user_id = field_validator("user_id")(check_user_id)
+
+
+class RunRequest(BaseModel):
+    user_id: str
+    message: str
+    session_id: Optional[str] = None
+
+    _check_user_id = field_validator("user_id")(check_user_id)
+
+
+def build_pool(
+    model: Optional[BaseLlm] = None,
+    session_service: Optional[BaseSessionService] = None,
+    runners: int = 4,
+    max_in_flight: int = 8,
+    max_queue: int = 32,
+) -> RunnerPool:
+    """
+    Build a RunnerPool over the Momentum hub.
+
+    Args:
+        model: Model override for the agents (e.g. StubLlm). Defaults to Gemini.
+        session_service: Session service shared by all runners. Defaults to the
+            SQLite database used by `adk web`.
+        runners: Number of runners in the pool.
+        max_in_flight: Maximum concurrent turns.
+        max_queue: Maximum turns waiting for a slot before returning 429.
+    """
+    if session_service is None:
+        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        session_service = create_session_service()
+    memory_service = DeferredMemoryService(InMemoryMemoryService())
+    return RunnerPool(
+        [
+            create_runner(create_wellness_chief_agent(model=model), session_service, memory_service)
+            for _ in range(runners)
+        ],
+        memory_service=memory_service,
+        max_in_flight=max_in_flight,
+        max_queue=max_queue,
+    )
+
+
+async def _admit(pool: RunnerPool) -> Ticket:
+    """Admit a turn into the pool, translating rejections to HTTP errors."""
+    try:
+        return await pool.admit()
+    except ServerOverloaded:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many concurrent requests",
+            headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+        )
+    except ServerDraining:
+        raise HTTPException(status_code=503, detail="Server is shutting down")
+
+
+def create_app(pool: RunnerPool, shutdown_timeout: float = 30.0) -> FastAPI:
+    """
+    Create the FastAPI app serving the given pool.
+
+    Args:
+        pool: RunnerPool executing the turns.
+        shutdown_timeout: Seconds to let in-flight turns finish on shutdown.
+    """
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        await pool.shutdown(timeout=shutdown_timeout)
+
+    app = FastAPI(title="Momentum", lifespan=lifespan)
+    app.state.pool = pool
+
+    @app.get("/healthz")
+    async def healthz():
+        return {"status": "ok"}
+
+    @app.get("/readyz")
+    async def readyz():
+        stats = pool.stats()
+        status_code = 503 if pool.draining else 200
+        return JSONResponse(
+            {"ready": not pool.draining, **stats, "prompt_cache": prompt_cache.stats.as_dict()},
+            status_code=status_code,
+        )
+
+    @app.post("/sessions")
+    async def create_session(request: SessionRequest):
+        session = await pool.ensure_session(request.user_id, request.session_id)
+        return {"user_id": session.user_id, "session_id": session.id}
+
+    @app.post("/run")
+    async def run(request: RunRequest):
+        ticket = await _admit(pool)
+        try:
+            session = await pool.ensure_session(request.user_id, request.session_id)
+            events = [
+                event
+                async for event in pool.run_turn(request.user_id, session.id, request.message)
+            ]
+        finally:
+            ticket.release()
+
+        text = "".join(
+            part.text
+            for event in events
+            if event.is_final_response() and event.content
+            for part in event.content.parts or []
+            if part.text
+        )
+        return {
+            "session_id": session.id,
+            "text": text,
+            "events": [event.model_dump(mode="json", exclude_none=True, by_alias=True) for event in events],
+        }
+
+    @app.post("/run_sse")
+    async def run_sse(request: RunRequest):
+        ticket = await _admit(pool)
+        try:
+            session = await pool.ensure_session(request.user_id, request.session_id)
+        except BaseException:
+            ticket.release()
+            raise
+
+        async def stream() -> AsyncGenerator[str, None]:
+            try:
+                async for event in pool.run_turn(
+                    request.user_id, session.id, request.message, streaming=True
+                ):
+                    yield f"data: {event.model_dump_json(exclude_none=True, by_alias=True)}\n\n"
+            except Exception as e:
+                yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+            finally:
+                ticket.release()
+
+        return StreamingResponse(
+            stream(),
+            media_type="text/event-stream",
+            headers={"X-Session-Id": session.id},
+            background=BackgroundTask(ticket.release),
+        )
+
+    return app
@@ -0,0 +1,234 @@
+"""
+Shard rebalancing for the sharded deployment.
+
+After changing the number of shards, every user whose owner on the new hash
+ring differs from the shard currently holding their data is moved: plans
+(every version, copied through the plan store so file and sqlite stores are
+handled alike), schedule index, exported calendar, and all sessions with their
+events and state. With consistent hashing that is roughly |M-N|/max(M,N) of
+the users when going from N to M shards.
+
+Run it while the cluster is stopped, then start the router with the new
+worker count. Memory services are process-local and do not survive a restart,
+so there is nothing to move for them. Re-running after an interruption is
+safe: plans and sessions are deleted from the source only after they were
+copied, a partial plan copy is resumed, and a partial session copy on the
+target is replaced.
+
+Usage:
+    python -m momentum_agent.serving.rebalance --workers 6 --dry-run
+    python -m momentum_agent.serving.rebalance --data-dir data/shards --workers 6 --plan-store sqlite
+"""
+
+import argparse
+import asyncio
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+
+from google.adk.sessions import DatabaseSessionService
+
+from ..config import APP_NAME, DB_PATH, PLAN_STORE_LOCATIONS, plan_store_url
+from ..storage import PlanStore, check_user_id, open_backend
+from .sharding import SHARDS_DIR, HashRing, shard_names
+
+# Per-user files inside a shard, relative to the shard root (plans are moved
+# through the shard's plan store)
+USER_PATHS = ("schedules/{user_id}.json", "calendars/{user_id}.ics")
+
+
+@dataclass
+class Move:
+    """One user relocated from `source` to `target` shard."""
+
+    user_id: str
+    source: str
+    target: str
+    sessions: int = 0
+
+
+class _Sessions:
+    """Lazily opened session services, one per shard database."""
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = data_dir
+        self._services: dict[str, DatabaseSessionService] = {}
+
+    def exists(self, shard: str) -> bool:
+        return (self.data_dir / shard / DB_PATH.name).exists()
+
+    def __getitem__(self, shard: str) -> DatabaseSessionService:
+        if shard not in self._services:
+            path = self.data_dir / shard / DB_PATH.name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._services[shard] = DatabaseSessionService(db_url=f"sqlite+aiosqlite:///{path}")
+        return self._services[shard]
+
+    async def close(self) -> None:
+        for service in self._services.values():
+            await service.close()
+
+
+class _PlanStores:
+    """Lazily opened plan stores, one per shard directory."""
+
+    def __init__(self, data_dir: Path, scheme: str):
+        self.data_dir = data_dir
+        self.scheme = scheme
+        self._stores: dict[str, PlanStore] = {}
+
+    def exists(self, shard: str) -> bool:
+        return (self.data_dir / shard / PLAN_STORE_LOCATIONS[self.scheme]).exists()
+
+    def __getitem__(self, shard: str) -> PlanStore:
+        if shard not in self._stores:
+            self._stores[shard] = PlanStore(open_backend(plan_store_url(self.data_dir / shard, self.scheme)))
+        return self._stores[shard]
+
+    def close(self) -> None:
+        for store in self._stores.values():
+            store.backend.close()
+
+
+def existing_shards(data_dir: Path) -> list[str]:
+    """Shard directories present under `data_dir`, in index order."""
+    count = 0
+    while (data_dir / f"shard-{count}").is_dir():
+        count += 1
+    return shard_names(count)
+
+
+async def _shard_users(data_dir: Path, shard: str, sessions: _Sessions, plans: _PlanStores) -> set[str]:
+    root = data_dir / shard
+    users = set(plans[shard].backend.list_users()) if plans.exists(shard) else set()
+    users |= {path.stem for path in (root / "schedules").glob("*.json")}
+    users |= {path.stem for path in (root / "calendars").glob("*.ics")}
+    if sessions.exists(shard):
+        response = await sessions[shard].list_sessions(app_name=APP_NAME)
+        users |= {session.user_id for session in response.sessions}
+    return users
+
+
+async def _move_sessions(move: Move, sessions: _Sessions) -> int:
+    source, target = sessions[move.source], sessions[move.target]
+    listed = await source.list_sessions(app_name=APP_NAME, user_id=move.user_id)
+    for listed_session in listed.sessions:
+        session = await source.get_session(
+            app_name=APP_NAME, user_id=move.user_id, session_id=listed_session.id
+        )
+        await target.delete_session(app_name=APP_NAME, user_id=move.user_id, session_id=session.id)
+        copy = await target.create_session(
+            app_name=APP_NAME, user_id=move.user_id, state=session.state, session_id=session.id
+        )
+        for event in session.events:
+            await target.append_event(copy, event)
+        await source.delete_session(app_name=APP_NAME, user_id=move.user_id, session_id=session.id)
+    return len(listed.sessions)
+
+
+def _check_plans(move: Move, plans: _PlanStores) -> None:
+    """Refuse to merge a plan the target already holds with different history."""
+    source, target = plans[move.source].backend, plans[move.target].backend
+    for head in source.list_heads(move.user_id):
+        theirs = target.get_head(move.user_id, head["plan_id"])
+        if theirs is None:
+            continue
+        ours = {record["version"]: record for record in source.get_history(move.user_id, head["plan_id"])}
+        if ours.get(theirs["version"], {}).get("body") != theirs["body"]:
+            raise RuntimeError(
+                f"Refusing to merge plan {head['plan_id']}; user {move.user_id} has diverging plans on both shards"
+            )
+
+
+def _move_plans(move: Move, plans: _PlanStores) -> None:
+    source, target = plans[move.source], plans[move.target]
+    # Versions the target already has (from an interrupted run) are skipped
+    with target.batch():
+        for version in source.export_versions(move.user_id):
+            target.import_version(version)
+    source.backend.delete_user(move.user_id)
+
+
+def _move_files(data_dir: Path, move: Move) -> None:
+    paths = [
+        (data_dir / move.source / rel.format(user_id=check_user_id(move.user_id)),
+         data_dir / move.target / rel.format(user_id=check_user_id(move.user_id)))
+        for rel in USER_PATHS
+    ]
+    paths = [(src, dst) for src, dst in paths if src.exists()]
+    for _, dst in paths:
+        if dst.exists():
+            raise RuntimeError(f"Refusing to overwrite {dst}; user {move.user_id} has data on both shards")
+    for src, dst in paths:
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(src, dst)
+
+
+async def rebalance(
+    data_dir: Path, workers: int, dry_run: bool = False, plan_store: str = "file"
+) -> tuple[list[Move], int]:
+    """
+    Move users onto their owners in a `workers`-shard ring.
+
+    Args:
+        data_dir: Directory holding shard-N/.
+        workers: New number of shards.
+        dry_run: Only work out the moves.
+        plan_store: Plan store backend of the shards, as given to the workers
+            (file or sqlite).
+
+    Returns:
+        The moves (applied unless `dry_run`) and the total number of users.
+    """
+    data_dir = Path(data_dir)
+    ring = HashRing(shard_names(workers))
+    sessions = _Sessions(data_dir)
+    plans = _PlanStores(data_dir, plan_store)
+    try:
+        moves, total = [], 0
+        for shard in existing_shards(data_dir):
+            users = await _shard_users(data_dir, shard, sessions, plans)
+            total += len(users)
+            moves += [
+                Move(user_id=user, source=shard, target=ring.node_for(user))
+                for user in sorted(users)
+                if ring.node_for(user) != shard
+            ]
+        if not dry_run:
+            for move in moves:
+                if plans.exists(move.source):
+                    _check_plans(move, plans)
+                _move_files(data_dir, move)
+                if plans.exists(move.source):
+                    _move_plans(move, plans)
+                if sessions.exists(move.source):
+                    move.sessions = await _move_sessions(move, sessions)
+        return moves, total
+    finally:
+        plans.close()
+        await sessions.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Move users between shards after changing the shard count.")
+    parser.add_argument("--workers", type=int, required=True, help="New number of shards")
+    parser.add_argument("--data-dir", type=Path, default=SHARDS_DIR, help="Directory holding shard-N/")
+    parser.add_argument(
+        "--plan-store", choices=sorted(PLAN_STORE_LOCATIONS), default="file",
+        help="Plan store backend the workers were started with",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Only report which users would move")
+    args = parser.parse_args()
+
+    moves, total = asyncio.run(
+        rebalance(args.data_dir, args.workers, dry_run=args.dry_run, plan_store=args.plan_store)
+    )
+    for move in moves:
+        sessions = "" if args.dry_run else f" ({move.sessions} sessions)"
+        print(f"{move.user_id}: {move.source} -> {move.target}{sessions}")
+    share = f" ({len(moves) / total:.0%})" if total else ""
+    print(f"{'Would move' if args.dry_run else 'Moved'} {len(moves)} of {total} users{share}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+Runner pool for the headless serving layer.
+
+Wraps a set of ADK Runners that share one session service and one memory
+service, and adds what a multi-user HTTP front end needs on top of them:
+
+- Per-user affinity: a user is always routed to the same runner, and turns
+  within one session are serialized so events are appended in order.
+- Bounded admission: at most `max_in_flight` turns run at once, at most
+  `max_queue` wait behind them; anything beyond that is rejected so the HTTP
+  layer can answer 429 instead of piling up work.
+- Graceful shutdown: stop admitting, let in-flight turns finish, then drain
+  the deferred memory writes before closing the runners.
+"""
+
+import asyncio
+import logging
+import weakref
+import zlib
+from typing import AsyncGenerator, Optional
+
+from google.adk import Runner
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.events import Event
+from google.adk.memory import BaseMemoryService
+from google.adk.sessions import Session
+from google.genai import types
+
+from ..config import APP_NAME
+
+logger = logging.getLogger(__name__)
+
+
+class ServerOverloaded(Exception):
+    """Raised when both the in-flight slots and the wait queue are full."""
+
+
+class ServerDraining(Exception):
+    """Raised when a turn is submitted after shutdown has started."""
+
+
+class DeferredMemoryService(BaseMemoryService):
+    """
+    Memory service wrapper that takes memory writes off the request path.
+
+    `add_session_to_memory` (called by the hub's after-agent callback) schedules
+    the write and returns immediately. Writes for the same session are chained
+    so they land in order; `drain()` waits for everything still pending.
+    """
+
+    def __init__(self, inner: BaseMemoryService):
+        self._inner = inner
+        self._pending: dict[tuple[str, str, str], asyncio.Task] = {}
+
+    @property
+    def pending(self) -> int:
+        """Number of sessions with a memory write still in progress."""
+        return len(self._pending)
+
+    async def add_session_to_memory(self, session: Session) -> None:
+        key = (session.app_name, session.user_id, session.id)
+        task = asyncio.create_task(self._write(self._pending.get(key), session))
+        self._pending[key] = task
+        task.add_done_callback(lambda done: self._forget(key, done))
+
+    async def _write(self, previous: Optional[asyncio.Task], session: Session) -> None:
+        if previous is not None:
+            await asyncio.wait([previous])
+        try:
+            await self._inner.add_session_to_memory(session)
+        except Exception:
+            logger.exception("Memory write failed for session %s", session.id)
+
+    def _forget(self, key: tuple[str, str, str], task: asyncio.Task) -> None:
+        if self._pending.get(key) is task:
+            del self._pending[key]
+
+    async def search_memory(self, *, app_name: str, user_id: str, query: str):
+        return await self._inner.search_memory(app_name=app_name, user_id=user_id, query=query)
+
+    async def drain(self) -> None:
+        """Wait until every scheduled memory write has completed."""
+        while self._pending:
+            await asyncio.wait(list(self._pending.values()))
+
+
+class Ticket:
+    """An admitted slot in the pool. Releasing it more than once is a no-op."""
+
+    def __init__(self, pool: "RunnerPool"):
+        self._pool = pool
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._pool._release()
+
+
+class RunnerPool:
+    """
+    Pool of Runners with per-user affinity and bounded admission.
+
+    Args:
+        runners: Runners sharing the same session and memory services.
+        memory_service: The deferred memory service the runners write to,
+            drained on shutdown. Optional when memory writes are synchronous.
+        max_in_flight: Maximum number of turns executing concurrently.
+        max_queue: Maximum number of turns waiting for a free slot.
+    """
+
+    def __init__(
+        self,
+        runners: list[Runner],
+        memory_service: Optional[DeferredMemoryService] = None,
+        max_in_flight: int = 8,
+        max_queue: int = 32,
+    ):
+        if not runners:
+            raise ValueError("RunnerPool needs at least one runner")
+        self._runners = runners
+        self._memory_service = memory_service
+        self._max_queue = max_queue
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._in_flight = 0
+        self._queued = 0
+        self._draining = False
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._session_locks: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+
+    @property
+    def session_service(self):
+        return self._runners[0].session_service
+
+    @property
+    def draining(self) -> bool:
+        return self._draining
+
+    def stats(self) -> dict:
+        """Current load, as reported by the readiness endpoint."""
+        return {
+            "runners": len(self._runners),
+            "in_flight": self._in_flight,
+            "queued": self._queued,
+            "pending_memory_writes": self._memory_service.pending if self._memory_service else 0,
+            "draining": self._draining,
+        }
+
+    def runner_for(self, user_id: str) -> Runner:
+        """Return the runner a user is pinned to."""
+        return self._runners[zlib.crc32(user_id.encode()) % len(self._runners)]
+
+    async def admit(self) -> Ticket:
+        """
+        Reserve an in-flight slot, waiting in the queue if necessary.
+
+        Raises:
+            ServerDraining: If the pool is shutting down.
+            ServerOverloaded: If no slot is free and the queue is full.
+        """
+        if self._draining:
+            raise ServerDraining()
+        if self._slots.locked() and self._queued >= self._max_queue:
+            raise ServerOverloaded()
+
+        self._queued += 1
+        self._idle.clear()
+        try:
+            await self._slots.acquire()
+        except BaseException:
+            self._queued -= 1
+            self._mark_idle()
+            raise
+        self._queued -= 1
+        self._in_flight += 1
+        return Ticket(self)
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._slots.release()
+        self._mark_idle()
+
+    def _mark_idle(self) -> None:
+        if self._in_flight == 0 and self._queued == 0:
+            self._idle.set()
+
+    async def ensure_session(self, user_id: str, session_id: Optional[str] = None) -> Session:
+        """Load the session, creating it if it does not exist yet."""
+        if session_id:
+            session = await self.session_service.get_session(
+                app_name=APP_NAME, user_id=user_id, session_id=session_id
+            )
+            if session:
+                return session
+        return await self.session_service.create_session(
+            app_name=APP_NAME, user_id=user_id, session_id=session_id
+        )
+
+    async def run_turn(
+        self,
+        user_id: str,
+        session_id: str,
+        message: str,
+        streaming: bool = False,
+    ) -> AsyncGenerator[Event, None]:
+        """
+        Run one user turn on the user's runner and yield the resulting events.
+
+        Turns for the same session are serialized; the caller is expected to
+        hold a Ticket from `admit()` for the duration of the turn.
+        """
+        key = (user_id, session_id)
+        lock = self._session_locks.get(key)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._session_locks[key] = lock
+
+        run_config = RunConfig(
+            streaming_mode=StreamingMode.SSE if streaming else StreamingMode.NONE
+        )
+        async with lock:
+            try:
+                async for event in self.runner_for(user_id).run_async(
+                    user_id=user_id,
+                    session_id=session_id,
+                    new_message=types.Content(role="user", parts=[types.Part(text=message)]),
+                    run_config=run_config,
+                ):
+                    yield event
+            finally:
+                # A turn that failed before its final response still has events buffered
+                flush_session = getattr(self.session_service, "flush_session", None)
+                if flush_session is not None:
+                    await flush_session(APP_NAME, user_id, session_id)
+
+    async def shutdown(self, timeout: float = 30.0) -> None:
+        """
+        Stop admitting turns, wait for in-flight ones, then drain memory writes.
+
+        Args:
+            timeout: Seconds to wait for in-flight turns before giving up on them.
+        """
+        self._draining = True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Shutdown timed out with %d turn(s) still running", self._in_flight)
+
+        if self._memory_service is not None:
+            await self._memory_service.drain()
+
+        for runner in self._runners:
+            await runner.close()
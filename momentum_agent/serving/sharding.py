@@ -0,0 +1,281 @@
+"""
+Sharded deployment: a front router over N worker processes.
+
+Each worker is a regular `python -m momentum_agent.serving` process with its
+own data directory (session DB, plans, schedules, calendars) and its own
+process-local memory service. Plans are kept in the shard directory too, in a
+file or sqlite plan store (`--plan-store`); a store shared by all shards such
+as Firestore is refused, since rebalancing could not tell whose plans to move. The router consistent-hashes `user_id` onto a
+shard, so everything belonging to a user lives on one worker, and changing the
+shard count only moves the users whose owner changed (see `rebalance`).
+
+Layout: `data_dir/shard-{i}/`, one directory per worker.
+
+Usage:
+    python -m momentum_agent.serving.sharding --workers 4 --port 8080
+    python -m momentum_agent.serving.sharding --workers 4 --stub-model
+
+Options the router does not know (e.g. --stub-model, --max-in-flight) are
+passed to every worker.
+"""
+
+import argparse
+import asyncio
+import bisect
+import hashlib
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+
+from ..config import DATA_DIR, DATA_DIR_ENV, PLAN_STORE_ENV, PLAN_STORE_LOCATIONS, PLAN_STORE_URL, plan_store_url
+from ..storage.backend import parse_backend_url
+
+SHARDS_DIR = DATA_DIR / "shards"
+
+# Worker response headers passed through to the client
+FORWARDED_HEADERS = ("content-type", "retry-after", "x-session-id")
+
+
+def shard_names(count: int) -> list[str]:
+    return [f"shard-{i}" for i in range(count)]
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """
+    Consistent hash ring with virtual nodes.
+
+    Each node owns `replicas` points on the ring; a key belongs to the first
+    point at or after its hash. Adding or removing a node only reassigns the
+    keys on the arcs that node gains or loses.
+    """
+
+    def __init__(self, nodes: Iterable[str], replicas: int = 128):
+        self.nodes = list(nodes)
+        if not self.nodes:
+            raise ValueError("HashRing needs at least one node")
+        points = sorted((_hash(f"{node}#{i}"), node) for node in self.nodes for i in range(replicas))
+        self._points = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def node_for(self, key: str) -> str:
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[index]
+
+
+def create_router(workers: dict[str, str], client: Optional[httpx.AsyncClient] = None) -> FastAPI:
+    """
+    Create the front router app.
+
+    Args:
+        workers: Shard name -> worker base URL.
+        client: HTTP client used to reach the workers. Defaults to a pooled
+            client without a response timeout (turns can take a while).
+    """
+    ring = HashRing(workers)
+    client = client or httpx.AsyncClient(
+        timeout=httpx.Timeout(None, connect=5.0),
+        limits=httpx.Limits(max_connections=None, max_keepalive_connections=256),
+    )
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        await client.aclose()
+
+    app = FastAPI(title="Momentum router", lifespan=lifespan)
+    app.state.ring = ring
+
+    async def forward(request: Request, path: str) -> StreamingResponse:
+        body = await request.body()
+        try:
+            user_id = str(json.loads(body)["user_id"])
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(status_code=422, detail="Request body must be a JSON object with a user_id")
+
+        shard = ring.node_for(user_id)
+        upstream = client.build_request(
+            "POST", workers[shard] + path, content=body, headers={"content-type": "application/json"}
+        )
+        try:
+            response = await client.send(upstream, stream=True)
+        except httpx.TransportError as e:
+            raise HTTPException(status_code=502, detail=f"{shard} is unavailable: {e}")
+
+        headers = {name: value for name, value in response.headers.items() if name in FORWARDED_HEADERS}
+        headers["X-Shard"] = shard
+        return StreamingResponse(
+            response.aiter_raw(),
+            status_code=response.status_code,
+            headers=headers,
+            background=BackgroundTask(response.aclose),
+        )
+
+    @app.get("/healthz")
+    async def healthz():
+        return {"status": "ok"}
+
+    @app.get("/readyz")
+    async def readyz():
+        async def probe(url: str) -> dict:
+            try:
+                response = await client.get(url + "/readyz", timeout=5.0)
+                return response.json()
+            except (httpx.HTTPError, ValueError) as e:
+                return {"ready": False, "error": str(e)}
+
+        results = await asyncio.gather(*[probe(url) for url in workers.values()])
+        shards = dict(zip(workers, results))
+        ready = all(result.get("ready") for result in results)
+        return JSONResponse({"ready": ready, "shards": shards}, status_code=200 if ready else 503)
+
+    @app.post("/sessions")
+    async def create_session(request: Request):
+        return await forward(request, "/sessions")
+
+    @app.post("/run")
+    async def run(request: Request):
+        return await forward(request, "/run")
+
+    @app.post("/run_sse")
+    async def run_sse(request: Request):
+        return await forward(request, "/run_sse")
+
+    return app
+
+
+@dataclass
+class Worker:
+    """A worker process serving one shard."""
+
+    shard: str
+    url: str
+    process: subprocess.Popen
+
+
+def start_workers(
+    count: int,
+    data_dir: Path = SHARDS_DIR,
+    host: str = "127.0.0.1",
+    base_port: int = 8100,
+    worker_args: Iterable[str] = (),
+    plan_store: str = "file",
+) -> list[Worker]:
+    """
+    Spawn one `momentum_agent.serving` process per shard.
+
+    Worker i listens on `base_port + i` and stores its data in
+    `data_dir/shard-{i}` (passed through MOMENTUM_DATA_DIR), including its
+    plan store (MOMENTUM_PLAN_STORE).
+
+    Raises:
+        ValueError: `plan_store` is not a backend that lives in a directory
+            (file or sqlite).
+    """
+    workers = []
+    for i, shard in enumerate(shard_names(count)):
+        shard_dir = (Path(data_dir) / shard).resolve()
+        store_url = plan_store_url(shard_dir, plan_store)
+        shard_dir.mkdir(parents=True, exist_ok=True)
+        port = base_port + i
+        process = subprocess.Popen(
+            [sys.executable, "-m", "momentum_agent.serving", "--host", host, "--port", str(port), *worker_args],
+            env={**os.environ, DATA_DIR_ENV: str(shard_dir), PLAN_STORE_ENV: store_url},
+        )
+        workers.append(Worker(shard=shard, url=f"http://{host}:{port}", process=process))
+    return workers
+
+
+def wait_until_ready(workers: list[Worker], timeout: float = 60.0) -> None:
+    """Block until every worker answers /readyz, or raise RuntimeError."""
+    deadline = time.monotonic() + timeout
+    pending = list(workers)
+    while pending:
+        for worker in list(pending):
+            if worker.process.poll() is not None:
+                raise RuntimeError(f"{worker.shard} exited with code {worker.process.returncode}")
+            try:
+                if httpx.get(worker.url + "/readyz", timeout=1.0).status_code == 200:
+                    pending.remove(worker)
+            except httpx.HTTPError:
+                pass
+        if pending and time.monotonic() > deadline:
+            raise RuntimeError(f"Workers not ready after {timeout}s: {[w.shard for w in pending]}")
+        if pending:
+            time.sleep(0.2)
+
+
+def stop_workers(workers: list[Worker], timeout: float = 30.0) -> None:
+    """Ask workers to shut down gracefully; kill any still running after `timeout`."""
+    for worker in workers:
+        if worker.process.poll() is None:
+            worker.process.terminate()
+    deadline = time.monotonic() + timeout
+    for worker in workers:
+        try:
+            worker.process.wait(timeout=max(0.0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            worker.process.kill()
+            worker.process.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Serve the Momentum agent as sharded worker processes behind a router.",
+        epilog="Unrecognized options are passed to every worker (see python -m momentum_agent.serving --help).",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080, help="Router port")
+    parser.add_argument("--workers", type=int, default=2, help="Number of shards / worker processes")
+    parser.add_argument("--worker-port", type=int, default=8100, help="Port of the first worker")
+    parser.add_argument("--data-dir", type=Path, default=SHARDS_DIR, help="Directory holding shard-N/")
+    parser.add_argument(
+        "--plan-store",
+        choices=sorted(PLAN_STORE_LOCATIONS),
+        help="Plan store backend in each shard directory (default: the MOMENTUM_PLAN_STORE backend, or file)",
+    )
+    parser.add_argument("--ready-timeout", type=float, default=60.0)
+    parser.add_argument("--shutdown-timeout", type=float, default=30.0)
+    args, worker_args = parser.parse_known_args()
+    args.plan_store = args.plan_store or parse_backend_url(PLAN_STORE_URL)[0]
+    if args.plan_store not in PLAN_STORE_LOCATIONS:
+        parser.error(
+            f"MOMENTUM_PLAN_STORE={PLAN_STORE_URL} is shared by all shards; "
+            "sharded workers keep plans in their shard directory (--plan-store file or sqlite)"
+        )
+
+    # uvicorn re-raises SIGTERM after its own graceful shutdown; exit through
+    # SystemExit instead so the workers are always stopped below
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    workers = start_workers(
+        args.workers,
+        data_dir=args.data_dir,
+        base_port=args.worker_port,
+        worker_args=[*worker_args, "--shutdown-timeout", str(args.shutdown_timeout)],
+        plan_store=args.plan_store,
+    )
+    try:
+        wait_until_ready(workers, timeout=args.ready_timeout)
+        uvicorn.run(create_router({w.shard: w.url for w in workers}), host=args.host, port=args.port)
+    finally:
+        stop_workers(workers, timeout=args.shutdown_timeout)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,14 +5,16 @@ Provides step-by-step exercise instructions with video resources using Google Se
 Maintains session context to provide concise answers first, detailed follow-ups when asked.
 """
 
+from typing import Optional
 from google.adk.agents import LlmAgent
-from google.adk.models import Gemini
+from google.adk.models import BaseLlm
 from google.adk.tools import google_search
 from ..prompts import INSTRUCTOR_PROMPT
-from ..config import RETRY_CONFIG
+from ..config import MODEL_BASE_URL, RETRY_CONFIG
+from ..prompt_cache import CachedGemini
 
 
-def create_instructor_agent() -> LlmAgent:
+def create_instructor_agent(model: Optional[BaseLlm] = None) -> LlmAgent:
     """
     Create the InstructorAgent specialized in exercise instruction.
 
@@ -22,11 +24,15 @@ def create_instructor_agent() -> LlmAgent:
     Maintains session context automatically (inherited from parent Runner)
     to remember previous exercise discussions, enabling concise first 
     responses and detailed follow-ups.
+
+    Args:
+        model: Model override (e.g. a local stub). Defaults to Gemini 2.5 Flash
+            with its static prompt prefix cached (see prompt_cache).
     """
     return LlmAgent(
         name="InstructorAgent",
         description="Provides exercise instruction with proper form and YouTube video demonstrations. Uses a two-tier approach: concise overview on first mention, detailed breakdown for follow-up questions. Call this agent when users ask how to perform an exercise. Pass the user's question as the 'request' parameter.",
-        model=Gemini(model="gemini-2.5-flash", retry_options=RETRY_CONFIG),
+        model=model or CachedGemini(model="gemini-2.5-flash", base_url=MODEL_BASE_URL, retry_options=RETRY_CONFIG),
         instruction=INSTRUCTOR_PROMPT,
         tools=[google_search],
         output_key="exercise_instructions",
@@ -0,0 +1,42 @@
+"""Persistent storage for workout plans and agent sessions."""
+
+from .backend import (
+    PLAN_ID_PATTERN,
+    USER_ID_PATTERN,
+    PlanBackend,
+    WriteBatch,
+    check_plan_id,
+    check_user_id,
+    open_backend,
+)
+from .document_backend import DocumentBackend
+from .file_backend import FileBackend
+from .plan_store import PLANS_DIR, PlanStore, content_address
+from .sqlite_backend import SqliteBackend
+
+__all__ = [
+    "PLAN_ID_PATTERN",
+    "USER_ID_PATTERN",
+    "check_plan_id",
+    "check_user_id",
+    "DocumentBackend",
+    "FileBackend",
+    "open_backend",
+    "PLANS_DIR",
+    "PlanBackend",
+    "PlanStore",
+    "SqliteBackend",
+    "TunedSqliteSessionService",
+    "WriteBatch",
+    "content_address",
+]
+
+
+def __getattr__(name):
+    # session_store builds on private DatabaseSessionService internals and
+    # refuses to import on other google-adk releases; only load it on use so
+    # the plan store (and everything importing it) works regardless
+    if name == "TunedSqliteSessionService":
+        from .session_store import TunedSqliteSessionService
+        return TunedSqliteSessionService
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,84 @@
+"""
+Bulk plan export, import and copy between storage backends.
+
+Usage:
+    python -m momentum_agent.storage export file:data/plans -o plans.jsonl
+    python -m momentum_agent.storage import sqlite:data/plans.db -i plans.jsonl
+    python -m momentum_agent.storage copy file:data/plans sqlite:data/plans.db
+
+Backends are given as URLs (file:, sqlite:, firestore:, see
+momentum_agent.storage.backend). Dumps are JSONL, one line per plan version;
+"-" (the default) means stdout / stdin.
+"""
+
+import argparse
+import sys
+import time
+
+from .backend import open_backend
+from .bulk import DEFAULT_BATCH_SIZE, import_versions, iter_versions, read_jsonl, write_jsonl
+from .plan_store import PlanStore
+
+
+def _report(action: str, count: int, started: float) -> None:
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed else 0.0
+    print(f"{action} {count} plan versions in {elapsed:.1f}s ({rate:,.0f}/s)", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Move plans between storage backends as JSONL.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="Write every plan version to JSONL")
+    export.add_argument("source", help="Backend URL, e.g. file:data/plans")
+    export.add_argument("-o", "--out", default="-", help="Output file (default: stdout)")
+
+    load = commands.add_parser("import", help="Import plan versions from JSONL")
+    load.add_argument("target", help="Backend URL, e.g. sqlite:data/plans.db")
+    load.add_argument("-i", "--in", dest="input", default="-", help="Input file (default: stdin)")
+    load.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Versions per commit")
+
+    copy = commands.add_parser("copy", help="Copy all plans from one backend to another")
+    copy.add_argument("source")
+    copy.add_argument("target")
+    copy.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Versions per commit")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.command == "export":
+        source = PlanStore(open_backend(args.source))
+        out = sys.stdout if args.out == "-" else open(args.out, "w")
+        try:
+            count = write_jsonl(iter_versions(source), out)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+            source.backend.close()
+        _report("Exported", count, started)
+        return
+
+    target = PlanStore(open_backend(args.target))
+    try:
+        if args.command == "import":
+            lines = sys.stdin if args.input == "-" else open(args.input)
+            try:
+                imported, skipped = import_versions(target, read_jsonl(lines), args.batch_size)
+            finally:
+                if lines is not sys.stdin:
+                    lines.close()
+        else:
+            source = PlanStore(open_backend(args.source))
+            try:
+                imported, skipped = import_versions(target, iter_versions(source), args.batch_size)
+            finally:
+                source.backend.close()
+    finally:
+        target.backend.close()
+    _report("Imported", imported, started)
+    if skipped:
+        print(f"Skipped {skipped} versions already present", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Storage backend interface for the plan store.
+
+PlanStore implements content addressing, versioning and deltas on top of a
+few primitives: immutable body objects keyed by address, an append-only
+version history per plan, and a head record per plan. Backends only store
+and fetch those; every write goes through `commit`, which applies a whole
+WriteBatch in one go (one transaction where the backend has them).
+
+Backends are selected by URL, see `open_backend`:
+    file:data/plans          directory tree (default)
+    sqlite:data/plans.db     single SQLite database
+    firestore:PROJECT_ID     Firestore (needs google-cloud-firestore)
+    memory:                  in-process fake Firestore, for tests and benchmarks
+"""
+
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, Optional
+
+
+# User ids become file and directory names (plans, schedules, calendars) and
+# Firestore document ids, so only a conservative character set is accepted.
+USER_ID_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.@-]{0,127}")
+
+
+def check_user_id(user_id: str) -> str:
+    """
+    Return `user_id` if it is safe to use as a path component.
+
+    Raises:
+        ValueError: The id is empty, too long, contains a path separator or
+            other disallowed character, or contains "..".
+    """
+    if not isinstance(user_id, str) or not USER_ID_PATTERN.fullmatch(user_id) or ".." in user_id:
+        raise ValueError(f"Invalid user id {user_id!r}: use letters, digits and _ . @ - only")
+    return user_id
+
+
+# Plan ids are chosen by the model (goal slug plus week) and become file names
+# and Firestore document ids the same way
+PLAN_ID_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.-]{0,127}")
+
+
+def check_plan_id(plan_id: str) -> str:
+    """
+    Return `plan_id` if it is safe to use as a path component.
+
+    Raises:
+        ValueError: The id is empty, too long, contains a path separator or
+            other disallowed character, or contains "..".
+    """
+    if not isinstance(plan_id, str) or not PLAN_ID_PATTERN.fullmatch(plan_id) or ".." in plan_id:
+        raise ValueError(f"Invalid plan id {plan_id!r}: use letters, digits and _ . - only")
+    return plan_id
+
+
+@dataclass
+class WriteBatch:
+    """Writes to apply together: body objects first, then version records in order."""
+
+    objects: dict[tuple[str, str], dict] = field(default_factory=dict)
+    versions: list[dict] = field(default_factory=list)
+    # (user_id, plan_id) -> latest record in `versions`
+    heads: dict[tuple[str, str], dict] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.objects) + len(self.versions)
+
+    def add_object(self, user_id: str, address: str, obj: dict) -> None:
+        self.objects[(user_id, address)] = obj
+
+    def add_version(self, record: dict) -> None:
+        self.versions.append(record)
+        self.heads[(record["user_id"], record["plan_id"])] = record
+
+
+class PlanBackend(ABC):
+    """Storage primitives under PlanStore."""
+
+    @abstractmethod
+    def get_object(self, user_id: str, address: str) -> Optional[dict]:
+        """A body object, or None if it is not stored."""
+
+    @abstractmethod
+    def get_head(self, user_id: str, plan_id: str) -> Optional[dict]:
+        """Head version record of a plan, or None."""
+
+    @abstractmethod
+    def get_history(self, user_id: str, plan_id: str) -> list[dict]:
+        """All version records of a plan, oldest first."""
+
+    @abstractmethod
+    def list_heads(self, user_id: str) -> list[dict]:
+        """Head records of all plans of a user, in no particular order."""
+
+    @abstractmethod
+    def list_users(self) -> Iterator[str]:
+        """Ids of all users with stored plans, sorted."""
+
+    @abstractmethod
+    def commit(self, batch: WriteBatch) -> None:
+        """
+        Apply a batch of writes.
+
+        Objects are written before the version records that reference them,
+        and each version record is appended to its plan's history and becomes
+        the plan's head.
+        """
+
+    def delete_user(self, user_id: str) -> None:
+        """
+        Delete every plan, version and body of a user (used by shard rebalancing).
+
+        Raises:
+            NotImplementedError: The backend does not support it.
+        """
+        raise NotImplementedError(f"{type(self).__name__} cannot delete users")
+
+    def legacy_plans(self, user_id: str) -> list[tuple[str, dict, str]]:
+        """(plan_id, plan, modified_at) of pre-versioning plans still to import."""
+        return []
+
+    def retire_legacy(self, user_id: str, plan_id: str) -> None:
+        """Mark a legacy plan as imported."""
+
+    def close(self) -> None:
+        """Release connections and file handles."""
+
+
+def parse_backend_url(url: str) -> tuple[str, str]:
+    """
+    Split a backend URL into (scheme, location).
+
+    A bare path is treated as a file backend directory.
+    """
+    scheme, _, location = url.partition(":")
+    if not location and scheme != "memory":
+        return "file", url
+    return scheme, location
+
+
+def open_backend(url: str) -> PlanBackend:
+    """
+    Open a backend from a URL such as "file:data/plans" or "sqlite:data/plans.db".
+
+    A bare path is treated as a file backend directory.
+    """
+    scheme, location = parse_backend_url(url)
+
+    if scheme == "file":
+        from .file_backend import FileBackend
+        return FileBackend(Path(location))
+    if scheme == "sqlite":
+        from .sqlite_backend import SqliteBackend
+        return SqliteBackend(Path(location))
+    if scheme == "firestore":
+        from .document_backend import DocumentBackend, firestore_client
+        return DocumentBackend(firestore_client(location))
+    if scheme == "memory":
+        from ..testing import FakeFirestore
+        from .document_backend import DocumentBackend
+        return DocumentBackend(FakeFirestore())
+    raise ValueError(f"Unknown plan storage backend '{scheme}' in '{url}'")
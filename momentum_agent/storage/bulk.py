@@ -0,0 +1,59 @@
+"""
+Streaming bulk export and import of plans as JSONL.
+
+A dump has one line per plan version (see `PlanStore.export_versions`),
+grouped by user and plan with versions oldest first, so it can be replayed
+into any backend. Both directions stream: export holds one plan's history at
+a time (plus the list of user ids) and import holds one batch of lines, so
+memory stays bounded no matter how many plans are moved. Each import batch is
+a single backend commit.
+"""
+
+import json
+from itertools import islice
+from typing import Iterable, Iterator, TextIO
+
+from .plan_store import PlanStore
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def iter_versions(store: PlanStore) -> Iterator[dict]:
+    """Every version of every plan in the store, user by user."""
+    for user_id in store.backend.list_users():
+        yield from store.export_versions(user_id)
+
+
+def write_jsonl(versions: Iterable[dict], out: TextIO) -> int:
+    """Write versions as JSON lines; returns the number written."""
+    count = 0
+    for version in versions:
+        out.write(json.dumps(version) + "\n")
+        count += 1
+    return count
+
+
+def read_jsonl(lines: Iterable[str]) -> Iterator[dict]:
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+
+def import_versions(store: PlanStore, versions: Iterable[dict],
+                    batch_size: int = DEFAULT_BATCH_SIZE) -> tuple[int, int]:
+    """
+    Import versions in batches of `batch_size`.
+
+    Returns:
+        (imported, skipped); versions the store already has are skipped.
+    """
+    imported = skipped = 0
+    iterator = iter(versions)
+    while chunk := list(islice(iterator, batch_size)):
+        with store.batch():
+            for version in chunk:
+                if store.import_version(version):
+                    imported += 1
+                else:
+                    skipped += 1
+    return imported, skipped
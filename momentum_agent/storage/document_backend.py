@@ -0,0 +1,88 @@
+"""
+Document-store (Firestore) plan storage backend.
+
+Layout:
+    users/{user_id}                                  {"user_id": ...}
+    users/{user_id}/objects/{address}                {"json": body object}
+    users/{user_id}/plans/{plan_id}                  head version record
+    users/{user_id}/plans/{plan_id}/versions/{n}     version record
+
+Body objects are stored as a JSON string because delta ops are arrays of
+arrays, which Firestore cannot hold. Batches are committed as Firestore
+batched writes of at most 500 operations each; a WriteBatch larger than that
+is split, with each chunk atomic on its own. Heads are written last, so a
+partially applied batch never exposes a head whose body is missing.
+
+Works with `google.cloud.firestore.Client` (including against the emulator
+via FIRESTORE_EMULATOR_HOST) or `momentum_agent.testing.FakeFirestore`.
+"""
+
+import json
+from typing import Any, Iterator, Optional
+
+from .backend import PlanBackend, WriteBatch, check_user_id
+
+MAX_BATCH_WRITES = 500
+
+
+def firestore_client(project: str) -> Any:
+    """Create a Firestore client; requires the google-cloud-firestore package."""
+    try:
+        from google.cloud import firestore
+    except ImportError as e:
+        raise ImportError(
+            "The firestore plan backend needs google-cloud-firestore: pip install google-cloud-firestore"
+        ) from e
+    return firestore.Client(project=project or None)
+
+
+def _version_id(version: int) -> str:
+    # Zero-padded so document ids sort in version order
+    return f"{version:08d}"
+
+
+class DocumentBackend(PlanBackend):
+    """Plan storage in Firestore-style collections, one document tree per user."""
+
+    def __init__(self, client: Any, collection: str = "users"):
+        self.client = client
+        self.collection = collection
+
+    def _user(self, user_id: str):
+        return self.client.collection(self.collection).document(check_user_id(user_id))
+
+    def get_object(self, user_id: str, address: str) -> Optional[dict]:
+        snapshot = self._user(user_id).collection("objects").document(address).get()
+        return json.loads(snapshot.to_dict()["json"]) if snapshot.exists else None
+
+    def get_head(self, user_id: str, plan_id: str) -> Optional[dict]:
+        snapshot = self._user(user_id).collection("plans").document(plan_id).get()
+        return snapshot.to_dict() if snapshot.exists else None
+
+    def get_history(self, user_id: str, plan_id: str) -> list[dict]:
+        versions = self._user(user_id).collection("plans").document(plan_id).collection("versions")
+        return [snapshot.to_dict() for snapshot in versions.stream()]
+
+    def list_heads(self, user_id: str) -> list[dict]:
+        return [snapshot.to_dict() for snapshot in self._user(user_id).collection("plans").stream()]
+
+    def list_users(self) -> Iterator[str]:
+        return (snapshot.id for snapshot in self.client.collection(self.collection).stream())
+
+    def commit(self, batch: WriteBatch) -> None:
+        writes = []
+        for user_id in sorted({user_id for user_id, _ in batch.heads}):
+            writes.append((self._user(user_id), {"user_id": user_id}))
+        for (user_id, address), obj in batch.objects.items():
+            writes.append((self._user(user_id).collection("objects").document(address), {"json": json.dumps(obj)}))
+        for record in batch.versions:
+            plan = self._user(record["user_id"]).collection("plans").document(record["plan_id"])
+            writes.append((plan.collection("versions").document(_version_id(record["version"])), record))
+        for (user_id, plan_id), record in batch.heads.items():
+            writes.append((self._user(user_id).collection("plans").document(plan_id), record))
+
+        for start in range(0, len(writes), MAX_BATCH_WRITES):
+            write_batch = self.client.batch()
+            for reference, data in writes[start:start + MAX_BATCH_WRITES]:
+                write_batch.set(reference, data)
+            write_batch.commit()
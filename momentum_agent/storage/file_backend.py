@@ -0,0 +1,129 @@
+"""
+Directory-tree plan storage backend.
+
+Layout under `root/{user_id}/`:
+    objects/ab/cdef...json   body object
+    refs/{plan_id}.json      head version record
+    history/{plan_id}.jsonl  every version record, oldest first
+
+Flat `{plan_id}.json` files written by earlier versions of the plan tools are
+reported as legacy plans and moved to `legacy/` once imported.
+"""
+
+import json
+import logging
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+from .backend import PlanBackend, WriteBatch, check_plan_id, check_user_id
+
+logger = logging.getLogger(__name__)
+
+
+def _write_atomic(path: str, data: str) -> None:
+    """Write via a temp file and rename so readers never see partial files."""
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _read_json(path: str) -> Optional[dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+class FileBackend(PlanBackend):
+    """Plan storage as JSON files, one directory per user."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        # Hot paths build plain strings: pathlib interns every path component,
+        # which grows without bound over a bulk import
+        self._root = str(self.root)
+
+    def _path(self, user_id: str, *parts: str) -> str:
+        return os.path.join(self._root, check_user_id(user_id), *parts)
+
+    def _plan_path(self, user_id: str, kind: str, plan_id: str, suffix: str) -> str:
+        return self._path(user_id, kind, check_plan_id(plan_id) + suffix)
+
+    def _object_path(self, user_id: str, address: str) -> str:
+        return self._path(user_id, "objects", address[:2], f"{address[2:]}.json")
+
+    def get_object(self, user_id: str, address: str) -> Optional[dict]:
+        return _read_json(self._object_path(user_id, address))
+
+    def get_head(self, user_id: str, plan_id: str) -> Optional[dict]:
+        return _read_json(self._plan_path(user_id, "refs", plan_id, ".json"))
+
+    def get_history(self, user_id: str, plan_id: str) -> list[dict]:
+        try:
+            with open(self._plan_path(user_id, "history", plan_id, ".jsonl")) as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def list_heads(self, user_id: str) -> list[dict]:
+        refs_dir = self._path(user_id, "refs")
+        if not os.path.isdir(refs_dir):
+            return []
+        return [
+            _read_json(os.path.join(refs_dir, name))
+            for name in os.listdir(refs_dir)
+            if name.endswith(".json")
+        ]
+
+    def list_users(self) -> Iterator[str]:
+        if not self.root.exists():
+            return iter(())
+        return iter(sorted(entry.name for entry in os.scandir(self._root) if entry.is_dir()))
+
+    def commit(self, batch: WriteBatch) -> None:
+        for (user_id, address), obj in batch.objects.items():
+            path = self._object_path(user_id, address)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _write_atomic(path, json.dumps(obj))
+
+        by_plan: dict[tuple[str, str], list[dict]] = {}
+        for record in batch.versions:
+            by_plan.setdefault((record["user_id"], record["plan_id"]), []).append(record)
+        for (user_id, plan_id), records in by_plan.items():
+            os.makedirs(self._path(user_id, "history"), exist_ok=True)
+            os.makedirs(self._path(user_id, "refs"), exist_ok=True)
+            with open(self._plan_path(user_id, "history", plan_id, ".jsonl"), "a") as f:
+                f.write("".join(json.dumps(record) + "\n" for record in records))
+            _write_atomic(self._plan_path(user_id, "refs", plan_id, ".json"), json.dumps(records[-1]))
+
+    def delete_user(self, user_id: str) -> None:
+        shutil.rmtree(self._path(user_id), ignore_errors=True)
+
+    # -- legacy ---------------------------------------------------------------
+
+    def legacy_plans(self, user_id: str) -> list[tuple[str, dict, str]]:
+        user_dir = Path(self._path(user_id))
+        if not user_dir.exists():
+            return []
+        plans = []
+        for path in sorted(user_dir.glob("*.json"), key=lambda p: p.stat().st_mtime):
+            try:
+                check_plan_id(path.stem)
+            except ValueError:
+                logger.warning("Skipping legacy plan file with an invalid plan id: %s", path)
+                continue
+            with open(path) as f:
+                plan = json.load(f)
+            # File mtime becomes updated_at so "most recent" ordering is preserved
+            plans.append((path.stem, plan, datetime.fromtimestamp(path.stat().st_mtime).isoformat()))
+        return plans
+
+    def retire_legacy(self, user_id: str, plan_id: str) -> None:
+        user_dir = Path(self._path(user_id))
+        (user_dir / "legacy").mkdir(exist_ok=True)
+        os.replace(user_dir / f"{plan_id}.json", user_dir / "legacy" / f"{plan_id}.json")
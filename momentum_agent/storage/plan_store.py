@@ -0,0 +1,353 @@
+"""
+Content-addressed, versioned plan storage.
+
+Plan bodies (the workout text) are hashed with SHA-256 and stored once per
+user, so identical week templates across goals and weeks share one object.
+Each plan id points to an append-only list of immutable versions; a small
+head pointer holds the latest version record so loads and listings never
+scan history. Edits are stored as line deltas against the parent body when
+that is smaller than the full text, with a bounded delta chain.
+
+Body objects are {"type": "full", "text": ...} or
+{"type": "delta", "base": sha, "depth": n, "ops": [...]}. Where they live is
+up to the storage backend (files, SQLite or a document store, see
+`momentum_agent.storage.backend`); writes can be grouped with `batch()` so a
+backend commits many saves at once.
+
+Plans saved by earlier versions of the plan tools (flat files) are imported
+as version 1 on first access.
+"""
+
+import difflib
+import hashlib
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+from ..config import DATA_DIR
+from .backend import PlanBackend, WriteBatch, check_plan_id
+from .file_backend import FileBackend
+
+PLANS_DIR = DATA_DIR / "plans"
+
+# Longest chain of deltas before a full copy of the body is stored again
+MAX_DELTA_CHAIN = 8
+
+
+def content_address(text: str) -> str:
+    """SHA-256 hex digest addressing a plan body."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def make_delta(base: str, text: str) -> list:
+    """
+    Line delta turning `base` into `text`.
+
+    Ops are ["=", start, end] (copy base lines start:end) or ["+", [lines]].
+    """
+    base_lines = base.splitlines(keepends=True)
+    lines = text.splitlines(keepends=True)
+    ops = []
+    matcher = difflib.SequenceMatcher(a=base_lines, b=lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append(["=", i1, i2])
+        elif j2 > j1:
+            ops.append(["+", lines[j1:j2]])
+    return ops
+
+
+def apply_delta(base: str, ops: list) -> str:
+    """Rebuild a body from its base and the ops produced by `make_delta`."""
+    base_lines = base.splitlines(keepends=True)
+    out = []
+    for op in ops:
+        if op[0] == "=":
+            out.extend(base_lines[op[1]:op[2]])
+        else:
+            out.extend(op[1])
+    return "".join(out)
+
+
+class PlanStore:
+    """
+    Versioned plan store over a storage backend.
+
+    Plans are exchanged as dicts in the same shape the plan tools have always
+    used (`user_id`, `goal_id`, `created_at`, `date`, `status`,
+    `exercises_text`, `metadata`), plus `plan_id`, `version` and `updated_at`.
+
+    Plan ids are checked with `check_plan_id` before any backend sees them,
+    so every method taking one raises ValueError for an unsafe id.
+    """
+
+    def __init__(self, backend: Union[PlanBackend, Path, str] = PLANS_DIR):
+        """
+        Args:
+            backend: Storage backend, or a directory for the file backend.
+        """
+        self.backend = backend if isinstance(backend, PlanBackend) else FileBackend(Path(backend))
+        # Pending writes of the enclosing `batch()` block, per thread / task
+        self._batch: ContextVar[Optional[WriteBatch]] = ContextVar("plan_store_batch", default=None)
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Group writes into one backend commit.
+
+        Saves inside the block are buffered, visible to reads made in the same
+        block, and committed together when it exits; nothing is written if it
+        raises. Nested blocks join the outermost one.
+        """
+        if self._batch.get() is not None:
+            yield
+            return
+        batch = WriteBatch()
+        token = self._batch.set(batch)
+        try:
+            yield
+        finally:
+            self._batch.reset(token)
+        if batch:
+            self.backend.commit(batch)
+
+    # -- objects --------------------------------------------------------------
+
+    def _get_object(self, user_id: str, address: str) -> Optional[dict]:
+        batch = self._batch.get()
+        if batch is not None and (user_id, address) in batch.objects:
+            return batch.objects[(user_id, address)]
+        return self.backend.get_object(user_id, address)
+
+    def _read_body(self, user_id: str, address: str, cache: Optional[dict[str, str]] = None) -> str:
+        """Materialize a body, resolving its delta chain (stopping early at cached bodies)."""
+        chain = []
+        while not (cache and address in cache):
+            obj = self._get_object(user_id, address)
+            if obj["type"] == "full":
+                text = obj["text"]
+                break
+            chain.append(obj["ops"])
+            address = obj["base"]
+        else:
+            text = cache[address]
+        for ops in reversed(chain):
+            text = apply_delta(text, ops)
+        return text
+
+    def _write_body(self, user_id: str, text: str, parent: Optional[str]) -> str:
+        """Store a body once, as a delta against `parent` when that is smaller."""
+        address = content_address(text)
+        if self._get_object(user_id, address) is not None:
+            return address
+
+        obj = {"type": "full", "text": text}
+        if parent:
+            parent_obj = self._get_object(user_id, parent)
+            depth = parent_obj.get("depth", 0) + 1
+            if depth <= MAX_DELTA_CHAIN:
+                delta = {
+                    "type": "delta",
+                    "base": parent,
+                    "depth": depth,
+                    "ops": make_delta(self._read_body(user_id, parent), text),
+                }
+                if len(json.dumps(delta)) < len(json.dumps(obj)):
+                    obj = delta
+
+        self._batch.get().add_object(user_id, address, obj)
+        return address
+
+    # -- versions -------------------------------------------------------------
+
+    def _head(self, user_id: str, plan_id: str) -> Optional[dict]:
+        batch = self._batch.get()
+        if batch is not None and (user_id, plan_id) in batch.heads:
+            return batch.heads[(user_id, plan_id)]
+        return self.backend.get_head(user_id, plan_id)
+
+    def _history(self, user_id: str, plan_id: str) -> list[dict]:
+        records = self.backend.get_history(user_id, plan_id)
+        batch = self._batch.get()
+        if batch is not None and (user_id, plan_id) in batch.heads:
+            records += [r for r in batch.versions if r["user_id"] == user_id and r["plan_id"] == plan_id]
+        return records
+
+    def head(self, user_id: str, plan_id: str) -> Optional[dict]:
+        """Latest version record of a plan, or None if it does not exist."""
+        check_plan_id(plan_id)
+        self.import_legacy(user_id)
+        return self._head(user_id, plan_id)
+
+    def history(self, user_id: str, plan_id: str) -> list[dict]:
+        """All version records of a plan, oldest first (bodies not loaded)."""
+        check_plan_id(plan_id)
+        self.import_legacy(user_id)
+        return self._history(user_id, plan_id)
+
+    def save(self, user_id: str, plan_id: str, plan: dict, message: str = "") -> dict:
+        """
+        Save a new version of a plan.
+
+        Saving content and metadata identical to the head is a no-op.
+
+        Args:
+            user_id: Owner of the plan.
+            plan_id: Plan identifier, e.g. "run_a_5k_week1".
+            plan: Plan dict; `exercises_text` is the versioned body.
+            message: Optional note describing the change.
+
+        Returns:
+            The head version record after the save.
+        """
+        check_plan_id(plan_id)
+        self.import_legacy(user_id)
+        with self.batch():
+            return self._save(user_id, plan_id, plan, message)
+
+    def _save(
+        self,
+        user_id: str,
+        plan_id: str,
+        plan: dict,
+        message: str,
+        saved_at: Optional[str] = None,
+    ) -> dict:
+        head = self._head(user_id, plan_id)
+        address = self._write_body(user_id, plan.get("exercises_text", ""), head["body"] if head else None)
+
+        fields = {
+            "goal_id": plan.get("goal_id"),
+            "date": plan.get("date"),
+            "status": plan.get("status"),
+            "metadata": plan.get("metadata", {}),
+        }
+        if head and head["body"] == address and all(head.get(k) == v for k, v in fields.items()):
+            return head
+
+        now = saved_at or datetime.now().isoformat()
+        record = {
+            "plan_id": plan_id,
+            "user_id": user_id,
+            "version": head["version"] + 1 if head else 1,
+            "parent": head["version"] if head else None,
+            "body": address,
+            "created_at": head["created_at"] if head else plan.get("created_at", now),
+            "updated_at": now,
+            "message": message,
+            **fields,
+        }
+        self._batch.get().add_version(record)
+        return record
+
+    def load(self, user_id: str, plan_id: str, version: Optional[int] = None) -> Optional[dict]:
+        """
+        Load a plan at its head or at a specific version.
+
+        Returns:
+            The plan dict, or None if the plan or version does not exist.
+        """
+        check_plan_id(plan_id)
+        self.import_legacy(user_id)
+        record = self._head(user_id, plan_id)
+        if record and version is not None and version != record["version"]:
+            record = next((r for r in self._history(user_id, plan_id) if r["version"] == version), None)
+        if record is None:
+            return None
+        plan = {k: v for k, v in record.items() if k not in ("body", "parent", "message")}
+        plan["exercises_text"] = self._read_body(user_id, record["body"])
+        return plan
+
+    def rollback(self, user_id: str, plan_id: str, version: int) -> Optional[dict]:
+        """
+        Make an earlier version the head again.
+
+        History is never rewritten: the rollback is recorded as a new version
+        pointing at the earlier body.
+
+        Returns:
+            The new head record, or None if the plan or version does not exist.
+        """
+        check_plan_id(plan_id)
+        self.import_legacy(user_id)
+        with self.batch():
+            target = next((r for r in self._history(user_id, plan_id) if r["version"] == version), None)
+            head = self._head(user_id, plan_id)
+            if target is None or head is None:
+                return None
+            record = {
+                **target,
+                "version": head["version"] + 1,
+                "parent": head["version"],
+                "updated_at": datetime.now().isoformat(),
+                "message": f"Rollback to version {version}",
+            }
+            self._batch.get().add_version(record)
+            return record
+
+    def list_plans(self, user_id: str) -> list[dict]:
+        """Head records of all plans of a user, most recently updated first."""
+        self.import_legacy(user_id)
+        heads = {record["plan_id"]: record for record in self.backend.list_heads(user_id)}
+        batch = self._batch.get()
+        if batch is not None:
+            heads.update({plan_id: r for (owner, plan_id), r in batch.heads.items() if owner == user_id})
+        return sorted(heads.values(), key=lambda r: r["updated_at"], reverse=True)
+
+    # -- bulk -----------------------------------------------------------------
+
+    def export_versions(self, user_id: str) -> Iterator[dict]:
+        """
+        Every version of every plan of a user, with its body as `exercises_text`.
+
+        Plans are yielded in plan_id order and versions oldest first, which is
+        the order `import_version` expects.
+        """
+        self.import_legacy(user_id)
+        for head in sorted(self.backend.list_heads(user_id), key=lambda r: r["plan_id"]):
+            bodies: dict[str, str] = {}
+            for record in self.backend.get_history(user_id, head["plan_id"]):
+                if record["body"] not in bodies:
+                    bodies[record["body"]] = self._read_body(user_id, record["body"], bodies)
+                version = {k: v for k, v in record.items() if k != "body"}
+                version["exercises_text"] = bodies[record["body"]]
+                yield version
+
+    def import_version(self, version: dict) -> bool:
+        """
+        Store one version produced by `export_versions`, keeping its number,
+        timestamps and message.
+
+        Returns:
+            False if the plan already has this version (re-running an import
+            is safe), True otherwise.
+        """
+        user_id, plan_id = version["user_id"], check_plan_id(version["plan_id"])
+        with self.batch():
+            head = self._head(user_id, plan_id)
+            if head and head["version"] >= version["version"]:
+                return False
+            record = {k: v for k, v in version.items() if k != "exercises_text"}
+            record["body"] = self._write_body(user_id, version["exercises_text"], head["body"] if head else None)
+            self._batch.get().add_version(record)
+            return True
+
+    # -- legacy ---------------------------------------------------------------
+
+    def import_legacy(self, user_id: str) -> None:
+        """Import pre-versioning plans as version 1 and let the backend retire them."""
+        for plan_id, plan, modified in self.backend.legacy_plans(user_id):
+            plan.setdefault("created_at", modified)
+            # Committed on its own, even inside an enclosing batch, before the
+            # legacy copy is retired
+            batch = WriteBatch()
+            token = self._batch.set(batch)
+            try:
+                self._save(user_id, plan_id, plan, "Imported from legacy file", saved_at=modified)
+            finally:
+                self._batch.reset(token)
+            self.backend.commit(batch)
+            self.backend.retire_legacy(user_id, plan_id)
@@ -0,0 +1,265 @@
+"""
+Tuned SQLite session store.
+
+`DatabaseSessionService` on a bare sqlite+aiosqlite URL runs SQLite with its
+defaults: a rollback journal that blocks readers while a turn is written, a
+full fsync on every commit, and one transaction per event. TunedSqliteSessionService
+keeps the same schema and API (it is a drop-in subclass) and changes how the
+database is driven:
+
+- Every pooled connection runs in WAL mode with synchronous=NORMAL (commits
+  no longer fsync; a power loss can drop the last commits but never corrupts
+  the database) and a busy timeout, so concurrent sessions wait for the write
+  lock instead of failing.
+- Write transactions start with BEGIN IMMEDIATE, taking the write lock up
+  front so two turns cannot both read and then deadlock upgrading to a write.
+- A fixed-size connection pool lets session loads run alongside a write.
+- The events of a turn are buffered in memory and written in a single
+  transaction when the turn's final response arrives (or when the session is
+  read, flushed or the runner closes), instead of one commit per event.
+- An index on (app_name, user_id, update_time) serves per-user session
+  listing in order, without a sort.
+
+A crash mid-turn loses that turn's buffered events, which is the turn the
+user never got an answer for.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from google.adk.events import Event
+from google.adk.sessions import DatabaseSessionService, Session
+from google.adk.sessions import _session_util
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.database_session_service import (
+    _STALE_SESSION_ERROR_MESSAGE,
+    SessionNotFoundError,
+    StaleSessionError,
+)
+from sqlalchemy import event as sa_event
+from sqlalchemy import select, text
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+logger = logging.getLogger(__name__)
+
+# DatabaseSessionService internals this subclass relies on (tested with
+# google-adk 2.12, see requirements.txt); fail at import, not on the first write
+_REQUIRED_INTERNALS = (
+    "_apply_temp_state",
+    "_trim_temp_delta_state",
+    "_commit_event_to_session",
+    "_with_session_lock",
+    "_rollback_on_exception_session",
+    "_get_schema_classes",
+    "_uses_naive_datetime",
+)
+_missing = [name for name in _REQUIRED_INTERNALS if not hasattr(DatabaseSessionService, name)]
+if "_storage_update_marker" not in Session.__private_attributes__:
+    _missing.append("Session._storage_update_marker")
+if _missing:
+    raise ImportError(
+        f"TunedSqliteSessionService needs google-adk 2.12.x; DatabaseSessionService or Session lacks {', '.join(_missing)}"
+    )
+
+# Flush a turn early if it grows past this many events
+MAX_BUFFERED_EVENTS = 64
+
+# Per-user listing filters on (app_name, user_id) and orders by update_time.
+# App-wide listing is left to a table scan: at these sizes a scan plus sort
+# beats walking a secondary index row by row.
+SESSION_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_sessions_app_user_update "
+    "ON sessions (app_name, user_id, update_time, id)",
+]
+
+_SessionKey = tuple[str, str, str]
+
+
+@dataclass
+class _PendingTurn:
+    """Events appended to a session but not yet written."""
+
+    session: Session
+    marker: str
+    events: list[Event] = field(default_factory=list)
+
+
+class TunedSqliteSessionService(DatabaseSessionService):
+    """
+    DatabaseSessionService for a SQLite file, tuned for concurrent sessions.
+
+    Args:
+        db_url: sqlite+aiosqlite URL of the database file.
+        pool_size: Pooled connections (readers run concurrently with the writer).
+        busy_timeout_ms: How long a connection waits for the write lock.
+        synchronous: SQLite synchronous mode; NORMAL is safe with WAL.
+        batch_events: Buffer each turn's events and write them in one transaction.
+    """
+
+    def __init__(
+        self,
+        db_url: str,
+        pool_size: int = 8,
+        busy_timeout_ms: int = 5000,
+        synchronous: str = "NORMAL",
+        batch_events: bool = True,
+    ):
+        super().__init__(
+            db_url=db_url,
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=pool_size,
+            max_overflow=0,
+        )
+        if not hasattr(self, "_table_creation_lock"):
+            raise RuntimeError("TunedSqliteSessionService needs google-adk 2.12.x (no _table_creation_lock)")
+        self.batch_events = batch_events
+        self._pending: dict[_SessionKey, _PendingTurn] = {}
+        self._indexes_created = False
+
+        pragmas = [
+            "PRAGMA journal_mode=WAL",
+            f"PRAGMA synchronous={synchronous}",
+            f"PRAGMA busy_timeout={busy_timeout_ms}",
+            "PRAGMA temp_store=MEMORY",
+        ]
+
+        def on_connect(dbapi_connection, connection_record) -> None:
+            # Let SQLAlchemy's begin event below issue BEGIN itself
+            dbapi_connection.isolation_level = None
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            cursor.close()
+
+        def on_begin(connection) -> None:
+            read_only = connection.get_execution_options().get("read_only")
+            connection.exec_driver_sql("BEGIN" if read_only else "BEGIN IMMEDIATE")
+
+        sa_event.listen(self.db_engine.sync_engine, "connect", on_connect)
+        sa_event.listen(self.db_engine.sync_engine, "begin", on_begin)
+
+    async def prepare_tables(self) -> None:
+        await super().prepare_tables()
+        if self._indexes_created:
+            return
+        async with self._table_creation_lock:
+            if not self._indexes_created:
+                async with self.db_engine.begin() as connection:
+                    for statement in SESSION_INDEXES:
+                        await connection.execute(text(statement))
+                self._indexes_created = True
+
+    # -- batched appends ----------------------------------------------------
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        marker = session._storage_update_marker
+        key = (session.app_name, session.user_id, session.id)
+        pending = self._pending.get(key)
+        if pending is not None and pending.session is not session:
+            # A different copy of the session is being appended to; write the
+            # old one's turn first so the stale check sees its events
+            await self.flush_session(*key)
+            pending = None
+        if not self.batch_events or (pending is None and marker is None):
+            return await super().append_event(session, event)
+        if event.partial:
+            return event
+
+        await self.prepare_tables()
+        self._apply_temp_state(session, event)
+        event = self._trim_temp_delta_state(event)
+        if pending is None:
+            pending = self._pending[key] = _PendingTurn(session=session, marker=marker)
+        pending.events.append(event)
+        self._commit_event_to_session(session, event)
+
+        if (event.author != "user" and event.is_final_response()) or len(pending.events) >= MAX_BUFFERED_EVENTS:
+            await self.flush_session(*key)
+        return event
+
+    async def flush_session(self, app_name: str, user_id: str, session_id: str) -> None:
+        """Write a session's buffered events, if any."""
+        key = (app_name, user_id, session_id)
+        async with self._with_session_lock(app_name=app_name, user_id=user_id, session_id=session_id):
+            pending = self._pending.pop(key, None)
+            if pending and pending.events:
+                await self._write_turn(pending)
+
+    async def flush(self) -> None:
+        """Write every buffered turn (called by Runner.close)."""
+        for key in list(self._pending):
+            await self.flush_session(*key)
+
+    async def _write_turn(self, pending: _PendingTurn) -> None:
+        """Write a turn's events in one transaction, with the same stale check as append_event."""
+        session, events = pending.session, pending.events
+        schema = self._get_schema_classes()
+        deltas: dict[str, dict[str, Any]] = {"app": {}, "user": {}, "session": {}}
+        for event in events:
+            extracted = _session_util.extract_json_safe_state_delta(event.actions.state_delta or {})
+            for scope in deltas:
+                deltas[scope].update(extracted[scope])
+
+        async with self._rollback_on_exception_session() as sql_session:
+            storage_session = (await sql_session.execute(
+                select(schema.StorageSession)
+                .filter(schema.StorageSession.app_name == session.app_name)
+                .filter(schema.StorageSession.user_id == session.user_id)
+                .filter(schema.StorageSession.id == session.id)
+            )).scalars().one_or_none()
+            if storage_session is None:
+                raise SessionNotFoundError(f"Session {session.id} not found.")
+            if storage_session.get_update_marker() != pending.marker:
+                raise StaleSessionError(_STALE_SESSION_ERROR_MESSAGE)
+
+            if deltas["app"]:
+                app_state = await sql_session.get(schema.StorageAppState, session.app_name)
+                app_state.state.update(deltas["app"])
+            if deltas["user"]:
+                user_state = await sql_session.get(schema.StorageUserState, (session.app_name, session.user_id))
+                user_state.state.update(deltas["user"])
+            if deltas["session"]:
+                storage_session.state.update(deltas["session"])
+
+            update_time = datetime.fromtimestamp(events[-1].timestamp, timezone.utc)
+            if self._uses_naive_datetime():
+                update_time = update_time.replace(tzinfo=None)
+            storage_session.update_time = update_time
+            sql_session.add_all([schema.StorageEvent.from_event(session, event) for event in events])
+
+            last_update_time = storage_session.get_update_timestamp()
+            marker = storage_session.get_update_marker()
+            await sql_session.commit()
+
+        session.last_update_time = last_update_time
+        session._storage_update_marker = marker
+
+    # -- reads see buffered writes -------------------------------------------
+
+    async def _flush_matching(self, app_name: str, user_id: Optional[str] = None) -> None:
+        for key in [k for k in self._pending if k[0] == app_name and user_id in (None, k[1])]:
+            await self.flush_session(*key)
+
+    async def get_session(
+        self, *, app_name: str, user_id: str, session_id: str, config: Optional[GetSessionConfig] = None
+    ) -> Optional[Session]:
+        await self.flush_session(app_name, user_id, session_id)
+        return await super().get_session(app_name=app_name, user_id=user_id, session_id=session_id, config=config)
+
+    async def list_sessions(self, *, app_name: str, user_id: Optional[str] = None) -> ListSessionsResponse:
+        await self._flush_matching(app_name, user_id)
+        return await super().list_sessions(app_name=app_name, user_id=user_id)
+
+    async def get_user_state(self, *, app_name: str, user_id: str) -> dict[str, Any]:
+        await self._flush_matching(app_name, user_id)
+        return await super().get_user_state(app_name=app_name, user_id=user_id)
+
+    async def delete_session(self, app_name: str, user_id: str, session_id: str) -> None:
+        self._pending.pop((app_name, user_id, session_id), None)
+        await super().delete_session(app_name, user_id, session_id)
+
+    async def close(self) -> None:
+        await self.flush()
+        await super().close()
@@ -0,0 +1,115 @@
+"""
+SQLite plan storage backend.
+
+All users share one database file. Each WriteBatch is committed as a single
+transaction, so a batch of saves costs one commit instead of one per plan.
+The database runs in WAL mode so readers are not blocked by a writer.
+"""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterator, Optional
+
+from .backend import PlanBackend, WriteBatch
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    user_id TEXT NOT NULL,
+    address TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (user_id, address)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS versions (
+    user_id TEXT NOT NULL,
+    plan_id TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    record TEXT NOT NULL,
+    PRIMARY KEY (user_id, plan_id, version)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS heads (
+    user_id TEXT NOT NULL,
+    plan_id TEXT NOT NULL,
+    record TEXT NOT NULL,
+    PRIMARY KEY (user_id, plan_id)
+) WITHOUT ROWID;
+"""
+
+
+class SqliteBackend(PlanBackend):
+    """Plan storage in one SQLite database."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Tools may run on worker threads; one connection guarded by a lock
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def _fetch(self, query: str, params: tuple) -> list[tuple]:
+        with self._lock:
+            return self._conn.execute(query, params).fetchall()
+
+    def get_object(self, user_id: str, address: str) -> Optional[dict]:
+        rows = self._fetch("SELECT data FROM objects WHERE user_id = ? AND address = ?", (user_id, address))
+        return json.loads(rows[0][0]) if rows else None
+
+    def get_head(self, user_id: str, plan_id: str) -> Optional[dict]:
+        rows = self._fetch("SELECT record FROM heads WHERE user_id = ? AND plan_id = ?", (user_id, plan_id))
+        return json.loads(rows[0][0]) if rows else None
+
+    def get_history(self, user_id: str, plan_id: str) -> list[dict]:
+        rows = self._fetch(
+            "SELECT record FROM versions WHERE user_id = ? AND plan_id = ? ORDER BY version", (user_id, plan_id)
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    def list_heads(self, user_id: str) -> list[dict]:
+        rows = self._fetch("SELECT record FROM heads WHERE user_id = ?", (user_id,))
+        return [json.loads(row[0]) for row in rows]
+
+    def list_users(self) -> Iterator[str]:
+        rows = self._fetch("SELECT DISTINCT user_id FROM heads ORDER BY user_id", ())
+        return iter([row[0] for row in rows])
+
+    def commit(self, batch: WriteBatch) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO objects (user_id, address, data) VALUES (?, ?, ?)",
+                    [(user_id, address, json.dumps(obj)) for (user_id, address), obj in batch.objects.items()],
+                )
+                self._conn.executemany(
+                    "INSERT INTO versions (user_id, plan_id, version, record) VALUES (?, ?, ?, ?)",
+                    [(r["user_id"], r["plan_id"], r["version"], json.dumps(r)) for r in batch.versions],
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO heads (user_id, plan_id, record) VALUES (?, ?, ?)",
+                    [(user_id, plan_id, json.dumps(r)) for (user_id, plan_id), r in batch.heads.items()],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete_user(self, user_id: str) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for table in ("heads", "versions", "objects"):
+                    self._conn.execute(f"DELETE FROM {table} WHERE user_id = ?", (user_id,))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
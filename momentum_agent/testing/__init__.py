@@ -0,0 +1,6 @@
+"""Offline helpers for running the agents without a live model."""
+
+from .fake_firestore import FakeFirestore
+from .stub_model import COACHING_ROUTES, StubLlm, StubModelError, ToolRoute
+
+__all__ = ["COACHING_ROUTES", "FakeFirestore", "StubLlm", "StubModelError", "ToolRoute"]
@@ -0,0 +1,126 @@
+"""
+In-process fake of the Firestore client.
+
+Implements the subset of `google.cloud.firestore.Client` the document plan
+backend uses (collection/document references, get, set, stream and batched
+writes) over nested dicts, so the backend can be exercised without the
+emulator or credentials. Firestore's write rules that matter for plan
+records are enforced: at most 500 writes per batch and no arrays directly
+inside arrays.
+"""
+
+import copy
+import threading
+from collections import defaultdict
+from typing import Any, Iterator, Optional
+
+MAX_BATCH_WRITES = 500
+
+
+def _validate(value: Any, in_array: bool = False) -> None:
+    if isinstance(value, (list, tuple)):
+        if in_array:
+            raise ValueError("Cannot convert an array value in an array value.")
+        for item in value:
+            _validate(item, in_array=True)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _validate(item)
+
+
+class FakeDocumentSnapshot:
+    def __init__(self, reference: "FakeDocumentReference", data: Optional[dict]):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[dict]:
+        return copy.deepcopy(self._data)
+
+
+class FakeDocumentReference:
+    def __init__(self, client: "FakeFirestore", path: str):
+        self._client = client
+        self.path = path
+        self.parent_path, _, self.id = path.rpartition("/")
+
+    def collection(self, collection_id: str) -> "FakeCollectionReference":
+        return FakeCollectionReference(self._client, f"{self.path}/{collection_id}")
+
+    def get(self) -> FakeDocumentSnapshot:
+        return FakeDocumentSnapshot(self, self._client._read(self.parent_path, self.id))
+
+    def set(self, document_data: dict, merge: bool = False) -> None:
+        batch = self._client.batch()
+        batch.set(self, document_data, merge=merge)
+        batch.commit()
+
+
+class FakeCollectionReference:
+    def __init__(self, client: "FakeFirestore", path: str):
+        self._client = client
+        self.path = path
+        self.id = path.rpartition("/")[2]
+
+    def document(self, document_id: str) -> FakeDocumentReference:
+        return FakeDocumentReference(self._client, f"{self.path}/{document_id}")
+
+    def stream(self) -> Iterator[FakeDocumentSnapshot]:
+        for document_id, data in self._client._list(self.path):
+            yield FakeDocumentSnapshot(self.document(document_id), data)
+
+
+class FakeWriteBatch:
+    def __init__(self, client: "FakeFirestore"):
+        self._client = client
+        self._writes: list[tuple[FakeDocumentReference, dict, bool]] = []
+
+    def set(self, reference: FakeDocumentReference, document_data: dict, merge: bool = False) -> None:
+        _validate(document_data)
+        self._writes.append((reference, copy.deepcopy(document_data), merge))
+
+    def commit(self) -> None:
+        if len(self._writes) > MAX_BATCH_WRITES:
+            raise ValueError(f"maximum {MAX_BATCH_WRITES} writes allowed per request")
+        self._client._apply(self._writes)
+        self._writes = []
+
+
+class FakeFirestore:
+    """Stand-in for `google.cloud.firestore.Client`; `commits` counts round trips."""
+
+    def __init__(self):
+        self._collections: dict[str, dict[str, dict]] = defaultdict(dict)
+        self._lock = threading.Lock()
+        self.commits = 0
+
+    def collection(self, collection_path: str) -> FakeCollectionReference:
+        return FakeCollectionReference(self, collection_path)
+
+    def document(self, document_path: str) -> FakeDocumentReference:
+        return FakeDocumentReference(self, document_path)
+
+    def batch(self) -> FakeWriteBatch:
+        return FakeWriteBatch(self)
+
+    def _read(self, collection_path: str, document_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._collections.get(collection_path, {}).get(document_id)
+
+    def _list(self, collection_path: str) -> list[tuple[str, dict]]:
+        with self._lock:
+            return sorted(self._collections.get(collection_path, {}).items())
+
+    def _apply(self, writes: list[tuple[FakeDocumentReference, dict, bool]]) -> None:
+        with self._lock:
+            for reference, data, merge in writes:
+                documents = self._collections[reference.parent_path]
+                if merge and reference.id in documents:
+                    documents[reference.id] = {**documents[reference.id], **data}
+                else:
+                    documents[reference.id] = data
+            self.commits += 1
@@ -0,0 +1,240 @@
+"""
+Local stand-in for the Gemini REST API.
+
+Serves the subset of the Gemini API the agents use (generateContent,
+streamGenerateContent and cachedContents) so real `Gemini` models, including
+the prompt-prefix cache in momentum_agent.prompt_cache, can run offline by
+pointing their base_url at it. Replies come from StubLlm. Usage metadata
+counts tokens at ~4 characters each and reports cached prefixes the way Gemini
+does: promptTokenCount includes the cached content and cachedContentTokenCount
+is the cached part of it.
+
+The caching rules that matter to callers are enforced: caches smaller than
+`min_cache_tokens` are rejected, a request using a cache may not also set a
+system instruction, tools or tool config, and expired or deleted caches are
+refused with 403 like the real API.
+
+Usage:
+    python -m momentum_agent.testing.stub_gemini_api --port 8090
+    GOOGLE_API_KEY=offline MOMENTUM_MODEL_BASE_URL=http://127.0.0.1:8090 \\
+        python -m momentum_agent.serving
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from google.adk.models import LlmRequest
+from google.genai import types
+
+from .stub_model import COACHING_ROUTES, StubLlm, ToolRoute, _estimate_tokens
+
+# Parts of a generateContent request that live in the cache when one is used
+CACHEABLE_FIELDS = ("systemInstruction", "tools", "toolConfig")
+
+
+def _count_tokens(*values) -> int:
+    """Approximate tokens for request fields (the JSON text, ~4 chars per token)."""
+    return sum(_estimate_tokens(json.dumps(value, sort_keys=True)) for value in values if value)
+
+
+def _timestamp(seconds: float) -> str:
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _error(code: int, status: str, message: str) -> JSONResponse:
+    return JSONResponse({"error": {"code": code, "message": message, "status": status}}, status_code=code)
+
+
+def _ttl_seconds(ttl: Optional[str]) -> float:
+    return float(ttl.rstrip("s")) if ttl else 3600.0
+
+
+def _tool_names(tools: Optional[list]) -> set[str]:
+    return {
+        declaration["name"]
+        for tool in tools or []
+        for declaration in tool.get("functionDeclarations", [])
+    }
+
+
+def create_stub_gemini_app(
+    min_cache_tokens: int = 1024, latency: float = 0.0, routes: Optional[list[ToolRoute]] = None
+) -> FastAPI:
+    """
+    Build the stand-in Gemini API app.
+
+    Args:
+        min_cache_tokens: Smallest cache accepted (1024 for Gemini 2.5 Flash).
+        latency: Seconds to sleep before each generate call.
+        routes: StubLlm keyword routes; tools are matched against the
+            request's (or its cache's) function declarations.
+
+    State for assertions: `app.state.caches` maps cache names to stored caches,
+    `app.state.requests` lists every generate request body in order and
+    `app.state.cache_requests` every cache create request body.
+    """
+    app = FastAPI(title="Stub Gemini API")
+    app.state.caches = {}
+    app.state.requests = []
+    app.state.cache_requests = []
+    stub = StubLlm(routes=routes or [])
+
+    def live_cache(name: str) -> Optional[dict]:
+        cache = app.state.caches.get(name)
+        if cache is None or cache["expire"] <= time.time():
+            return None
+        return cache
+
+    def cache_resource(cache: dict) -> dict:
+        return {
+            "name": cache["name"],
+            "model": cache["model"],
+            "displayName": cache["displayName"],
+            "createTime": _timestamp(cache["created"]),
+            "updateTime": _timestamp(cache["created"]),
+            "expireTime": _timestamp(cache["expire"]),
+            "usageMetadata": {"totalTokenCount": cache["tokens"]},
+        }
+
+    async def generate(model: str, body: dict) -> dict | JSONResponse:
+        app.state.requests.append(body)
+        cached_tokens = 0
+        tools = body.get("tools")
+        if body.get("cachedContent"):
+            cache = live_cache(body["cachedContent"])
+            if cache is None:
+                return _error(403, "PERMISSION_DENIED", "CachedContent not found (or permission denied)")
+            if cache["model"] != f"models/{model}":
+                return _error(400, "INVALID_ARGUMENT", "Model does not match the cached content model")
+            if any(body.get(field) for field in CACHEABLE_FIELDS):
+                return _error(
+                    400, "INVALID_ARGUMENT",
+                    "CachedContent can not be used with GenerateContent request setting "
+                    "system_instruction, tools or tool_config.",
+                )
+            cached_tokens = cache["tokens"]
+            tools = cache["tools"]
+        if latency:
+            await asyncio.sleep(latency)
+
+        contents = [types.Content.model_validate(content) for content in body.get("contents", [])]
+        reply = stub._reply_for(LlmRequest(contents=contents), _tool_names(tools))
+        prompt_tokens = cached_tokens + _count_tokens(*(body.get(field) for field in CACHEABLE_FIELDS),
+                                                      body.get("contents"))
+        reply_tokens = _count_tokens(reply.model_dump(mode="json", exclude_none=True))
+        usage = {
+            "promptTokenCount": prompt_tokens,
+            "candidatesTokenCount": reply_tokens,
+            "totalTokenCount": prompt_tokens + reply_tokens,
+        }
+        if cached_tokens:
+            usage["cachedContentTokenCount"] = cached_tokens
+        return {
+            "candidates": [{
+                "content": reply.model_dump(mode="json", by_alias=True, exclude_none=True),
+                "finishReason": "STOP",
+                "index": 0,
+            }],
+            "usageMetadata": usage,
+            "modelVersion": model,
+        }
+
+    @app.post("/{version}/models/{model}:generateContent")
+    async def generate_content(model: str, request: Request):
+        return await generate(model, await request.json())
+
+    @app.post("/{version}/models/{model}:streamGenerateContent")
+    async def stream_generate_content(model: str, request: Request):
+        response = await generate(model, await request.json())
+        if isinstance(response, JSONResponse):
+            return response
+
+        async def events():
+            yield f"data: {json.dumps(response)}\r\n\r\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/{version}/cachedContents")
+    async def create_cache(request: Request):
+        body = await request.json()
+        app.state.cache_requests.append(body)
+        tokens = _count_tokens(*(body.get(field) for field in CACHEABLE_FIELDS), body.get("contents"))
+        if tokens < min_cache_tokens:
+            return _error(
+                400, "INVALID_ARGUMENT",
+                f"Cached content is too small. total_token_count={tokens}, "
+                f"min_total_token_count={min_cache_tokens}",
+            )
+        now = time.time()
+        cache = {
+            "name": f"cachedContents/{uuid.uuid4().hex[:12]}",
+            "model": body["model"],
+            "displayName": body.get("displayName", ""),
+            "created": now,
+            "expire": now + _ttl_seconds(body.get("ttl")),
+            "tokens": tokens,
+            "tools": body.get("tools"),
+        }
+        app.state.caches[cache["name"]] = cache
+        return cache_resource(cache)
+
+    @app.get("/{version}/cachedContents/{cache_id}")
+    async def get_cache(cache_id: str):
+        cache = live_cache(f"cachedContents/{cache_id}")
+        if cache is None:
+            return _error(403, "PERMISSION_DENIED", "CachedContent not found (or permission denied)")
+        return cache_resource(cache)
+
+    @app.delete("/{version}/cachedContents/{cache_id}")
+    async def delete_cache(cache_id: str):
+        if app.state.caches.pop(f"cachedContents/{cache_id}", None) is None:
+            return _error(403, "PERMISSION_DENIED", "CachedContent not found (or permission denied)")
+        return {}
+
+    return app
+
+
+@contextmanager
+def serve_in_thread(app: FastAPI, host: str = "127.0.0.1") -> Iterator[str]:
+    """Serve `app` on a free local port in a background thread; yields its base URL."""
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=0, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("Stub Gemini API failed to start")
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"http://{host}:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the Gemini API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--min-cache-tokens", type=int, default=1024)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per generate call")
+    parser.add_argument("--coaching-routes", action="store_true", help="Route coaching phrases to tool calls")
+    args = parser.parse_args()
+    app = create_stub_gemini_app(
+        args.min_cache_tokens, args.latency, routes=COACHING_ROUTES if args.coaching_routes else None
+    )
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
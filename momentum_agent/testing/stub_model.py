@@ -0,0 +1,186 @@
+"""
+Local stub model for offline runs of the Momentum agents.
+
+Stands in for Gemini so the serving layer, benchmarks and tests can drive the
+real hub-and-spoke agents without network access or an API key. Replies are
+deterministic: user text is echoed back, tool results are acknowledged, and
+optional keyword routes turn user messages into tool calls. Latency, jitter
+and error injection are configurable for load testing.
+"""
+
+import asyncio
+import random
+import re
+from typing import AsyncGenerator, Collection, Optional
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.genai import types
+from pydantic import BaseModel, Field, PrivateAttr
+
+
+class StubModelError(RuntimeError):
+    """Injected model failure, standing in for a 5xx from the model API."""
+
+
+class ToolRoute(BaseModel):
+    """Call `tool` with `args` when the user message contains `keyword`."""
+
+    keyword: str
+    tool: str
+    args: dict = Field(default_factory=dict)
+
+
+# preload_memory may add past conversations as a trailing user message
+MEMORY_CONTEXT_MARKER = "<PAST_CONVERSATIONS>"
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def _request_text(llm_request: LlmRequest) -> str:
+    """Concatenate the text of every part in the request contents."""
+    chunks = []
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            if part.text:
+                chunks.append(part.text)
+    return "\n".join(chunks)
+
+
+# Routes that turn the scripted coaching conversations (plan creation, save,
+# week lookup, exercise questions) into the tool calls Gemini would make.
+# First match wins, so "plans" must precede "save" ("What plans have I saved?").
+COACHING_ROUTES = [
+    ToolRoute(keyword="plans", tool="list_user_plans"),
+    ToolRoute(keyword="my plan", tool="load_plan"),
+    ToolRoute(keyword="this week", tool="get_week_schedule"),
+    ToolRoute(keyword="week 1", tool="get_current_week_plan", args={"week_number": 1}),
+    ToolRoute(keyword="how do i", tool="InstructorAgent", args={"request": "{message}"}),
+    ToolRoute(keyword="mistakes", tool="InstructorAgent", args={"request": "{message}"}),
+    ToolRoute(
+        keyword="save",
+        tool="save_plan",
+        args={
+            "goal_description": "Run a 5k",
+            "exercises": "Week 1:\nDay 1: 20 min easy run\nDay 3: 20 min easy run\nDay 5: 25 min run",
+            "week_number": 1,
+            "program_length_weeks": 8,
+        },
+    ),
+]
+
+
+class StubLlm(BaseLlm):
+    """
+    Deterministic stand-in for a Gemini model.
+
+    The default model name matches the production model so built-in tools that
+    check for a Gemini model (e.g. google_search) accept the stub.
+
+    Attributes:
+        latency: Seconds to sleep before answering, to simulate model time.
+        jitter: Extra uniformly random delay in [0, jitter] seconds.
+        error_rate: Probability in [0, 1] that a call raises StubModelError.
+        routes: Keyword routes from user messages to tool calls. A route only
+            fires when its tool is available to the calling agent; the arg
+            value "{message}" is replaced by the user message.
+        seed: Seed for the jitter/error random generator.
+        parallel_calls: Route each question of a message separately and answer
+            with one function call per routed question, as Gemini does for
+            independent requests ("What plans have I saved? How do I squat?").
+    """
+
+    model: str = "gemini-2.5-flash"
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    routes: list[ToolRoute] = Field(default_factory=list)
+    seed: Optional[int] = None
+    parallel_calls: bool = False
+
+    _random: random.Random = PrivateAttr(default=None)
+
+    def model_post_init(self, __context) -> None:
+        self._random = random.Random(self.seed)
+
+    def _route_for(self, tool_names: Collection[str], text: str) -> Optional[ToolRoute]:
+        """Return the first route matching the text whose tool is available."""
+        lowered = text.lower()
+        for route in self.routes:
+            if route.keyword in lowered and route.tool in tool_names:
+                return route
+        return None
+
+    @staticmethod
+    def _latest_parts(llm_request: LlmRequest) -> list[types.Part]:
+        """Parts of the latest turn, skipping memory context added by preload_memory."""
+        for content in reversed(llm_request.contents):
+            parts = content.parts or []
+            if any(MEMORY_CONTEXT_MARKER in (p.text or "") for p in parts):
+                continue
+            return parts
+        return []
+
+    def _reply_for(self, llm_request: LlmRequest, tool_names: Optional[Collection[str]] = None) -> types.Content:
+        """
+        Build the model content for the latest turn in the request.
+
+        Tools are looked up in `tool_names` when given, else in the request.
+        """
+        parts = self._latest_parts(llm_request)
+        responses = [p.function_response.name for p in parts if p.function_response]
+        if responses:
+            return types.Content(role="model", parts=[types.Part(text=f"Done: {', '.join(responses)}.")])
+
+        text = " ".join(p.text for p in parts if p.text)
+        tool_names = llm_request.tools_dict if tool_names is None else tool_names
+        questions = [q.strip() for q in re.findall(r"[^?]+\??", text) if q.strip()] if self.parallel_calls else [text]
+        calls = []
+        for question in questions:
+            route = self._route_for(tool_names, question)
+            if route:
+                args = {k: (question if v == "{message}" else v) for k, v in route.args.items()}
+                calls.append(types.Part(function_call=types.FunctionCall(name=route.tool, args=args)))
+        if calls:
+            return types.Content(role="model", parts=calls)
+
+        reply = f"Stub reply: {text}" if text else "Stub reply."
+        return types.Content(role="model", parts=[types.Part(text=reply)])
+
+    def _usage(self, llm_request: LlmRequest, reply: str) -> types.GenerateContentResponseUsageMetadata:
+        """Approximate usage metadata for a request/reply pair."""
+        system = llm_request.config.system_instruction if llm_request.config else None
+        prompt_tokens = _estimate_tokens(_request_text(llm_request) + str(system or ""))
+        reply_tokens = _estimate_tokens(reply)
+        return types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=reply_tokens,
+            total_token_count=prompt_tokens + reply_tokens,
+        )
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise StubModelError("Injected model error")
+
+        content = self._reply_for(llm_request)
+        reply = "".join(p.text for p in content.parts if p.text)
+
+        if stream and reply:
+            for word in reply.split(" "):
+                yield LlmResponse(
+                    content=types.Content(role="model", parts=[types.Part(text=word + " ")]),
+                    partial=True,
+                )
+
+        yield LlmResponse(
+            content=content,
+            usage_metadata=self._usage(llm_request, reply or str(content.parts[0].function_call)),
+            turn_complete=True,
+        )
@@ -0,0 +1,304 @@
+"""
+Concurrent execution of the hub's tool calls.
+
+When the model answers with several function calls, ADK starts one task per
+call and merges the responses in call order. Two things kept that from
+actually running concurrently or safely in the hub:
+
+- The plan and schedule tools are synchronous, so ADK calls them on the event
+  loop: they run one after another and block every other session served by
+  the loop while they do storage I/O.
+- Nothing bounds a turn. A model that fans out to many spoke questions starts
+  them all at once, and a hung spoke or backend call hangs the whole turn.
+
+`run_concurrently` wraps the hub's tools so that synchronous tools run on a
+worker thread, at most `max_concurrent_calls` calls of one turn run at a time,
+and each call has a timeout after which the model gets an error result for
+that call instead of waiting. Responses are still merged in call order by ADK.
+
+Calls for the same user share a read/write lock: the read-only plan and
+schedule tools (READ_ONLY_TOOLS) run together, while anything that writes
+(saving or rolling back a plan, exporting a calendar, and the one-time legacy
+import and schedule index build) runs alone, since plan and schedule files
+are rewritten in place.
+"""
+
+import asyncio
+import collections
+import contextvars
+import functools
+import inspect
+import logging
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Optional
+
+from google.adk.tools import AgentTool, BaseTool, FunctionTool, ToolContext
+
+from . import plan_tools
+from .plan_tools import user_id_for
+
+logger = logging.getLogger(__name__)
+
+# Calls of one turn that may run at the same time
+MAX_CONCURRENT_CALLS = 4
+
+# Per-call timeouts: storage tools are local or one backend round trip, spokes
+# run a full model turn of their own (with retries)
+TOOL_TIMEOUT_SECONDS = 30.0
+SPOKE_TIMEOUT_SECONDS = 120.0
+
+# Worker threads for synchronous tools, shared by all sessions in the process
+TOOL_THREADS = 8
+
+# Tools that only read plans and the schedule index; every other synchronous
+# tool is treated as a writer
+READ_ONLY_TOOLS = frozenset({
+    "load_plan",
+    "get_current_week_plan",
+    "list_user_plans",
+    "get_plan_history",
+    "get_todays_workout",
+    "get_week_schedule",
+})
+
+_executor = ThreadPoolExecutor(max_workers=TOOL_THREADS, thread_name_prefix="momentum-tool")
+
+
+class ReadWriteLock:
+    """
+    Many readers or one writer, granted in arrival order.
+
+    A waiting writer holds back readers that arrive after it, so a stream of
+    reads cannot starve a write. `release` is synchronous so it can run from a
+    future's done-callback.
+    """
+
+    def __init__(self):
+        self._readers = 0
+        self._writer = False
+        self._waiters: collections.deque[tuple[bool, asyncio.Future]] = collections.deque()
+
+    def _fits(self, write: bool) -> bool:
+        return not self._writer and (not write or self._readers == 0)
+
+    def _enter(self, write: bool) -> None:
+        if write:
+            self._writer = True
+        else:
+            self._readers += 1
+
+    async def acquire(self, write: bool) -> None:
+        if not self._waiters and self._fits(write):
+            self._enter(write)
+            return
+        waiter = (write, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            if waiter[1].cancelled():
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                self._wake()
+            else:
+                self.release(write)  # granted just before the cancellation
+            raise
+
+    def release(self, write: bool) -> None:
+        if write:
+            self._writer = False
+        else:
+            self._readers -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters:
+            write, future = self._waiters[0]
+            if future.cancelled():
+                self._waiters.popleft()
+                continue
+            if not self._fits(write):
+                break
+            self._waiters.popleft()
+            self._enter(write)
+            future.set_result(None)
+
+
+# Dropped once no call of the user holds or waits for its lock
+_user_locks: weakref.WeakValueDictionary[str, ReadWriteLock] = weakref.WeakValueDictionary()
+# Returned by a read that found one-time writes to do first
+_NOT_READY = object()
+
+
+async def _locked(lock: ReadWriteLock, write: bool, func: Callable[[], Any]) -> Any:
+    """
+    Run `func` on a worker thread while holding `lock`.
+
+    The call queues on the event loop, so a waiting call does not occupy a
+    worker thread. The lock is released when `func` returns, not when the
+    caller stops waiting, so a call that timed out still holds off the user's
+    conflicting storage calls until it has finished.
+    """
+    await lock.acquire(write)
+    try:
+        context = contextvars.copy_context()
+        future = asyncio.get_running_loop().run_in_executor(_executor, context.run, func)
+    except BaseException:
+        lock.release(write)
+        raise
+    future.add_done_callback(lambda _: lock.release(write))
+    return await asyncio.shield(future)
+
+
+def in_worker_thread(func: Callable[..., Any], read_only: bool = False) -> Callable[..., Any]:
+    """
+    Async version of a synchronous tool function that runs it on a worker thread.
+
+    Args:
+        func: The tool function.
+        read_only: The function only reads the user's plans and schedule, so
+            it may run alongside the user's other reads. It still waits for
+            the one-time legacy import and schedule index build, which run
+            under the exclusive lock.
+    """
+
+    @functools.wraps(func)
+    async def run(*args, **kwargs):
+        user_id = user_id_for(kwargs.get("tool_context"))
+        lock = _user_locks.get(user_id)
+        if lock is None:
+            lock = _user_locks[user_id] = ReadWriteLock()
+
+        call = functools.partial(func, *args, **kwargs)
+        if not read_only:
+            return await _locked(lock, True, call)
+
+        def read():
+            return call() if plan_tools.storage_ready(user_id) else _NOT_READY
+
+        result = await _locked(lock, False, read)
+        if result is _NOT_READY:
+            await _locked(lock, True, functools.partial(plan_tools.prepare_storage, user_id))
+            result = await _locked(lock, False, call)
+        return result
+
+    return run
+
+
+@dataclass
+class FanoutStats:
+    """Counters for wrapped tool calls."""
+
+    calls: int = 0
+    timeouts: int = 0
+    peak_in_flight: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class TurnLimiter:
+    """Caps how many wrapped tool calls of one invocation run at the same time."""
+
+    def __init__(self, max_concurrent_calls: int = MAX_CONCURRENT_CALLS):
+        self.max_concurrent_calls = max_concurrent_calls
+        self.stats = FanoutStats()
+        # Dropped once no call of the invocation holds its semaphore
+        self._slots: weakref.WeakValueDictionary[str, asyncio.Semaphore] = weakref.WeakValueDictionary()
+        self._in_flight = 0
+
+    def slots(self, invocation_id: str) -> asyncio.Semaphore:
+        semaphore = self._slots.get(invocation_id)
+        if semaphore is None:
+            semaphore = self._slots[invocation_id] = asyncio.Semaphore(self.max_concurrent_calls)
+        return semaphore
+
+    def started(self) -> None:
+        self._in_flight += 1
+        self.stats.calls += 1
+        self.stats.peak_in_flight = max(self.stats.peak_in_flight, self._in_flight)
+
+    def finished(self) -> None:
+        self._in_flight -= 1
+
+
+class BoundedTool(BaseTool):
+    """
+    A tool whose calls run under their turn's concurrency cap and a timeout.
+
+    Name and declaration are the wrapped tool's, so the model sees no change.
+
+    Args:
+        tool: The tool to run.
+        limiter: Concurrency cap shared by the agent's tools.
+        timeout_seconds: How long a call may run before the model is told it timed out.
+    """
+
+    def __init__(self, tool: BaseTool, limiter: TurnLimiter, timeout_seconds: float):
+        super().__init__(
+            name=tool.name,
+            description=tool.description,
+            is_long_running=tool.is_long_running,
+            custom_metadata=tool.custom_metadata,
+        )
+        self.tool = tool
+        self.limiter = limiter
+        self.timeout_seconds = timeout_seconds
+
+    def _get_declaration(self):
+        return self.tool._get_declaration()
+
+    async def run_async(self, *, args: dict[str, Any], tool_context: ToolContext) -> Any:
+        async with self.limiter.slots(tool_context.invocation_id):
+            self.limiter.started()
+            try:
+                return await asyncio.wait_for(
+                    self.tool.run_async(args=args, tool_context=tool_context), self.timeout_seconds
+                )
+            except asyncio.TimeoutError:
+                self.limiter.stats.timeouts += 1
+                logger.warning("Tool %s timed out after %gs", self.name, self.timeout_seconds)
+                return {
+                    "error": f"{self.name} did not finish within {self.timeout_seconds:g} seconds. "
+                    "Answer without it or ask the user to try again."
+                }
+            finally:
+                self.limiter.finished()
+
+
+def run_concurrently(
+    tools: list,
+    max_concurrent_calls: int = MAX_CONCURRENT_CALLS,
+    tool_timeout_seconds: float = TOOL_TIMEOUT_SECONDS,
+    spoke_timeout_seconds: float = SPOKE_TIMEOUT_SECONDS,
+    limiter: Optional[TurnLimiter] = None,
+) -> list:
+    """
+    Wrap an agent's tools for concurrent, bounded execution.
+
+    Function tools and agent tools (spokes) are wrapped; anything else, such as
+    preload_memory, which only edits the request, is returned unchanged.
+
+    Args:
+        tools: The agent's tools, in declaration order.
+        max_concurrent_calls: Calls of one turn that may run at the same time.
+        tool_timeout_seconds: Timeout for a function tool call.
+        spoke_timeout_seconds: Timeout for a spoke (AgentTool) call.
+        limiter: Share a cap (and its stats) across agents; one is created if omitted.
+
+    Returns:
+        The tools, wrapped where applicable, in the same order.
+    """
+    limiter = limiter or TurnLimiter(max_concurrent_calls)
+    wrapped = []
+    for tool in tools:
+        if isinstance(tool, AgentTool):
+            tool = BoundedTool(tool, limiter, spoke_timeout_seconds)
+        elif isinstance(tool, FunctionTool):
+            if not inspect.iscoroutinefunction(tool.func):
+                tool = FunctionTool(func=in_worker_thread(tool.func, read_only=tool.name in READ_ONLY_TOOLS))
+            tool = BoundedTool(tool, limiter, tool_timeout_seconds)
+        wrapped.append(tool)
+    return wrapped
@@ -2,14 +2,69 @@
 Plan storage tools for workout plan persistence.
 
 Uses Firestore-compatible JSON schema for seamless Phase 5-7 migration.
-File-based storage in data/plans/{user_id}/ directory.
+Plans are kept per user in a content-addressed, versioned store (see
+momentum_agent.storage.plan_store) on the backend selected by
+MOMENTUM_PLAN_STORE, data/plans/ by default.
 """
 
-import json
-from pathlib import Path
-from datetime import datetime
+import re
+from datetime import date, datetime
 from typing import Optional
-from google.adk.tools import FunctionTool
+from google.adk.tools import FunctionTool, ToolContext
+from ..config import PLAN_STORE_URL
+from ..scheduling import ScheduleIndex, program_start
+from ..storage import PlanStore, check_plan_id, check_user_id, open_backend
+
+plan_store = PlanStore(open_backend(PLAN_STORE_URL))
+schedule_index = ScheduleIndex()
+
+# Used when a tool runs outside an agent run (scripts, tests). It is also the
+# `adk web` default user, whose plans were stored under it before tools knew
+# the caller.
+DEFAULT_USER_ID = "user"
+
+
+def user_id_for(tool_context: Optional[ToolContext]) -> str:
+    """Id of the user the tool is running for (validated, since it names files)."""
+    return check_user_id(tool_context.user_id) if tool_context is not None else DEFAULT_USER_ID
+
+
+def goal_slug(goal_description: str) -> str:
+    """Goal id for a goal description: lowercase, anything outside [a-z0-9_] replaced by "_"."""
+    return re.sub(r"[^a-z0-9_]", "_", goal_description.lower())[:30].strip("_") or "plan"
+
+
+def is_plan_id(plan_id: str) -> bool:
+    """Whether a plan id is well-formed; the model chooses it, so anything else is treated as not found."""
+    try:
+        check_plan_id(plan_id)
+    except ValueError:
+        return False
+    return True
+
+
+def ensure_schedule_index(user_id: str) -> None:
+    """Index the user's saved plans if they have no schedule index yet (plans saved before indexing)."""
+    if not schedule_index.exists(user_id):
+        plans = [plan_store.load(user_id, p["plan_id"]) for p in plan_store.list_plans(user_id)]
+        schedule_index.rebuild(user_id, plans)
+
+
+def storage_ready(user_id: str) -> bool:
+    """Whether reads for the user write nothing: no legacy plans left to import and a schedule index exists."""
+    return schedule_index.exists(user_id) and not plan_store.backend.legacy_plans(user_id)
+
+
+def prepare_storage(user_id: str) -> None:
+    """Do the one-time writes a read would otherwise make: import legacy plans, build the schedule index."""
+    plan_store.import_legacy(user_id)
+    ensure_schedule_index(user_id)
+
+
+def reindex_plan(user_id: str, plan_id: str) -> int:
+    """Update the schedule index after a plan was saved; returns the plan's scheduled days."""
+    ensure_schedule_index(user_id)
+    return schedule_index.update(user_id, plan_store.load(user_id, plan_id))
 
 
 def save_plan(
@@ -17,7 +72,9 @@ def save_plan(
     exercises: str,
     week_number: int = 1,
     program_length_weeks: int = 4,
-    notes: str = ""
+    notes: str = "",
+    start_date: str = "",
+    tool_context: Optional[ToolContext] = None
 ) -> str:
     """
     Save a workout plan to persistent storage.
@@ -28,14 +85,28 @@ def save_plan(
         week_number: Current week in the program (default: 1)
         program_length_weeks: Total program length in weeks (default: 4)
         notes: Additional notes about the plan
+        start_date: Program start date (YYYY-MM-DD) for Week 1, Day 1. Defaults to the
+            start date of an already saved week of the same goal, or else the date that
+            makes this week start today.
     
     Returns:
         plan_id: Unique identifier for the saved plan
     """
-    user_id = "user"
-    goal_id = goal_description.lower().replace(" ", "_")[:30]
+    user_id = user_id_for(tool_context)
+    goal_id = goal_slug(goal_description)
     timestamp = datetime.now().isoformat()
     
+    if not start_date:
+        start_date = next(
+            (p["metadata"]["start_date"] for p in plan_store.list_plans(user_id)
+             if p.get("goal_id") == goal_id and p.get("metadata", {}).get("start_date")),
+            program_start(date.today(), week_number).isoformat(),
+        )
+    try:
+        date.fromisoformat(start_date)
+    except ValueError:
+        return f"Invalid start_date '{start_date}'. Use the YYYY-MM-DD format."
+    
     plan_data = {
         "user_id": user_id,
         "goal_id": goal_id,
@@ -47,21 +118,22 @@ def save_plan(
             "week_number": week_number,
             "program_length_weeks": program_length_weeks,
             "notes": notes,
-            "goal_description": goal_description
+            "goal_description": goal_description,
+            "start_date": start_date
         }
     }
     
     plan_id = f"{goal_id}_week{week_number}"
-    path = Path(f"data/plans/{user_id}/{plan_id}.json")
-    path.parent.mkdir(parents=True, exist_ok=True)
+    record = plan_store.save(user_id, plan_id, plan_data)
+    scheduled_days = reindex_plan(user_id, plan_id)
     
-    with open(path, 'w') as f:
-        json.dump(plan_data, f, indent=2)
-    
-    return f"Plan saved successfully with ID: {plan_id}"
+    return (
+        f"Plan saved successfully with ID: {plan_id} (version {record['version']}), "
+        f"{scheduled_days} days scheduled from {start_date}"
+    )
 
 
-def load_plan(plan_id: Optional[str] = None) -> str:
+def load_plan(plan_id: Optional[str] = None, tool_context: Optional[ToolContext] = None) -> str:
     """
     Load a saved workout plan.
     
@@ -71,24 +143,16 @@ def load_plan(plan_id: Optional[str] = None) -> str:
     Returns:
         Plan details as formatted text
     """
-    user_id = "user"
-    plans_dir = Path(f"data/plans/{user_id}")
+    user_id = user_id_for(tool_context)
+    plans = plan_store.list_plans(user_id)
     
-    if not plans_dir.exists():
+    if not plans:
         return "No saved plans found. Generate a plan first and ask me to save it."
     
-    if plan_id:
-        plan_path = plans_dir / f"{plan_id}.json"
-        if not plan_path.exists():
-            return f"Plan '{plan_id}' not found. Use list_user_plans to see available plans."
-    else:
-        plan_files = sorted(plans_dir.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
-        if not plan_files:
-            return "No saved plans found."
-        plan_path = plan_files[0]
-    
-    with open(plan_path, 'r') as f:
-        plan_data = json.load(f)
+    plan_id = plan_id or plans[0]["plan_id"]
+    plan_data = plan_store.load(user_id, plan_id) if is_plan_id(plan_id) else None
+    if plan_data is None:
+        return f"Plan '{plan_id}' not found. Use list_user_plans to see available plans."
     
     metadata = plan_data.get("metadata", {})
     result = f"""**Workout Plan: {metadata.get('goal_description', 'Unknown Goal')}**
@@ -96,6 +160,7 @@ def load_plan(plan_id: Optional[str] = None) -> str:
 Created: {plan_data.get('created_at', 'Unknown')}
 Status: {plan_data.get('status', 'Unknown')}
 Week: {metadata.get('week_number', '?')} of {metadata.get('program_length_weeks', '?')}
+Version: {plan_data.get('version', '?')}
 
 {plan_data.get('exercises_text', 'No exercises found')}
 
@@ -104,7 +169,7 @@ Notes: {metadata.get('notes', 'None')}
     return result
 
 
-def get_current_week_plan(week_number: Optional[int] = None) -> str:
+def get_current_week_plan(week_number: Optional[int] = None, tool_context: Optional[ToolContext] = None) -> str:
     """
     Get the workout plan for a specific week.
     
@@ -114,22 +179,21 @@ def get_current_week_plan(week_number: Optional[int] = None) -> str:
     Returns:
         Week's workout plan as formatted text
     """
-    user_id = "user"
-    plans_dir = Path(f"data/plans/{user_id}")
+    user_id = user_id_for(tool_context)
+    plans = plan_store.list_plans(user_id)
     
-    if not plans_dir.exists():
+    if not plans:
         return "No saved plans found. Generate a plan first and ask me to save it."
     
     if week_number is None:
         week_number = 1
     
-    plan_files = list(plans_dir.glob(f"*_week{week_number}.json"))
+    matches = [p for p in plans if p["plan_id"].endswith(f"_week{week_number}")]
     
-    if not plan_files:
+    if not matches:
         return f"No plan found for week {week_number}. Available weeks can be found using list_user_plans."
     
-    with open(plan_files[0], 'r') as f:
-        plan_data = json.load(f)
+    plan_data = plan_store.load(user_id, matches[0]["plan_id"])
     
     metadata = plan_data.get("metadata", {})
     result = f"""**Week {week_number} Workout Plan**
@@ -141,36 +205,82 @@ Goal: {metadata.get('goal_description', 'Unknown')}
     return result
 
 
-def list_user_plans() -> str:
+def list_user_plans(tool_context: Optional[ToolContext] = None) -> str:
     """
     List all saved workout plans for the current user.
     
     Returns:
         Formatted list of all saved plans
     """
-    user_id = "user"
-    plans_dir = Path(f"data/plans/{user_id}")
+    user_id = user_id_for(tool_context)
+    plans = plan_store.list_plans(user_id)
     
-    if not plans_dir.exists() or not list(plans_dir.glob("*.json")):
+    if not plans:
         return "No saved plans found. Generate a plan and ask me to save it."
     
-    plan_files = sorted(plans_dir.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
-    
     result = "**Your Saved Workout Plans:**\n\n"
-    for plan_file in plan_files:
-        with open(plan_file, 'r') as f:
-            plan_data = json.load(f)
-        
+    for plan_data in plans:
         metadata = plan_data.get("metadata", {})
-        plan_id = plan_file.stem
-        result += f"- **{plan_id}**: {metadata.get('goal_description', 'Unknown Goal')} "
+        result += f"- **{plan_data['plan_id']}**: {metadata.get('goal_description', 'Unknown Goal')} "
         result += f"(Week {metadata.get('week_number', '?')}/{metadata.get('program_length_weeks', '?')}, "
-        result += f"Status: {plan_data.get('status', 'Unknown')})\n"
+        result += f"Status: {plan_data.get('status', 'Unknown')}, Version: {plan_data['version']})\n"
     
     return result
 
 
+def get_plan_history(plan_id: str, tool_context: Optional[ToolContext] = None) -> str:
+    """
+    List the saved versions of a workout plan.
+    
+    Args:
+        plan_id: Plan ID to show the history for
+    
+    Returns:
+        Formatted list of versions, oldest first
+    """
+    user_id = user_id_for(tool_context)
+    versions = plan_store.history(user_id, plan_id) if is_plan_id(plan_id) else []
+    
+    if not versions:
+        return f"Plan '{plan_id}' not found. Use list_user_plans to see available plans."
+    
+    result = f"**Version History: {plan_id}**\n\n"
+    for version in versions:
+        result += f"- **Version {version['version']}** ({version['updated_at']}): "
+        result += f"Status: {version.get('status', 'Unknown')}"
+        if version.get("message"):
+            result += f" - {version['message']}"
+        result += "\n"
+    
+    return result
+
+
+def rollback_plan(plan_id: str, version: int, tool_context: Optional[ToolContext] = None) -> str:
+    """
+    Restore an earlier version of a workout plan.
+    
+    The restore is saved as a new version, so no history is lost.
+    
+    Args:
+        plan_id: Plan ID to roll back
+        version: Version number to restore (see get_plan_history)
+    
+    Returns:
+        Confirmation message with the new version number
+    """
+    user_id = user_id_for(tool_context)
+    record = plan_store.rollback(user_id, plan_id, version) if is_plan_id(plan_id) else None
+    
+    if record is None:
+        return f"Version {version} of plan '{plan_id}' not found. Use get_plan_history to see available versions."
+    
+    reindex_plan(user_id, plan_id)
+    return f"Plan {plan_id} restored to version {version} (saved as version {record['version']})"
+
+
 save_plan_tool = FunctionTool(func=save_plan)
 load_plan_tool = FunctionTool(func=load_plan)
 get_current_week_plan_tool = FunctionTool(func=get_current_week_plan)
 list_user_plans_tool = FunctionTool(func=list_user_plans)
+get_plan_history_tool = FunctionTool(func=get_plan_history)
+rollback_plan_tool = FunctionTool(func=rollback_plan)
@@ -0,0 +1,105 @@
+"""
+Schedule tools for date-based workout lookups and calendar export.
+
+Backed by the per-user schedule index (momentum_agent.scheduling), which
+save_plan and rollback_plan keep up to date, so "today" and "this week" are
+answered from dates directly instead of the LLM working them out from prose.
+"""
+
+from datetime import date, timedelta
+from typing import Optional
+from google.adk.tools import FunctionTool, ToolContext
+from ..scheduling import CALENDARS_DIR, export_ics
+from . import plan_tools
+
+
+def _parse_day(day: Optional[str]) -> Optional[date]:
+    if not day:
+        return date.today()
+    try:
+        return date.fromisoformat(day)
+    except ValueError:
+        return None
+
+
+def _format_workouts(workouts: list[dict]) -> str:
+    return "; ".join(
+        f"{w['workout']} (Week {w['week']}, Day {w['day']} of {w['plan_id']})" for w in workouts
+    )
+
+
+def get_todays_workout(day: Optional[str] = None, tool_context: Optional[ToolContext] = None) -> str:
+    """
+    Get the scheduled workout for today or a specific date.
+
+    Args:
+        day: Date to look up (YYYY-MM-DD). If not provided, uses today.
+
+    Returns:
+        The workout(s) scheduled on that date
+    """
+    user_id = plan_tools.user_id_for(tool_context)
+    when = _parse_day(day)
+    if when is None:
+        return f"Invalid date '{day}'. Use the YYYY-MM-DD format."
+
+    plan_tools.ensure_schedule_index(user_id)
+    workouts = plan_tools.schedule_index.on(user_id, when)
+
+    if not workouts:
+        return f"Nothing scheduled for {when:%A, %Y-%m-%d}."
+
+    return f"**{when:%A, %Y-%m-%d}**: {_format_workouts(workouts)}"
+
+
+def get_week_schedule(day: Optional[str] = None, tool_context: Optional[ToolContext] = None) -> str:
+    """
+    Get the workouts scheduled for the calendar week (Monday-Sunday) containing a date.
+
+    Args:
+        day: Any date in the week (YYYY-MM-DD). If not provided, uses the current week.
+
+    Returns:
+        Day-by-day schedule for that week
+    """
+    user_id = plan_tools.user_id_for(tool_context)
+    when = _parse_day(day)
+    if when is None:
+        return f"Invalid date '{day}'. Use the YYYY-MM-DD format."
+
+    plan_tools.ensure_schedule_index(user_id)
+    week = plan_tools.schedule_index.week(user_id, when)
+
+    if not any(week.values()):
+        monday = when - timedelta(days=when.weekday())
+        return f"Nothing scheduled for the week of {monday:%Y-%m-%d}."
+
+    result = "**Your Week:**\n\n"
+    for iso_day, workouts in week.items():
+        label = f"{date.fromisoformat(iso_day):%A %Y-%m-%d}"
+        result += f"- **{label}**: {_format_workouts(workouts) if workouts else 'Nothing scheduled'}\n"
+
+    return result
+
+
+def export_schedule_ics(tool_context: Optional[ToolContext] = None) -> str:
+    """
+    Export all scheduled workouts to an iCalendar (.ics) file the user can import into their calendar.
+
+    Returns:
+        Path of the generated file and the number of events
+    """
+    user_id = plan_tools.user_id_for(tool_context)
+    plan_tools.ensure_schedule_index(user_id)
+    path = CALENDARS_DIR / f"{user_id}.ics"
+    events = export_ics(plan_tools.schedule_index, user_id, path)
+
+    if not events:
+        return "No scheduled workouts to export. Save a plan first."
+
+    return f"Exported {events} workouts to {path}"
+
+
+get_todays_workout_tool = FunctionTool(func=get_todays_workout)
+get_week_schedule_tool = FunctionTool(func=get_week_schedule)
+export_schedule_ics_tool = FunctionTool(func=export_schedule_ics)